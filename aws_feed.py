@@ -0,0 +1,394 @@
+"""
+Módulo para procesar el feed RSS de estado de AWS
+"""
+
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Set, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Código de región de AWS (us-east-1, eu-central-2, us-gov-west-1...)
+_REGION_CODE = r'[a-z]{2}(?:-gov|-iso[a-z]?)?-[a-z]+-\d+'
+
+# Región válida en el GUID de los avisos (https://status.aws.amazon.com/#<servicio>[-<región>]_<marca de tiempo>)
+_GUID_REGION_PATTERN = re.compile(_REGION_CODE)
+
+# Región entre paréntesis al final del título: "... (us-east-1)" o "... (N. Virginia)"
+_TITLE_REGION_PATTERN = re.compile(r'\(([^()]+)\)\s*$')
+
+# Textos que marcan un aviso como resuelto; tienen prioridad sobre los de problema
+# ("The issue has been resolved..." no es un problema activo)
+RESOLVED_MARKERS = ('resolved', 'operating normally', 'recovered')
+
+# Textos que marcan un aviso como problema activo
+ISSUE_MARKERS = ('investigating', 'issue')
+
+# Nombres de región que usa AWS en los títulos
+AWS_REGION_NAMES = {
+    'n. virginia': 'us-east-1',
+    'ohio': 'us-east-2',
+    'n. california': 'us-west-1',
+    'oregon': 'us-west-2',
+    'canada': 'ca-central-1',
+    'sao paulo': 'sa-east-1',
+    'ireland': 'eu-west-1',
+    'london': 'eu-west-2',
+    'paris': 'eu-west-3',
+    'frankfurt': 'eu-central-1',
+    'zurich': 'eu-central-2',
+    'stockholm': 'eu-north-1',
+    'milan': 'eu-south-1',
+    'spain': 'eu-south-2',
+    'tokyo': 'ap-northeast-1',
+    'seoul': 'ap-northeast-2',
+    'osaka': 'ap-northeast-3',
+    'singapore': 'ap-southeast-1',
+    'sydney': 'ap-southeast-2',
+    'jakarta': 'ap-southeast-3',
+    'mumbai': 'ap-south-1',
+    'hong kong': 'ap-east-1',
+    'bahrain': 'me-south-1',
+    'cape town': 'af-south-1'
+}
+
+
+def parse_aws_item_key(title: Optional[str], guid: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """Extraer el servicio y la región de un aviso a partir de su GUID y su título
+
+    El GUID (`#ec2-us-east-1_1700000000`) identifica ambos; si no trae región
+    se busca entre paréntesis al final del título.
+    """
+    service = region = None
+    if guid and '#' in guid:
+        fragment = guid.rpartition('#')[2]
+        if '_' in fragment:
+            fragment = fragment.rpartition('_')[0]
+        service, _, candidate = fragment.partition('-')
+        if candidate and _GUID_REGION_PATTERN.fullmatch(candidate):
+            region = candidate
+        service = service or None
+
+    if region is None and title:
+        title_match = _TITLE_REGION_PATTERN.search(title)
+        if title_match:
+            candidate = title_match.group(1).strip().lower()
+            if re.fullmatch(_REGION_CODE, candidate):
+                region = candidate
+            else:
+                region = AWS_REGION_NAMES.get(candidate)
+    return service, region
+
+
+def classify_aws_notice(title: Optional[str], description: Optional[str]) -> str:
+    """Clasificar un aviso como 'resolved', 'issue' o 'info' (informativo)"""
+    text = f"{title or ''}\n{description or ''}".lower()
+    if any(marker in text for marker in RESOLVED_MARKERS):
+        return 'resolved'
+    if any(marker in text for marker in ISSUE_MARKERS):
+        return 'issue'
+    return 'info'
+
+
+def aws_item_to_service(title: Optional[str], description: Optional[str], guid: Optional[str] = None,
+                        kind: Optional[str] = None) -> Dict:
+    """Convertir un <item> del feed de AWS en una entrada de servicio
+
+    `kind` es la clasificación del aviso si ya se calculó.
+    """
+    service, region = parse_aws_item_key(title, guid)
+    # Determinar si es un problema activo
+    status = 'Issue' if (kind or classify_aws_notice(title, description)) == 'issue' else 'Operational'
+
+    return {
+        'name': title or 'Unknown',
+        'service': service,
+        'status': status,
+        'description': description or 'No description',
+        'region': region or 'Global'
+    }
+
+
+def build_aws_status(services: List[Dict]) -> Dict:
+    """Construir el estado de AWS a partir de la lista de servicios"""
+    # Si no hay items, asumimos que todo está operativo
+    if not services:
+        services = [{'name': 'All Services', 'status': 'Operational', 'region': 'Global'}]
+
+    return {
+        'provider': 'AWS',
+        'overall_status': 'Operational' if all(s['status'] == 'Operational' for s in services) else 'Issues Detected',
+        'services': services,
+        'last_updated': datetime.now().isoformat()
+    }
+
+
+def parse_aws_item_timestamp(guid: Optional[str], pub_date: Optional[str]) -> Optional[float]:
+    """Instante de publicación de un aviso (su pubDate o la marca de tiempo del GUID)"""
+    if pub_date:
+        try:
+            return parsedate_to_datetime(pub_date).timestamp()
+        except (TypeError, ValueError):
+            pass
+    if guid and '_' in guid:
+        suffix = guid.rpartition('_')[2]
+        if suffix.isdigit():
+            return float(suffix)
+    return None
+
+
+class AwsIncidentTracker:
+    """Seguimiento incremental de los avisos del feed de AWS por GUID
+
+    Los avisos ya procesados se guardan por GUID: en cada refresco solo se
+    clasifican los nuevos o los que cambiaron de título o descripción, y
+    solo se recalculan los incidentes de los servicios afectados. El estado
+    de cada servicio y región sale de su último aviso, con el ciclo de vida
+    de su incidente en `state`:
+
+    - `open`: el último aviso es un problema y abre el incidente
+    - `updated`: el incidente sigue abierto y ha recibido más avisos (un
+      aviso sin palabras de problema no lo cierra)
+    - `resolved`: el último aviso es de resolución, o solo hay avisos
+      informativos
+
+    Los avisos que desaparecen del feed se olvidan.
+    """
+
+    def __init__(self):
+        # GUID -> aviso procesado (texto original, entrada de servicio y orden)
+        self._items: Dict[str, Dict] = {}
+        # (servicio, región) -> GUIDs de sus avisos
+        self._keys: Dict[Tuple[str, str], Set[str]] = {}
+        # (servicio, región) -> incidente actual
+        self._incidents: Dict[Tuple[str, str], Dict] = {}
+        self._status: Optional[Dict] = None
+        self._generation = 0
+        # Los documentos pueden parsearse en hilos del ejecutor de parsers
+        self._lock = threading.Lock()
+        self.stats = {'documents': 0, 'items_processed': 0, 'items_skipped': 0, 'items_removed': 0}
+
+    def batch(self) -> 'AwsFeedBatch':
+        """Empezar a procesar un documento del feed"""
+        with self._lock:
+            self._generation += 1
+            return AwsFeedBatch(self, self._generation)
+
+    def _apply(self, batch: 'AwsFeedBatch') -> Dict:
+        """Aplicar los avisos nuevos, cambiados y retirados de un documento"""
+        with self._lock:
+            return self._apply_locked(batch)
+
+    def _apply_locked(self, batch: 'AwsFeedBatch') -> Dict:
+        self.stats['documents'] += 1
+        self.stats['items_processed'] += len(batch.changed)
+        self.stats['items_skipped'] += batch.skipped
+        affected = set()
+
+        for item_id in [item_id for item_id in self._items if item_id not in batch.seen]:
+            affected.add(self._forget(item_id))
+            self.stats['items_removed'] += 1
+
+        for record in batch.changed:
+            if record['id'] in self._items:
+                affected.add(self._forget(record['id']))
+            record['kind'] = classify_aws_notice(record['title'], record['description'])
+            entry = aws_item_to_service(record['title'], record['description'], record['guid'], record['kind'])
+            timestamp = parse_aws_item_timestamp(record['guid'], record['pub_date'])
+            record['entry'] = entry
+            record['timestamp'] = timestamp
+            record['key'] = (entry['service'] or entry['name'], entry['region'])
+            record['sort_key'] = (timestamp or 0.0,) + record['order']
+            self._items[record['id']] = record
+            self._keys.setdefault(record['key'], set()).add(record['id'])
+            affected.add(record['key'])
+
+        if affected or self._status is None:
+            for key in affected:
+                self._update_incident(key)
+            self._status = self._build_status()
+            logger.debug(f"Feed de AWS: {len(batch.changed)} avisos nuevos o cambiados, "
+                         f"{batch.skipped} sin cambios, {len(affected)} servicios recalculados")
+
+        status = dict(self._status)
+        status['last_updated'] = datetime.now().isoformat()
+        return status
+
+    def _forget(self, item_id: str) -> Tuple[str, str]:
+        """Olvidar un aviso y devolver la clave de su servicio"""
+        record = self._items.pop(item_id)
+        item_ids = self._keys[record['key']]
+        item_ids.discard(item_id)
+        if not item_ids:
+            del self._keys[record['key']]
+        return record['key']
+
+    def _update_incident(self, key: Tuple[str, str]):
+        """Recalcular el incidente de un servicio y región a partir de sus avisos"""
+        item_ids = self._keys.get(key)
+        if not item_ids:
+            self._incidents.pop(key, None)
+            return
+
+        history = sorted((self._items[item_id] for item_id in item_ids), key=lambda record: record['sort_key'])
+        state = None
+        opened = 0
+        for index, record in enumerate(history):
+            active = state in ('open', 'updated')
+            if record['kind'] == 'issue' and not active:
+                state, opened = 'open', index
+            elif record['kind'] == 'resolved' or not active:
+                if state is None:
+                    opened = index
+                state = 'resolved'
+            else:
+                state = 'updated'
+
+        latest = history[-1]
+        entry = dict(latest['entry'], state=state, updates=len(history) - opened)
+        if state != 'resolved':
+            entry['status'] = 'Issue'
+
+        if history[opened]['timestamp'] is not None:
+            entry['since'] = datetime.fromtimestamp(history[opened]['timestamp']).isoformat()
+        self._incidents[key] = {'id': latest['id'], 'entry': entry, 'sort_key': latest['sort_key']}
+
+    def _build_status(self) -> Dict:
+        """Construir el estado de AWS con el último aviso de cada servicio y región"""
+        incidents = sorted(self._incidents.values(), key=lambda incident: incident['sort_key'], reverse=True)
+        status = build_aws_status([incident['entry'] for incident in incidents])
+        # Historial completo de avisos, el más reciente primero (el último de
+        # cada servicio con el estado de su incidente)
+        latest = {incident['id']: incident['entry'] for incident in incidents}
+        status['components'] = [
+            latest.get(record['id'], record['entry'])
+            for record in sorted(self._items.values(), key=lambda record: record['sort_key'], reverse=True)
+        ]
+        return status
+
+
+class AwsFeedBatch:
+    """Avisos de un documento del feed pendientes de aplicar al seguimiento
+
+    Los cambios solo se aplican con `commit()`, de modo que un documento que
+    falla a mitad del parseo no altera el estado conocido.
+    """
+
+    def __init__(self, tracker: AwsIncidentTracker, generation: int):
+        self.tracker = tracker
+        self.generation = generation
+        self.seen: Set[str] = set()
+        self.changed: List[Dict] = []
+        self.skipped = 0
+        self._position = 0
+
+    def observe(self, guid: Optional[str], title: Optional[str], description: Optional[str],
+                pub_date: Optional[str] = None):
+        """Registrar un <item>; si ya se procesó sin cambios no se vuelve a clasificar"""
+        item_id = guid or title or ''
+        self.seen.add(item_id)
+        self._position += 1
+
+        known = self.tracker._items.get(item_id)
+        if known is not None and known['title'] == title and known['description'] == description:
+            self.skipped += 1
+            return
+        self.changed.append({
+            'id': item_id,
+            'guid': guid,
+            'title': title,
+            'description': description,
+            'pub_date': pub_date,
+            # Sin fecha, el orden del documento (el aviso más reciente primero)
+            'order': (self.generation, -self._position)
+        })
+
+    def commit(self) -> Dict:
+        """Aplicar el documento al seguimiento y devolver el estado de AWS"""
+        return self.tracker._apply(self)
+
+
+class AwsFeedStreamParser:
+    """Parser incremental del feed RSS de AWS
+
+    Recibe el documento por fragmentos, registra cada <item> en el
+    seguimiento en cuanto se cierra y lo elimina del árbol, de modo que la
+    memoria usada no depende del tamaño del feed. Con un `tracker`
+    compartido entre refrescos solo se procesan los avisos nuevos.
+    """
+
+    def __init__(self, tracker: Optional[AwsIncidentTracker] = None):
+        self._parser = ET.XMLPullParser(events=('start', 'end'))
+        self._channel = None
+        self._batch = (tracker or AwsIncidentTracker()).batch()
+        self.bytes_fed = 0
+        self.parse_seconds = 0.0
+        self.failed = False
+        # El feed se lee siempre completo: cualquier aviso puede cambiar el estado
+        self.done = False
+
+    def feed(self, chunk: bytes):
+        """Procesar un fragmento del documento"""
+        if self.failed:
+            return
+        start = time.perf_counter()
+        self.bytes_fed += len(chunk)
+        try:
+            self._parser.feed(chunk)
+            self._process_events()
+        except ET.ParseError as e:
+            logger.error(f"Error parseando datos de AWS: {e}")
+            self.failed = True
+        self.parse_seconds += time.perf_counter() - start
+
+    def _process_events(self):
+        """Registrar los <item> completos y liberar sus elementos"""
+        for event, elem in self._parser.read_events():
+            if event == 'start':
+                if elem.tag == 'channel':
+                    self._channel = elem
+            elif elem.tag == 'item':
+                self._batch.observe(elem.findtext('guid'), elem.findtext('title'),
+                                    elem.findtext('description'), elem.findtext('pubDate'))
+                elem.clear()
+                if self._channel is not None:
+                    self._channel.remove(elem)
+
+    def close(self) -> Dict:
+        """Terminar el parseo y devolver el estado de AWS"""
+        if not self.failed:
+            start = time.perf_counter()
+            try:
+                self._parser.close()
+                self._process_events()
+            except ET.ParseError as e:
+                logger.error(f"Error parseando datos de AWS: {e}")
+                self.failed = True
+            self.parse_seconds += time.perf_counter() - start
+
+        if self.failed:
+            return {"error": True, "message": "Error parseando datos"}
+        return self._batch.commit()
+
+
+def parse_aws_rss(data: Union[str, bytes], tracker: Optional[AwsIncidentTracker] = None) -> Dict:
+    """Parsear el feed RSS de AWS completo
+
+    Con un `tracker` compartido entre refrescos solo se procesan los avisos
+    nuevos o cambiados.
+    """
+    try:
+        root = ET.fromstring(data)
+        batch = (tracker or AwsIncidentTracker()).batch()
+        for item in root.iter('item'):
+            batch.observe(item.findtext('guid'), item.findtext('title'),
+                          item.findtext('description'), item.findtext('pubDate'))
+        return batch.commit()
+    except Exception as e:
+        logger.error(f"Error parseando datos de AWS: {e}")
+        return {"error": True, "message": "Error parseando datos"}
@@ -0,0 +1,651 @@
+#!/usr/bin/env python3
+"""
+Benchmarks del bot sobre páginas grabadas, sin acceso a la red
+
+Uso:
+    python benchmark.py --record        # Grabar las páginas actuales en fixtures/
+    python benchmark.py                 # Comparar clasificador anterior y actual
+    python benchmark.py --suite         # Latencias por etapa con un servidor local
+    python benchmark.py --suite --compare bench_baseline.json
+                                        # Marcar regresiones frente a una referencia
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List
+
+# Agregar el directorio actual al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from classifier import AZURE_CLASSIFIER, GCP_CLASSIFIER, OCI_CLASSIFIER
+from config import Config
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Páginas grabadas por proveedor
+FIXTURE_URLS = {
+    'azure.html': "https://status.azure.com/en-us/status/",
+    'gcp.html': "https://status.cloud.google.com/",
+    'gcp.json': "https://status.cloud.google.com/incidents.json",
+    'oci.html': "https://ocistatus.oraclecloud.com/",
+    'oci.json': "https://ocistatus.oraclecloud.com/api/v2/summary.json",
+    'aws.rss': "https://status.aws.amazon.com/rss/all.rss"
+}
+
+
+async def record_fixtures():
+    """Descargar las páginas de estado actuales a fixtures/"""
+    import aiohttp
+
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    timeout = aiohttp.ClientTimeout(total=Config.HTTP_TIMEOUT)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        for name, url in FIXTURE_URLS.items():
+            try:
+                async with session.get(url, headers=Config.HEADERS) as response:
+                    body = await response.read()
+                with open(os.path.join(FIXTURES_DIR, name), 'wb') as f:
+                    f.write(body)
+                print(f"   ✅ {name}: {len(body)} bytes")
+            except Exception as e:
+                print(f"   ❌ {name}: {e}")
+
+
+def synthetic_page(name: str, size: int = 2_000_000) -> bytes:
+    """Generar una página sintética cuando no hay una grabada"""
+    rng = random.Random(name)
+    words = ['status', 'region', 'service', 'compute', 'storage', 'network',
+             'available', 'history', '<div class="row">', '</div>', '<td>', '</td>']
+    parts = []
+    length = 0
+    while length < size:
+        word = rng.choice(words)
+        parts.append(word)
+        length += len(word) + 1
+    return ' '.join(parts).encode('utf-8')
+
+
+def synthetic_feed(items: int = 200) -> bytes:
+    """Generar un feed RSS sintético con el formato del de AWS"""
+    rng = random.Random('aws.rss')
+    services = ['ec2', 's3', 'lambda', 'rds', 'dynamodb', 'cloudfront', 'route53', 'sqs']
+    regions = ['us-east-1', 'us-west-2', 'eu-west-1', 'eu-central-1', 'ap-southeast-1']
+    parts = ['<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>AWS</title>']
+    for index in range(items):
+        service, region = rng.choice(services), rng.choice(regions)
+        description = rng.choice([
+            'Service is operating normally.',
+            'We are investigating increased error rates.',
+            'The issue has been resolved and the service is operating normally.'
+        ])
+        parts.append(
+            f'<item><title>Informational message: {service} ({region})</title>'
+            f'<guid>https://status.aws.amazon.com/#{service}-{region}_{index}</guid>'
+            f'<description>{description}</description></item>'
+        )
+    parts.append('</channel></rss>')
+    return ''.join(parts).encode('utf-8')
+
+
+def synthetic_incidents(incidents: int = 400) -> bytes:
+    """Generar un historial de incidentes sintético con el formato del de Google Cloud"""
+    rng = random.Random('gcp.json')
+    products = ['Compute Engine', 'Cloud Storage', 'BigQuery', 'Cloud SQL', 'Google Kubernetes Engine',
+                'Cloud Run', 'Pub/Sub', 'Cloud Load Balancing']
+    locations = ['us-central1', 'us-east1', 'europe-west1', 'europe-west4', 'asia-east1']
+    document = []
+    for index in range(incidents):
+        affected = rng.sample(locations, rng.randint(1, 3))
+        document.append({
+            'id': f'incident-{index}',
+            'uri': f'incidents/incident-{index}',
+            'begin': f'2024-01-{index % 28 + 1:02d}T10:00:00+00:00',
+            # Solo el último incidente sigue abierto
+            'end': None if index == incidents - 1 else f'2024-01-{index % 28 + 1:02d}T12:00:00+00:00',
+            'external_desc': rng.choice(['Elevated error rates', 'Increased latency', 'Degraded performance']),
+            'severity': rng.choice(['low', 'medium', 'high']),
+            'status_impact': rng.choice(['SERVICE_DISRUPTION', 'SERVICE_OUTAGE', 'SERVICE_INFORMATION']),
+            'affected_products': [{'title': title, 'id': title.lower()} for title in rng.sample(products, 2)],
+            'currently_affected_locations': [{'title': location, 'id': location} for location in affected],
+            'updates': [
+                {'when': '2024-01-01T10:00:00+00:00', 'text': 'We are investigating the issue. ' * 8}
+                for _ in range(rng.randint(2, 6))
+            ]
+        })
+    return json.dumps(document).encode('utf-8')
+
+
+def synthetic_summary(regions: int = 40) -> bytes:
+    """Generar un summary.json sintético con el formato de Statuspage"""
+    rng = random.Random('oci.json')
+    services = ['Compute', 'Block Volume', 'Object Storage', 'Networking', 'Autonomous Database',
+                'Identity', 'Load Balancer', 'Container Engine']
+    components = []
+    for region in range(regions):
+        group_id = f'group-{region}'
+        components.append({'id': group_id, 'name': f'Region {region}', 'status': 'operational', 'group': True})
+        for service in services:
+            components.append({
+                'id': f'{group_id}-{service}',
+                'name': service,
+                'status': rng.choices(['operational', 'degraded_performance'], weights=[200, 1])[0],
+                'group': False,
+                'group_id': group_id
+            })
+    document = {
+        'page': {'id': 'synthetic', 'name': 'Synthetic Status'},
+        'status': {'indicator': 'none', 'description': 'All Systems Operational'},
+        'components': components,
+        'incidents': [],
+        'scheduled_maintenances': []
+    }
+    return json.dumps(document).encode('utf-8')
+
+
+# Generadores de las páginas sintéticas que no son HTML
+SYNTHETIC_FIXTURES = {
+    'aws.rss': synthetic_feed,
+    'gcp.json': synthetic_incidents,
+    'oci.json': synthetic_summary
+}
+
+
+def is_recorded(name: str) -> bool:
+    """Si hay una página grabada en fixtures/ para `name`"""
+    return os.path.exists(os.path.join(FIXTURES_DIR, name))
+
+
+def origin(name: str) -> str:
+    """Origen de una página para los informes: grabada o sintética"""
+    return 'grabada' if is_recorded(name) else 'sintética'
+
+
+def load_fixture(name: str, quiet: bool = False) -> bytes:
+    """Cargar una página grabada o generar una sintética"""
+    path = os.path.join(FIXTURES_DIR, name)
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return f.read()
+    if not quiet:
+        print(f"   ⚠️ {name} no grabada, usando página sintética")
+    generator = SYNTHETIC_FIXTURES.get(name)
+    return generator() if generator else synthetic_page(name)
+
+
+# Implementación anterior de los clasificadores, como referencia
+def _legacy_azure(html_content: str) -> bool:
+    content_lower = html_content.lower()
+    active_issues = ["investigating", "service degradation", "service disruption",
+                     "partial outage", "major outage", "service unavailable"]
+    operational_indicators = ["all services are operating normally", "no issues reported",
+                              "all systems operational", "service is healthy"]
+    has_active_issues = any(indicator in content_lower for indicator in active_issues)
+    has_operational_indicators = any(indicator in content_lower for indicator in operational_indicators)
+    return has_active_issues and not has_operational_indicators
+
+
+def _legacy_gcp(html_content: str) -> bool:
+    content_lower = html_content.lower()
+    active_issues = ["investigating", "service degradation", "service disruption",
+                     "partial outage", "major outage", "service unavailable", "ongoing issue"]
+    operational_indicators = ["all services are operating normally", "no issues reported",
+                              "all systems operational", "service is healthy", "operational"]
+    has_active_issues = any(indicator in content_lower for indicator in active_issues)
+    has_operational_indicators = any(indicator in content_lower for indicator in operational_indicators)
+    return has_active_issues and not has_operational_indicators
+
+
+def _legacy_oci(html_content: str) -> bool:
+    return ("investigating" in html_content.lower() or "issue" in html_content.lower()
+            or "outage" in html_content.lower() or "degraded" in html_content.lower())
+
+
+def measure(func, iterations: int) -> float:
+    """Tiempo medio por llamada en milisegundos"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def benchmark_classifiers(iterations: int):
+    """Comparar el clasificador anterior con el actual"""
+    cases = [
+        ('Azure', 'azure.html', _legacy_azure, AZURE_CLASSIFIER),
+        ('GCP', 'gcp.html', _legacy_gcp, GCP_CLASSIFIER),
+        ('OCI', 'oci.html', _legacy_oci, OCI_CLASSIFIER)
+    ]
+
+    pages = {fixture: load_fixture(fixture) for _, fixture, _, _ in cases}
+
+    print(f"{'Proveedor':<10}{'Página':>11}{'Tamaño':>12}{'Anterior':>12}{'Actual':>12}{'Bytes':>12}  Resultado")
+    for provider, fixture, legacy, classifier in cases:
+        raw = pages[fixture]
+        text = raw.decode('utf-8', errors='replace')
+
+        legacy_result = legacy(text)
+        has_issues, _ = classifier.classify(text)
+        status = "✅" if legacy_result == has_issues else "❌ distinto"
+
+        legacy_ms = measure(lambda: legacy(text), iterations)
+        text_ms = measure(lambda: classifier.classify(text), iterations)
+        bytes_ms = measure(lambda: classifier.classify(raw), iterations)
+
+        print(f"{provider:<10}{origin(fixture):>11}{len(raw):>12}{legacy_ms:>10.2f}ms{text_ms:>10.2f}ms"
+              f"{bytes_ms:>10.2f}ms  {status}")
+    print_synthetic_warning([fixture for _, fixture, _, _ in cases if not is_recorded(fixture)])
+
+
+# Páginas grabadas de cada proveedor en la suite, en el orden de sus fuentes
+SUITE_FIXTURES = {
+    'azure': ['azure.html'],
+    'gcp': ['gcp.json', 'gcp.html'],
+    'aws': ['aws.rss'],
+    'oci': ['oci.json', 'oci.html']
+}
+
+# Tipo de contenido de las páginas servidas según su extensión
+FIXTURE_CONTENT_TYPES = {
+    '.rss': 'application/rss+xml',
+    '.json': 'application/json',
+    '.html': 'text/html'
+}
+
+
+class FixtureServer:
+    """Servidor HTTP local que sirve las páginas grabadas"""
+
+    def __init__(self, pages: Dict[str, bytes], port: int = 0):
+        self.pages = pages
+        self.port = port
+        self._runner = None
+
+    async def start(self):
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get('/{name}', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, '127.0.0.1', self.port).start()
+        # Con puerto 0 el sistema elige uno libre
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+    def url(self, name: str) -> str:
+        return f"http://127.0.0.1:{self.port}/{name}"
+
+    async def _handle(self, request):
+        from aiohttp import web
+
+        name = request.match_info['name']
+        if name not in self.pages:
+            return web.Response(status=404)
+        content_type = FIXTURE_CONTENT_TYPES.get(os.path.splitext(name)[1], 'text/html')
+        return web.Response(body=self.pages[name], content_type=content_type, charset='utf-8')
+
+
+def percentile(samples: List[float], percent: float) -> float:
+    """Percentil por rango más cercano de una lista de muestras"""
+    ordered = sorted(samples)
+    index = max(int(round(percent / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def summarize(samples: List[float]) -> Dict:
+    """Resumen en milisegundos de las muestras de una etapa (en segundos)"""
+    millis = [sample * 1000 for sample in samples]
+    return {
+        'samples': len(millis),
+        'mean_ms': round(sum(millis) / len(millis), 4),
+        'p50_ms': round(percentile(millis, 50), 4),
+        'p95_ms': round(percentile(millis, 95), 4),
+        'p99_ms': round(percentile(millis, 99), 4)
+    }
+
+
+def sample_sync(func, samples: int) -> List[float]:
+    """Medir una función síncrona `samples` veces tras una llamada de calentamiento"""
+    func()
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def sample_async(factory, samples: int) -> List[float]:
+    """Medir una corrutina `samples` veces tras una llamada de calentamiento"""
+    await factory()
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        await factory()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def run_suite(samples: int) -> Dict:
+    """Medir cada etapa de CloudStatusChecker y los renderizadores
+    
+    Etapas por fuente (página grabada, p. ej. `parse.gcp.json` frente a
+    `parse.gcp.html`):
+    - fetch: descarga de la página desde el servidor local
+    - parse: análisis de la página ya descargada con el parser de su fuente
+      (`.incremental` repite el análisis con el estado del refresco anterior)
+    - fetch/parse `.stream`: descarga y análisis incrementales, que se cortan
+      en cuanto la clasificación es definitiva
+    
+    Etapas por proveedor:
+    - provider: consulta completa (descarga + análisis de la fuente principal) sin caché
+    - cache_hit: respuesta desde la caché en memoria
+    - render: formateo del mensaje de Telegram
+    
+    Además, `lookup.aws` mide la consulta de un servicio y región (`/aws ec2
+    us-east-1`) en el índice y `render.lookup.aws` su mensaje, y
+    `loop_lag.<modo>` el retraso del bucle de eventos mientras se parsean las
+    páginas HTML grandes en el bucle (`inline`), en hilos o en procesos.
+    """
+    from cache_backends import MemoryCacheBackend
+    from cloud_status import CloudStatusChecker
+    from providers import PROVIDERS, StatusSource
+
+    # Los mensajes informativos por consulta distorsionan las medidas
+    logging.getLogger().setLevel(logging.WARNING)
+    Config.CACHE_DURATION = 3600
+    Config.ENABLE_STATISTICS = False
+    Config.HEDGED_REQUESTS = False
+    from telegram_bot import CloudStatusBot
+
+    pages = {name: load_fixture(name) for names in SUITE_FIXTURES.values() for name in names}
+    server = FixtureServer(pages)
+    await server.start()
+
+    # Copia del registro con cada fuente apuntando a su página grabada
+    providers = {}
+    for provider, names in SUITE_FIXTURES.items():
+        spec = providers[provider] = copy.copy(PROVIDERS[provider])
+        spec.sources = [
+            StatusSource(server.url(name), source.parser, source.stream_parser)
+            for name, source in zip(names, spec.sources)
+        ]
+    checker = CloudStatusChecker(cache_backend=MemoryCacheBackend(), providers=providers)
+    bot = CloudStatusBot()
+    results = {}
+    try:
+        provider_functions = checker._get_provider_functions()
+
+        for provider, spec in providers.items():
+            for name, source in zip(SUITE_FIXTURES[provider], spec.sources):
+                # Los parsers reciben el cuerpo en bytes, igual que desde la descarga
+                body = pages[name]
+
+                results[f'fetch.{name}'] = summarize(
+                    await sample_async(lambda: checker._make_request_with_retry(source.url), samples)
+                )
+                results[f'parse.{name}'] = summarize(sample_sync(lambda: source.parser(body), samples))
+                if source.stream_parser is not None:
+                    def stream_parse():
+                        parser = source.stream_parser()
+                        raw = pages[name]
+                        for offset in range(0, len(raw), Config.STREAM_CHUNK_SIZE):
+                            parser.feed(raw[offset:offset + Config.STREAM_CHUNK_SIZE])
+                            if parser.done:
+                                break
+                        return parser.close()
+                    results[f'parse.{name}.stream'] = summarize(sample_sync(stream_parse, samples))
+                    # Descarga incremental: se corta en cuanto el resultado es definitivo
+                    results[f'fetch.{name}.stream'] = summarize(await sample_async(
+                        lambda: checker._make_request_with_retry(source.url, stream_parser=source.stream_parser,
+                                                                 provider=name),
+                        samples
+                    ))
+                if spec.tracker is not None:
+                    # Refresco sin avisos nuevos: solo se comprueban los GUID ya vistos
+                    tracker = spec.tracker()
+                    source.parser(body, tracker=tracker)
+                    results[f'parse.{name}.incremental'] = summarize(
+                        sample_sync(lambda: source.parser(body, tracker=tracker), samples)
+                    )
+
+            results[f'provider.{provider}'] = summarize(
+                await sample_async(provider_functions[provider], samples)
+            )
+
+        # Llenar la caché y medir respuestas servidas desde memoria
+        status_data = await checker.get_all_status()
+        for provider in providers:
+            results[f'cache_hit.{provider}'] = summarize(
+                await sample_async(lambda: checker.get_provider_status(provider), samples)
+            )
+        results['cache_hit.all'] = summarize(await sample_async(checker.get_all_status, samples))
+
+        for provider, data in status_data.items():
+            results[f'render.{provider}'] = summarize(
+                sample_sync(lambda: bot._format_provider_status(data), samples)
+            )
+        results['render.all'] = summarize(sample_sync(lambda: bot._format_all_status(status_data), samples))
+
+        # Consulta de un servicio y región desde el índice frente al mensaje completo
+        lookup = await checker.lookup_service('aws', 'ec2', 'us-east-1')
+        results['lookup.aws'] = summarize(
+            await sample_async(lambda: checker.lookup_service('aws', 'ec2', 'us-east-1'), samples)
+        )
+        results['render.lookup.aws'] = summarize(sample_sync(lambda: bot._format_service_lookup(lookup), samples))
+        streaming = {
+            name: {key: stats[key] for key in ('fetches', 'decided', 'truncated', 'bytes_read',
+                                               'mean_decision_seconds')}
+            for name, stats in checker.get_stream_stats().items() if name in pages
+        }
+    finally:
+        await checker.close()
+        await server.stop()
+
+    # Bloqueo del bucle de eventos con las páginas HTML grandes según el ejecutor de parsers
+    jobs = [
+        (source.parser, pages[name])
+        for provider, names in SUITE_FIXTURES.items()
+        for name, source in zip(names, PROVIDERS[provider].sources)
+        if name.endswith('.html') and len(pages[name]) >= Config.PARSE_EXECUTOR_MIN_BYTES
+    ]
+    loop_blocking = await measure_loop_blocking(jobs, samples)
+    for mode, measure in loop_blocking.items():
+        results[f'loop_lag.{mode}'] = measure.pop('lags')
+
+    return {
+        'meta': {
+            'created': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'samples': samples,
+            'synthetic': sorted(name for name in pages if not is_recorded(name)),
+            'fixtures': {
+                name: {
+                    'bytes': len(page),
+                    'recorded': is_recorded(name)
+                }
+                for name, page in pages.items()
+            }
+        },
+        'results': results,
+        'loop_blocking': loop_blocking,
+        'streaming': streaming
+    }
+
+
+async def measure_loop_blocking(jobs: List, rounds: int) -> Dict[str, Dict]:
+    """Medir el retraso del bucle de eventos mientras se parsean páginas en cada modo
+
+    Un medidor con intervalo de 1 ms corre junto a `rounds` tandas de
+    parseos concurrentes; su retraso es el tiempo que el bucle no pudo
+    atender otras tareas (en el bot, otros usuarios).
+    """
+    from parse_pool import PARSE_MODES, LoopLagMonitor, ParsePool
+
+    measures = {}
+    for mode in PARSE_MODES:
+        pool = ParsePool(mode, workers=2, min_bytes=0)
+        # Arrancar los workers fuera de la medida
+        await asyncio.gather(*(pool.run(parser, body) for parser, body in jobs))
+
+        monitor = LoopLagMonitor(interval=0.001, warn_threshold=0, keep=1_000_000)
+        monitor.start()
+        await asyncio.sleep(0.005)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await asyncio.gather(*(pool.run(parser, body) for parser, body in jobs))
+        elapsed = time.perf_counter() - start
+        await monitor.stop()
+        pool.close()
+
+        measures[mode] = dict(monitor.summary(), wall_ms=round(elapsed * 1000, 3),
+                              lags=summarize(list(monitor.lags) or [0.0]))
+    return measures
+
+
+def print_loop_blocking(report: Dict):
+    """Comparar el bloqueo del bucle de eventos según el ejecutor de parsers"""
+    measures = report.get('loop_blocking', {})
+    if not measures:
+        return
+    print(f"\n{'Ejecutor':<12}{'bloqueado':>14}{'máx':>12}{'total':>14}")
+    for mode, measure in measures.items():
+        print(f"{mode:<12}{measure['blocked_ms']:>12.1f}ms{measure['max_ms']:>10.1f}ms{measure['wall_ms']:>12.1f}ms")
+
+
+def print_streaming(report: Dict):
+    """Comparar los bytes leídos en las descargas incrementales con el tamaño de cada página"""
+    streaming = report.get('streaming', {})
+    if not streaming:
+        return
+    fixtures = report['meta']['fixtures']
+    print(f"\n{'Descarga incremental':<22}{'Bytes':>12}{'leídos':>12}{'decisión':>12}")
+    for name, stats in streaming.items():
+        read = stats['bytes_read'] / stats['fetches']
+        print(f"{name:<22}{fixtures[name]['bytes']:>12}{read:>12.0f}{stats['mean_decision_seconds'] * 1000:>10.3f}ms")
+
+
+def print_results(results: Dict):
+    """Mostrar la tabla de latencias por etapa"""
+    print(f"{'Etapa':<28}{'p50':>12}{'p95':>12}{'p99':>12}")
+    for stage, summary in results.items():
+        print(f"{stage:<28}{summary['p50_ms']:>10.3f}ms{summary['p95_ms']:>10.3f}ms{summary['p99_ms']:>10.3f}ms")
+
+
+def print_sources(report: Dict):
+    """Comparar tamaño, descarga y análisis de las fuentes de cada proveedor"""
+    results = report['results']
+    fixtures = report['meta']['fixtures']
+    print(f"\n{'Fuente':<22}{'Página':>11}{'Bytes':>12}{'fetch p50':>12}{'parse p50':>12}")
+    for names in SUITE_FIXTURES.values():
+        for name in names:
+            fetch = results[f'fetch.{name}']['p50_ms']
+            parse = results[f'parse.{name}']['p50_ms']
+            page = 'grabada' if fixtures[name]['recorded'] else 'sintética'
+            print(f"{name:<22}{page:>11}{fixtures[name]['bytes']:>12}{fetch:>10.3f}ms{parse:>10.3f}ms")
+
+
+def print_synthetic_warning(names: List[str]):
+    """Avisar de que los resultados se midieron con páginas sintéticas"""
+    if names:
+        print(f"\n⚠️ Medido con páginas sintéticas ({', '.join(names)}): no representan las páginas reales. "
+              "Grabarlas con `python benchmark.py --record`.")
+
+
+def compare_results(current: Dict, baseline: Dict, threshold: float, min_delta_ms: float) -> List[str]:
+    """Comparar con una referencia y devolver las etapas que empeoraron
+    
+    Una etapa empeora si su p50 supera el de la referencia en más de
+    `threshold` por ciento y en más de `min_delta_ms` milisegundos (para no
+    marcar el ruido de las etapas muy rápidas). El p95 se muestra como
+    referencia, pero con pocas muestras es demasiado ruidoso para decidir.
+    """
+    regressions = []
+    print(f"\n{'Etapa':<22}{'p50 ref':>12}{'p50':>12}{'Cambio':>10}{'p95 ref':>12}{'p95':>12}{'Cambio':>10}")
+    for stage, summary in current.items():
+        reference = baseline.get(stage)
+        if reference is None:
+            print(f"{stage:<22}{'(nueva)':>12}")
+            continue
+
+        line = f"{stage:<22}"
+        regressed = False
+        for key in ('p50_ms', 'p95_ms'):
+            before, after = reference[key], summary[key]
+            change = (after - before) / before * 100 if before else 0.0
+            line += f"{before:>10.3f}ms{after:>10.3f}ms{change:>+9.1f}%"
+            if key == 'p50_ms' and change > threshold and after - before > min_delta_ms:
+                regressed = True
+        if regressed:
+            regressions.append(stage)
+            line += "  ❌ regresión"
+        print(line)
+    return regressions
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Benchmark del bot de estado cloud")
+    parser.add_argument('--record', action='store_true', help="Grabar las páginas actuales en fixtures/")
+    parser.add_argument('--iterations', type=int, default=20, help="Repeticiones por medida")
+    parser.add_argument('--suite', action='store_true', help="Medir latencias por etapa con un servidor local")
+    parser.add_argument('--samples', type=int, default=100, help="Muestras por etapa en la suite")
+    parser.add_argument('--output', default='bench_results.json', help="Archivo JSON de resultados de la suite")
+    parser.add_argument('--compare', metavar='BASELINE', help="Resultados de referencia con los que comparar")
+    parser.add_argument('--threshold', type=float, default=25.0,
+                        help="Empeoramiento en %% a partir del cual se marca una regresión")
+    parser.add_argument('--min-delta', type=float, default=0.1,
+                        help="Empeoramiento mínimo en ms para marcar una regresión")
+    args = parser.parse_args()
+
+    if args.record:
+        print("📥 Grabando páginas de estado...")
+        asyncio.run(record_fixtures())
+        return
+
+    if args.suite:
+        print("⏱️ Latencias por etapa (servidor local)")
+        print("=" * 50)
+        report = asyncio.run(run_suite(args.samples))
+        print_results(report['results'])
+        print_sources(report)
+        print_loop_blocking(report)
+        print_streaming(report)
+        print_synthetic_warning(report['meta']['synthetic'])
+
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Resultados guardados en {args.output}")
+
+        if args.compare:
+            with open(args.compare, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+            if baseline['meta'].get('synthetic') != report['meta']['synthetic']:
+                print("\n⚠️ La referencia y esta ejecución no usan las mismas páginas sintéticas; "
+                      "los tiempos de las fuentes afectadas no son comparables")
+            regressions = compare_results(report['results'], baseline['results'], args.threshold, args.min_delta)
+            if regressions:
+                print(f"\n❌ {len(regressions)} etapas empeoraron: {', '.join(regressions)}")
+                sys.exit(1)
+            print("\n✅ Sin regresiones frente a la referencia")
+        return
+
+    print("⏱️ Clasificadores HTML")
+    print("=" * 50)
+    benchmark_classifiers(args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+Backends de caché compartida para las instantáneas de estado de los proveedores
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+import uuid
+from typing import Dict, Optional
+from urllib.parse import urlparse
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend:
+    """Interfaz de caché de instantáneas con bloqueo distribuido
+
+    Una entrada es un diccionario con `status` (el resultado del proveedor),
+    `timestamp` (segundos epoch de la consulta) y `version`. `shared` indica
+    si otras réplicas ven las mismas entradas.
+    """
+
+    shared = True
+
+    async def get(self, provider: str) -> Optional[Dict]:
+        """Obtener la instantánea guardada de un proveedor"""
+        raise NotImplementedError
+
+    async def set(self, provider: str, entry: Dict):
+        """Guardar la instantánea de un proveedor"""
+        raise NotImplementedError
+
+    async def acquire_lock(self, provider: str, ttl: int) -> Optional[str]:
+        """Intentar bloquear el refresco de un proveedor durante `ttl` segundos
+
+        Devuelve un token si se obtuvo el bloqueo o None si lo tiene otro.
+        """
+        raise NotImplementedError
+
+    async def release_lock(self, provider: str, token: str):
+        """Liberar el bloqueo si sigue perteneciendo a `token`"""
+        raise NotImplementedError
+
+    async def close(self):
+        """Liberar recursos"""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Caché en memoria del propio proceso (sin compartir entre réplicas)"""
+
+    shared = False
+
+    def __init__(self):
+        self._entries: Dict[str, Dict] = {}
+        self._locks: Dict[str, tuple] = {}
+
+    async def get(self, provider: str) -> Optional[Dict]:
+        return self._entries.get(provider)
+
+    async def set(self, provider: str, entry: Dict):
+        self._entries[provider] = entry
+
+    async def acquire_lock(self, provider: str, ttl: int) -> Optional[str]:
+        lock = self._locks.get(provider)
+        if lock is not None and lock[1] > time.monotonic():
+            return None
+        token = uuid.uuid4().hex
+        self._locks[provider] = (token, time.monotonic() + ttl)
+        return token
+
+    async def release_lock(self, provider: str, token: str):
+        lock = self._locks.get(provider)
+        if lock is not None and lock[0] == token:
+            del self._locks[provider]
+
+
+class RedisCacheBackend(CacheBackend):
+    """Caché compartida en un servidor que habla el protocolo de Redis (RESP)
+
+    Usa una única conexión con los comandos GET, SET (NX/PX) y DEL, de modo
+    que funciona con Redis, Valkey, KeyDB o cualquier sustituto compatible.
+    La conexión y cada comando tienen un límite de `timeout` segundos: un
+    servidor que no responde no deja colgadas las consultas de proveedores.
+    """
+
+    def __init__(self, url: str = 'redis://localhost:6379/0', prefix: str = 'cloudstatus:',
+                 timeout: float = 2.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.prefix = prefix
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+        self._lock = asyncio.Lock()
+
+    async def _connect(self):
+        """Abrir la conexión y autenticarse si hace falta"""
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            await self._send('AUTH', self.password)
+        if self.db:
+            await self._send('SELECT', str(self.db))
+
+    async def _send(self, *args):
+        """Enviar un comando y leer su respuesta"""
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode('utf-8')
+            parts.append(f"${len(data)}\r\n".encode() + data + b"\r\n")
+        self._writer.write(b''.join(parts))
+        await self._writer.drain()
+        return await self._read_reply()
+
+    async def _read_reply(self):
+        """Leer una respuesta RESP"""
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("Conexión cerrada por el servidor de caché")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b'+':
+            return payload.decode()
+        if kind == b'-':
+            raise RuntimeError(payload.decode())
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length == -1:
+                return None
+            data = await self._reader.readexactly(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            count = int(payload)
+            if count == -1:
+                return None
+            return [await self._read_reply() for _ in range(count)]
+        raise RuntimeError(f"Respuesta RESP inesperada: {line!r}")
+
+    async def _connect_and_send(self, *args):
+        if self._writer is None or self._writer.is_closing():
+            await self._connect()
+        return await self._send(*args)
+
+    def _drop_connection(self):
+        """Descartar la conexión; el siguiente comando vuelve a conectar"""
+        if self._writer is not None:
+            self._writer.close()
+        self._writer = None
+
+    async def _command(self, *args):
+        """Ejecutar un comando reconectando una vez si la conexión se perdió"""
+        async with self._lock:
+            for attempt in range(2):
+                try:
+                    return await asyncio.wait_for(self._connect_and_send(*args), self.timeout)
+                except asyncio.TimeoutError:
+                    # La respuesta pendiente desincronizaría la conexión: no se reutiliza
+                    self._drop_connection()
+                    raise
+                except (ConnectionError, asyncio.IncompleteReadError, OSError):
+                    self._drop_connection()
+                    if attempt == 1:
+                        raise
+
+    async def get(self, provider: str) -> Optional[Dict]:
+        data = await self._command('GET', f"{self.prefix}snapshot:{provider}")
+        return json.loads(data) if data else None
+
+    async def set(self, provider: str, entry: Dict):
+        await self._command('SET', f"{self.prefix}snapshot:{provider}", json.dumps(entry, ensure_ascii=False))
+
+    async def acquire_lock(self, provider: str, ttl: int) -> Optional[str]:
+        token = uuid.uuid4().hex
+        result = await self._command('SET', f"{self.prefix}lock:{provider}", token, 'NX', 'PX', str(int(ttl * 1000)))
+        return token if result == 'OK' else None
+
+    async def release_lock(self, provider: str, token: str):
+        key = f"{self.prefix}lock:{provider}"
+        # Comprobar y borrar no es atómico; como mucho se libera un bloqueo ya caducado
+        current = await self._command('GET', key)
+        if current is not None and current.decode() == token:
+            await self._command('DEL', key)
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except Exception:
+                pass
+            self._writer = None
+
+
+class DiskCacheBackend(CacheBackend):
+    """Caché en disco local compartida por las réplicas de una misma máquina
+
+    Cada instantánea es un archivo JSON escrito de forma atómica y cada
+    bloqueo un archivo creado en exclusiva que guarda su caducidad.
+    """
+
+    def __init__(self, directory: str = '.cache'):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, provider: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{provider}.{suffix}")
+
+    async def _run(self, func, *args):
+        """Ejecutar la E/S de disco fuera del bucle de eventos"""
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    def _read(self, provider: str) -> Optional[Dict]:
+        try:
+            with open(self._path(provider, 'json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write(self, provider: str, entry: Dict):
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{provider}.", suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(provider, 'json'))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _acquire(self, provider: str, ttl: int) -> Optional[str]:
+        path = self._path(provider, 'lock')
+        token = uuid.uuid4().hex
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                # Eliminar el bloqueo si ya caducó y volver a intentarlo
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        expires = float(f.read().split()[1])
+                except FileNotFoundError:
+                    expires = 0
+                except (IndexError, ValueError):
+                    # Recién creado por otra réplica que aún no escribió su
+                    # caducidad: se considera vigente durante `ttl` desde su creación
+                    try:
+                        expires = os.path.getmtime(path) + ttl
+                    except FileNotFoundError:
+                        expires = 0
+                if expires > time.time():
+                    return None
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                continue
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(f"{token} {time.time() + ttl}")
+            return token
+        return None
+
+    def _release(self, provider: str, token: str):
+        path = self._path(provider, 'lock')
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                owner = f.read().split()[0]
+            if owner == token:
+                os.remove(path)
+        except (FileNotFoundError, IndexError):
+            pass
+
+    async def get(self, provider: str) -> Optional[Dict]:
+        return await self._run(self._read, provider)
+
+    async def set(self, provider: str, entry: Dict):
+        await self._run(self._write, provider, entry)
+
+    async def acquire_lock(self, provider: str, ttl: int) -> Optional[str]:
+        return await self._run(self._acquire, provider, ttl)
+
+    async def release_lock(self, provider: str, token: str):
+        await self._run(self._release, provider, token)
+
+
+def create_cache_backend(kind: str, redis_url: str = None, directory: str = None,
+                         redis_timeout: float = 2.0) -> CacheBackend:
+    """Crear el backend de caché configurado"""
+    if kind == 'redis':
+        return RedisCacheBackend(redis_url, timeout=redis_timeout)
+    if kind == 'disk':
+        return DiskCacheBackend(directory)
+    return MemoryCacheBackend()
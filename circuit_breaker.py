@@ -0,0 +1,78 @@
+"""
+Circuit breaker para las consultas a proveedores y URLs de estado
+"""
+
+import time
+from typing import Dict
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Circuit breaker con estados cerrado, abierto y semiabierto
+
+    Tras `failure_threshold` fallos seguidos el circuito se abre y las
+    consultas se rechazan sin intentarlas. Pasados `reset_timeout` segundos
+    pasa a semiabierto y deja pasar una única consulta de prueba: si sale
+    bien se cierra y si falla vuelve a abrirse.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._probing = False
+
+    def allow(self) -> bool:
+        """Indicar si se puede intentar una consulta ahora"""
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = HALF_OPEN
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        """Registrar una consulta correcta"""
+        self.state = CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        """Registrar una consulta fallida"""
+        self.failures += 1
+        self._probing = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.times_opened += 1
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """Liberar la consulta de prueba si se canceló sin resultado"""
+        self._probing = False
+
+    def retry_in(self) -> float:
+        """Segundos hasta la próxima consulta de prueba (0 si no está abierto)"""
+        if self.state != OPEN:
+            return 0.0
+        return max(self.reset_timeout - (time.monotonic() - self.opened_at), 0.0)
+
+    def snapshot(self) -> Dict:
+        """Estado actual para métricas"""
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'times_opened': self.times_opened,
+            'rejected': self.rejected,
+            'retry_in': round(self.retry_in(), 1)
+        }
@@ -0,0 +1,183 @@
+"""
+Motor de clasificación de estado por palabras clave para las páginas HTML
+"""
+
+from typing import Dict, Iterable, List, Tuple, Union
+
+Content = Union[str, bytes]
+
+# Tamaño de los tramos en que se analiza el contenido: cada operación en C
+# retiene el GIL durante un tramo y no durante toda la página, así el bucle
+# de eventos sigue atendiendo mientras se clasifica en un hilo del ejecutor
+SCAN_CHUNK_SIZE = 262144
+
+
+class KeywordClassifier:
+    """Clasificador de estado basado en indicadores de texto
+
+    Una página se considera con problemas si contiene algún indicador de
+    problema y ningún indicador de estado operativo. Las tablas de palabras
+    clave se preparan una sola vez (en minúsculas, como `str` y como `bytes`)
+    y el contenido se pasa a minúsculas una única vez por clasificación, por
+    tramos de SCAN_CHUNK_SIZE.
+    """
+
+    def __init__(self, issue_keywords: Iterable[str], operational_keywords: Iterable[str] = ()):
+        self.issue_keywords = tuple(keyword.lower() for keyword in issue_keywords)
+        self.operational_keywords = tuple(keyword.lower() for keyword in operational_keywords)
+        self._tables = {
+            str: (self.issue_keywords, self.operational_keywords),
+            bytes: (
+                tuple(keyword.encode('utf-8') for keyword in self.issue_keywords),
+                tuple(keyword.encode('utf-8') for keyword in self.operational_keywords)
+            )
+        }
+        # Solape entre tramos para que ningún indicador quede partido entre dos
+        self._overlap = max(
+            (len(keyword.encode('utf-8')) for keyword in self.issue_keywords + self.operational_keywords),
+            default=1
+        ) - 1
+
+    def _prepare(self, content: Content) -> Tuple[List[Tuple[int, Content]], Tuple]:
+        """Pasar el contenido a minúsculas por tramos y elegir la tabla de su tipo
+
+        Devuelve los tramos como (posición, texto en minúsculas).
+        """
+        if isinstance(content, (bytearray, memoryview)):
+            content = bytes(content)
+        table = self._tables[type(content)]
+        # bytes.lower() solo convierte ASCII, suficiente para los indicadores
+        if len(content) <= SCAN_CHUNK_SIZE:
+            return [(0, content.lower())], table
+        return [
+            (offset, content[offset:offset + SCAN_CHUNK_SIZE + self._overlap].lower())
+            for offset in range(0, len(content), SCAN_CHUNK_SIZE)
+        ], table
+
+    @staticmethod
+    def _find(pieces: List[Tuple[int, Content]], keyword: Content) -> int:
+        """Primera posición de un indicador en los tramos, o -1"""
+        for offset, piece in pieces:
+            position = piece.find(keyword)
+            if position != -1:
+                return offset + position
+        return -1
+
+    @classmethod
+    def _find_first(cls, pieces: List[Tuple[int, Content]], keywords: Tuple) -> Dict[str, int]:
+        """Devolver el primer indicador encontrado y su posición"""
+        for keyword in keywords:
+            position = cls._find(pieces, keyword)
+            if position != -1:
+                return {_as_text(keyword): position}
+        return {}
+
+    @classmethod
+    def _find_all(cls, pieces: List[Tuple[int, Content]], keywords: Tuple) -> Dict[str, int]:
+        """Devolver todos los indicadores encontrados y su primera posición"""
+        matches = {}
+        for keyword in keywords:
+            position = cls._find(pieces, keyword)
+            if position != -1:
+                matches[_as_text(keyword)] = position
+        return matches
+
+    def scan(self, content: Content) -> Dict[str, Dict[str, int]]:
+        """Buscar todos los indicadores y su primera posición en el contenido"""
+        content, (issue_keywords, operational_keywords) = self._prepare(content)
+        return {
+            'issue': self._find_all(content, issue_keywords),
+            'operational': self._find_all(content, operational_keywords)
+        }
+
+    def classify(self, content: Content) -> Tuple[bool, Dict[str, Dict[str, int]]]:
+        """Clasificar el contenido
+
+        Devuelve si hay problemas activos y los indicadores que decidieron el
+        resultado. La búsqueda se detiene en cuanto la decisión es definitiva.
+        """
+        content, (issue_keywords, operational_keywords) = self._prepare(content)
+        matches = {'issue': self._find_first(content, issue_keywords), 'operational': {}}
+        if matches['issue']:
+            matches['operational'] = self._find_first(content, operational_keywords)
+        return bool(matches['issue']) and not matches['operational'], matches
+
+
+class KeywordStreamMatcher:
+    """Clasificación incremental de un contenido que llega por fragmentos
+
+    Busca los indicadores de `classifier` en cada fragmento (en bytes, sin
+    decodificar) y conserva del anterior lo justo para encontrar los que
+    quedan partidos entre dos. La clasificación es definitiva (`decided`) en
+    cuanto aparece un indicador de estado operativo, o un indicador de
+    problema si el clasificador no tiene indicadores operativos: el resto
+    del contenido ya no puede cambiarla.
+    """
+
+    def __init__(self, classifier: KeywordClassifier):
+        self.classifier = classifier
+        issue_keywords, operational_keywords = classifier._tables[bytes]
+        # Indicadores aún no encontrados por tipo
+        self._pending = {'issue': list(issue_keywords), 'operational': list(operational_keywords)}
+        self.matches: Dict[str, Dict[str, int]] = {'issue': {}, 'operational': {}}
+        self._tail = b''
+        self.bytes_fed = 0
+
+    @property
+    def decided(self) -> bool:
+        """Si la clasificación ya no depende del contenido pendiente"""
+        if self.matches['operational']:
+            return True
+        return bool(self.matches['issue']) and not self.classifier.operational_keywords
+
+    def feed(self, chunk: bytes) -> bool:
+        """Buscar los indicadores en un fragmento; devuelve si la clasificación es definitiva"""
+        text = self._tail + bytes(chunk).lower()
+        offset = self.bytes_fed - len(self._tail)
+        for kind, keywords in self._pending.items():
+            for keyword in list(keywords):
+                position = text.find(keyword)
+                if position != -1:
+                    self.matches[kind][_as_text(keyword)] = offset + position
+                    keywords.remove(keyword)
+        overlap = self.classifier._overlap
+        self._tail = text[-overlap:] if overlap else b''
+        self.bytes_fed += len(chunk)
+        return self.decided
+
+    def result(self) -> Tuple[bool, Dict[str, Dict[str, int]]]:
+        """Clasificación con el contenido recibido, como `KeywordClassifier.classify`"""
+        return bool(self.matches['issue']) and not self.matches['operational'], self.matches
+
+
+def _as_text(keyword: Content) -> str:
+    """Devolver el indicador siempre como texto"""
+    return keyword.decode('utf-8') if isinstance(keyword, bytes) else keyword
+
+
+# Indicadores de problemas activos comunes a Azure y GCP
+_ACTIVE_ISSUES = [
+    "investigating",
+    "service degradation",
+    "service disruption",
+    "partial outage",
+    "major outage",
+    "service unavailable"
+]
+
+# Indicadores de estado operativo comunes a Azure y GCP
+_OPERATIONAL_INDICATORS = [
+    "all services are operating normally",
+    "no issues reported",
+    "all systems operational",
+    "service is healthy"
+]
+
+AZURE_CLASSIFIER = KeywordClassifier(_ACTIVE_ISSUES, _OPERATIONAL_INDICATORS)
+
+GCP_CLASSIFIER = KeywordClassifier(
+    _ACTIVE_ISSUES + ["ongoing issue"],
+    _OPERATIONAL_INDICATORS + ["operational"]
+)
+
+OCI_CLASSIFIER = KeywordClassifier(["investigating", "issue", "outage", "degraded"])
@@ -1,357 +1,928 @@
 import asyncio
 import aiohttp
-import json
 import time
+from contextlib import asynccontextmanager, nullcontext
+from functools import partial
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
+from urllib.parse import urlsplit
 import logging
 from config import Config
-import re
+from cache_backends import CacheBackend, create_cache_backend
+from circuit_breaker import CircuitBreaker
+from latency import LatencyHistogram
+from providers import PROVIDERS, ProviderSpec, StatusSource
+from service_index import ServiceIndex
+from snapshot_store import SnapshotStore
+from parse_pool import ParsePool
+from tracing import span
+from metrics import (CACHE_REQUESTS, PARSE_SECONDS, STREAM_BYTES_SKIPPED, STREAM_DECISION_SECONDS,
+                     UPSTREAM_REQUEST_SECONDS, UPSTREAM_RESPONSE_BYTES, UPSTREAM_RETRIES)
 
 # Configurar logging
 logging.basicConfig(level=getattr(logging, Config.LOG_LEVEL))
 logger = logging.getLogger(__name__)
 
+# Marcador de respuesta HTTP 304 Not Modified
+NOT_MODIFIED = object()
+
+# Nota de los resultados por defecto cuando ninguna URL del proveedor respondió
+ASSUMED_STATUS_NOTE = 'Estado asumido - no se pudo verificar'
+
+# Intervalo de consulta de la caché compartida mientras otra réplica refresca (segundos)
+SHARED_SNAPSHOT_POLL_INTERVAL = 0.2
+
 class CloudStatusChecker:
     """Clase para verificar el estado de los servicios cloud"""
     
-    def __init__(self):
+    def __init__(self, cache_backend: Optional[CacheBackend] = None,
+                 providers: Optional[Dict[str, ProviderSpec]] = None,
+                 snapshot_store: Optional[SnapshotStore] = None,
+                 parse_pool: Optional[ParsePool] = None):
+        # Proveedores consultados (por defecto el registro de providers.py), por prioridad
+        self.providers: Dict[str, ProviderSpec] = dict(providers if providers is not None else PROVIDERS)
+        # Copia local de las instantáneas; la caché compartida está en cache_backend
         self.cache = {}
         self.cache_timestamps = {}
+        # Versión de la instantánea en caché de cada proveedor
+        self.cache_versions: Dict[str, int] = {}
+        self.cache_backend = cache_backend or create_cache_backend(
+            Config.CACHE_BACKEND, redis_url=Config.REDIS_URL, directory=Config.CACHE_DIR,
+            redis_timeout=Config.REDIS_TIMEOUT
+        )
         self.session = None
+        # Peticiones en curso por proveedor (single-flight)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Métricas de deduplicación por proveedor
+        self.coalescing_stats: Dict[str, Dict[str, int]] = {}
+        # Tareas de refresco periódico en segundo plano
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
+        # Validadores HTTP (ETag / Last-Modified) y último resultado por URL
+        self.validators: Dict[str, Dict] = {}
+        # Métricas de peticiones condicionales por proveedor
+        self.conditional_stats: Dict[str, Dict] = {}
+        # Métricas de las descargas incrementales por proveedor (bytes leídos y tiempo hasta el resultado)
+        self.stream_stats: Dict[str, Dict] = {}
+        self._backend_available = True
+        self._snapshot_listeners: List = []
+        # Histogramas de latencia por URL y métricas de peticiones con cobertura
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.hedge_stats: Dict[str, Dict[str, int]] = {}
+        # Circuit breakers por proveedor y por URL
+        self.provider_breakers: Dict[str, CircuitBreaker] = {}
+        self.url_breakers: Dict[str, CircuitBreaker] = {}
+        # Instante (monotónico) hasta el que no se reintenta un proveedor que falló
+        self.failed_until: Dict[str, float] = {}
+        # Índice por servicio y región de la última instantánea de cada proveedor
+        self.service_index = ServiceIndex()
+        # Estado incremental de los proveedores que lo declaran (avisos ya procesados)
+        self.trackers: Dict[str, object] = {
+            key: spec.tracker() for key, spec in self.providers.items() if spec.tracker is not None
+        }
+        # Límites de peticiones simultáneas a páginas de estado, en total y por host
+        self._fetch_slots = asyncio.Semaphore(Config.MAX_CONCURRENT_FETCHES)
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        # Instantáneas persistentes en disco para arranques en caliente (None = sin persistencia)
+        self.snapshot_store = snapshot_store
+        # Proveedores servidos desde el disco, obsoletos hasta su primer refresco
+        self._restored: set = set()
+        # Versiones guardadas en el último volcado a disco
+        self._saved_versions: Dict[str, int] = {}
+        self._snapshot_task: Optional[asyncio.Task] = None
+        # Ejecutor de los parsers, fuera del bucle de eventos para las páginas grandes
+        self.parse_pool = parse_pool or ParsePool(
+            Config.PARSE_EXECUTOR, Config.PARSE_WORKERS, Config.PARSE_EXECUTOR_MIN_BYTES
+        )
     
     async def _get_session(self):
         """Obtener sesión HTTP reutilizable"""
         if self.session is None or self.session.closed:
             timeout = aiohttp.ClientTimeout(total=Config.HTTP_TIMEOUT)
-            self.session = aiohttp.ClientSession(timeout=timeout)
+            self.session = aiohttp.ClientSession(timeout=timeout, connector=self._create_connector())
         return self.session
     
-    async def _make_request_with_retry(self, url: str, headers: dict = None) -> Optional[str]:
-        """Realizar petición HTTP con reintentos"""
+    def _create_connector(self) -> aiohttp.TCPConnector:
+        """Crear el pool de conexiones compartido por todas las consultas
+        
+        Limita las conexiones totales y por host, mantiene vivas las conexiones
+        entre refrescos y guarda en caché las resoluciones DNS.
+        """
+        options = {
+            'limit': Config.HTTP_POOL_LIMIT,
+            'limit_per_host': Config.HTTP_POOL_LIMIT_PER_HOST,
+            'keepalive_timeout': Config.HTTP_KEEPALIVE_TIMEOUT,
+            'ttl_dns_cache': Config.DNS_CACHE_TTL
+        }
+        if Config.HAPPY_EYEBALLS_DELAY is not None:
+            options['happy_eyeballs_delay'] = Config.HAPPY_EYEBALLS_DELAY
+        return aiohttp.TCPConnector(**options)
+    
+    async def warm_up(self) -> Dict[str, bool]:
+        """Resolver y abrir de antemano una conexión con cada host de estado
+        
+        Hace una petición HEAD a cada origen para que DNS, TCP y TLS queden
+        resueltos y la conexión quede en el pool antes de la primera consulta.
+        Devuelve qué orígenes respondieron.
+        """
+        origins = []
+        for spec in self.providers.values():
+            for url in spec.urls:
+                parsed = urlsplit(url)
+                origin = f"{parsed.scheme}://{parsed.netloc}/"
+                if origin not in origins:
+                    origins.append(origin)
+        
         session = await self._get_session()
-        headers = headers or Config.HEADERS
+        start = time.perf_counter()
         
-        for attempt in range(Config.MAX_RETRIES):
+        async def connect(origin: str) -> bool:
             try:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        return await response.text()
-                    else:
-                        logger.warning(f"HTTP {response.status} para {url}")
-            except asyncio.TimeoutError:
-                logger.warning(f"Timeout en intento {attempt + 1} para {url}")
+                async with self._upstream_slot(origin), \
+                        session.head(origin, headers=Config.HEADERS, allow_redirects=False):
+                    return True
             except Exception as e:
-                logger.warning(f"Error en intento {attempt + 1} para {url}: {e}")
+                logger.debug(f"No se pudo precalentar {origin}: {e}")
+                return False
+        
+        results = dict(zip(origins, await asyncio.gather(*[connect(origin) for origin in origins])))
+        logger.info(
+            f"Conexiones precalentadas: {sum(results.values())}/{len(origins)} hosts "
+            f"en {time.perf_counter() - start:.2f}s"
+        )
+        return results
+    
+    @asynccontextmanager
+    async def _upstream_slot(self, url: str):
+        """Reservar un hueco para una petición a una página de estado
+        
+        Limita las peticiones simultáneas a MAX_CONCURRENT_FETCHES en total y a
+        MAX_FETCHES_PER_HOST por host. La espera ocurre antes de la petición,
+        así no consume su timeout ni cuenta en su latencia. Primero se reserva
+        el hueco del host para no ocupar uno global mientras se espera al host.
+        """
+        host = urlsplit(url).netloc
+        host_slot = self._host_slots.get(host)
+        if host_slot is None:
+            host_slot = self._host_slots[host] = asyncio.Semaphore(Config.MAX_FETCHES_PER_HOST)
+        
+        queued = host_slot.locked() or self._fetch_slots.locked()
+        with span('http.queue', host=host) if queued else nullcontext():
+            await host_slot.acquire()
+            try:
+                await self._fetch_slots.acquire()
+            except BaseException:
+                host_slot.release()
+                raise
+        try:
+            yield
+        finally:
+            self._fetch_slots.release()
+            host_slot.release()
+    
+    async def _make_request_with_retry(self, url: str, headers: dict = None, validators: dict = None,
+                                       stream_parser=None, provider: str = 'unknown'):
+        """Realizar petición HTTP con reintentos
+        
+        Si se pasa `validators`, se envían `If-None-Match`/`If-Modified-Since`
+        con los valores guardados y el diccionario se actualiza con el `ETag`,
+        el `Last-Modified` y el tamaño de la respuesta recibida. Una respuesta
+        304 devuelve `NOT_MODIFIED`.
+        
+        Devuelve el cuerpo en bytes, sin decodificar: los parsers lo aceptan
+        así y se evita una copia. Si se pasa `stream_parser` (una fábrica de
+        parsers incrementales), el cuerpo se entrega al parser por fragmentos
+        según llega y se devuelve el resultado ya parseado; la lectura se
+        corta en cuanto el parser tiene el resultado definitivo o al llegar
+        a los bytes máximos del proveedor.
+        
+        Cada intento se registra en las métricas con la etiqueta `provider`.
+        """
+        session = await self._get_session()
+        headers = dict(headers or Config.HEADERS)
+        
+        if validators is not None:
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+        
+        for attempt in range(Config.MAX_RETRIES):
+            if attempt:
+                UPSTREAM_RETRIES.inc(provider, url)
+            with span('http.attempt', provider=provider, url=url, attempt=attempt + 1) as attempt_span:
+                async with self._upstream_slot(url):
+                    start = time.perf_counter()
+                    try:
+                        async with session.get(url, headers=headers) as response:
+                            attempt_span.set('status', response.status)
+                            if response.status == 200 and stream_parser is not None:
+                                parser = stream_parser()
+                                result = await self._read_streaming(response, parser, validators, provider, start)
+                                self._record_latency(url, time.perf_counter() - start, provider, '200')
+                                UPSTREAM_RESPONSE_BYTES.inc(provider, url, amount=parser.bytes_fed)
+                                return result
+                            elif response.status == 200:
+                                body = await response.read()
+                                self._record_latency(url, time.perf_counter() - start, provider, '200')
+                                UPSTREAM_RESPONSE_BYTES.inc(provider, url, amount=len(body))
+                                if validators is not None:
+                                    validators['etag'] = response.headers.get('ETag')
+                                    validators['last_modified'] = response.headers.get('Last-Modified')
+                                    validators['body_bytes'] = len(body)
+                                return body
+                            elif response.status == 304 and validators is not None:
+                                self._record_latency(url, time.perf_counter() - start, provider, '304')
+                                return NOT_MODIFIED
+                            else:
+                                UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - start, provider, url, str(response.status))
+                                logger.warning(f"HTTP {response.status} para {url}")
+                    except asyncio.TimeoutError:
+                        attempt_span.set('status', 'timeout')
+                        UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - start, provider, url, 'timeout')
+                        logger.warning(f"Timeout en intento {attempt + 1} para {url}")
+                    except Exception as e:
+                        attempt_span.set('status', 'error')
+                        UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - start, provider, url, 'error')
+                        logger.warning(f"Error en intento {attempt + 1} para {url}: {e}")
             
             if attempt < Config.MAX_RETRIES - 1:
-                await asyncio.sleep(1 * (attempt + 1))  # Backoff exponencial
+                with span('http.backoff', url=url, seconds=attempt + 1):
+                    await asyncio.sleep(1 * (attempt + 1))  # Backoff exponencial
         
         return None
     
-    async def get_azure_status(self) -> Dict:
-        """Obtener estado de Azure"""
-        try:
-            # Intentar múltiples fuentes para Azure
-            urls = [
-                "https://status.azure.com/en-us/status/",
-                "https://azure.microsoft.com/en-us/status/"
-            ]
-            
-            for url in urls:
-                html_content = await self._make_request_with_retry(url)
-                if html_content:
-                    return self._parse_azure_html(html_content)
-            
-            # Si todas las URLs fallan, devolver estado operativo por defecto
-            return {
-                'provider': 'Azure',
-                'overall_status': 'Operational',
-                'services': [{'name': 'Azure Services', 'status': 'Operational', 'region': 'Global'}],
-                'last_updated': datetime.now().isoformat(),
-                'note': 'Estado asumido - no se pudo verificar'
-            }
-                
-        except Exception as e:
-            logger.error(f"Error obteniendo estado de Azure: {e}")
-            return {"error": True, "message": str(e)}
+    async def _read_streaming(self, response: aiohttp.ClientResponse, parser, validators: dict = None,
+                              provider: str = 'unknown', start: Optional[float] = None) -> Dict:
+        """Entregar el cuerpo de la respuesta a un parser incremental por fragmentos
+        
+        La lectura termina antes del final del cuerpo si el parser marca
+        `done` (resultado definitivo), si falla o al llegar a los bytes
+        máximos del proveedor; en ese caso se cierra la conexión en lugar de
+        descargar el resto. Los bytes leídos y el tiempo desde `start` hasta
+        el resultado se registran por proveedor.
+        """
+        if start is None:
+            start = time.perf_counter()
+        max_bytes = self._stream_max_bytes(provider)
+        outcome = 'complete'
+        async for chunk in response.content.iter_chunked(Config.STREAM_CHUNK_SIZE):
+            parser.feed(chunk)
+            if parser.failed:
+                outcome = 'failed'
+            elif parser.done:
+                outcome = 'decided'
+            elif parser.bytes_fed >= max_bytes:
+                outcome = 'truncated'
+                logger.warning(f"{response.url} supera {max_bytes} bytes, se usa lo leído")
+            if outcome != 'complete':
+                break
+        if outcome != 'complete' and not response.content.at_eof():
+            # El resto del cuerpo queda sin leer: la conexión no se puede reutilizar
+            response.close()
+        result = parser.close()
+        self._record_stream(provider, outcome, parser.bytes_fed, response, time.perf_counter() - start)
+        
+        if validators is not None:
+            validators['etag'] = response.headers.get('ETag')
+            validators['last_modified'] = response.headers.get('Last-Modified')
+            validators['body_bytes'] = parser.bytes_fed
+            validators['parse_seconds'] = parser.parse_seconds
+        return result
+    
+    def _stream_max_bytes(self, provider: str) -> int:
+        """Bytes leídos como máximo en las descargas incrementales de un proveedor"""
+        spec = self.providers.get(provider)
+        return spec.stream_max_bytes if spec is not None else Config.STREAM_MAX_BYTES
+    
+    def _record_stream(self, provider: str, outcome: str, bytes_read: int,
+                       response: aiohttp.ClientResponse, seconds: float):
+        """Registrar los bytes leídos y el tiempo hasta el resultado de una descarga incremental"""
+        stats = self.stream_stats.setdefault(provider, {
+            'fetches': 0,
+            'decided': 0,
+            'complete': 0,
+            'truncated': 0,
+            'failed': 0,
+            'bytes_read': 0,
+            'bytes_skipped': 0,
+            'decision_seconds': 0.0
+        })
+        stats['fetches'] += 1
+        stats[outcome] += 1
+        stats['bytes_read'] += bytes_read
+        stats['decision_seconds'] += seconds
+        STREAM_DECISION_SECONDS.observe(seconds, provider, outcome)
+        # Con el cuerpo comprimido Content-Length no es comparable con los bytes leídos
+        if outcome != 'complete' and response.content_length and 'Content-Encoding' not in response.headers:
+            skipped = max(response.content_length - bytes_read, 0)
+            stats['bytes_skipped'] += skipped
+            STREAM_BYTES_SKIPPED.inc(provider, amount=skipped)
+    
+    def get_stream_stats(self) -> Dict[str, Dict]:
+        """Obtener métricas de las descargas incrementales por proveedor"""
+        return {
+            provider: dict(stats, mean_decision_seconds=stats['decision_seconds'] / stats['fetches'])
+            for provider, stats in self.stream_stats.items()
+        }
     
-    async def get_gcp_status(self) -> Dict:
-        """Obtener estado de Google Cloud Platform"""
+    async def _fetch_url(self, provider: str, url: str, parser=None, stream_parser=None,
+                         shared_state: bool = False) -> Optional[Dict]:
+        """Descargar y parsear una URL a través de su circuit breaker
+        
+        Con el circuito abierto la URL se omite sin hacer ninguna petición.
+        """
+        breaker = self._get_breaker(self.url_breakers, url)
+        if not breaker.allow():
+            logger.info(f"Circuito abierto para {url}, omitiendo")
+            return None
+        
         try:
-            # Intentar múltiples fuentes para GCP
-            urls = [
-                "https://status.cloud.google.com/",
-                "https://cloud.google.com/status"
-            ]
-            
-            for url in urls:
-                html_content = await self._make_request_with_retry(url)
-                if html_content:
-                    return self._parse_gcp_html(html_content)
-            
-            # Si todas las URLs fallan, devolver estado operativo por defecto
-            return {
-                'provider': 'Google Cloud Platform',
-                'overall_status': 'Operational',
-                'services': [{'name': 'Google Cloud Services', 'status': 'Operational', 'region': 'Global'}],
-                'last_updated': datetime.now().isoformat(),
-                'note': 'Estado asumido - no se pudo verificar'
+            result = await self._fetch_and_parse(provider, url, parser, stream_parser, shared_state)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        
+        if result and not result.get('error'):
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+        return result
+    
+    async def _fetch_and_parse(self, provider: str, url: str, parser=None, stream_parser=None,
+                               shared_state: bool = False) -> Optional[Dict]:
+        """Descargar y parsear una URL usando peticiones condicionales
+        
+        Si el servidor responde 304 se reutiliza el resultado parseado anterior
+        sin descargar ni parsear de nuevo. Devuelve None si la URL no responde.
+        El cuerpo se parsea en el ejecutor de parsers; `shared_state` indica
+        que el parser guarda estado de este proceso y no puede ir a otro.
+        """
+        stats = self.conditional_stats.setdefault(provider, {
+            'requests': 0,
+            'not_modified': 0,
+            'bytes_downloaded': 0,
+            'bytes_saved': 0,
+            'parse_seconds_saved': 0.0
+        })
+        previous = self.validators.get(url) or self._restore_validators(url)
+        validators = {}
+        if previous:
+            validators['etag'] = previous.get('etag')
+            validators['last_modified'] = previous.get('last_modified')
+        
+        stats['requests'] += 1
+        body = await self._make_request_with_retry(url, validators=validators, stream_parser=stream_parser,
+                                                   provider=provider)
+        
+        if body is NOT_MODIFIED:
+            stats['not_modified'] += 1
+            stats['bytes_saved'] += previous['body_bytes']
+            stats['parse_seconds_saved'] += previous['parse_seconds']
+            logger.info(f"{url} sin cambios (304), reutilizando resultado anterior")
+            result = dict(previous['result'])
+            result['last_updated'] = datetime.now().isoformat()
+            return result
+        
+        if not body:
+            return None
+        
+        stats['bytes_downloaded'] += validators.get('body_bytes', 0)
+        if stream_parser is not None:
+            # El parser incremental ya devolvió el resultado durante la descarga
+            result = body
+            parse_seconds = validators.get('parse_seconds', 0.0)
+        else:
+            mode = self.parse_pool.mode_for(len(body), shared_state)
+            with span('parse', provider=provider, bytes=len(body), executor=mode):
+                start = time.perf_counter()
+                result = await self.parse_pool.run(parser, body, shared_state)
+                parse_seconds = time.perf_counter() - start
+        PARSE_SECONDS.observe(parse_seconds, provider)
+        
+        # Solo se guardan resultados válidos de URLs que envían validadores
+        if not result.get('error') and (validators.get('etag') or validators.get('last_modified')):
+            self.validators[url] = {
+                'etag': validators.get('etag'),
+                'last_modified': validators.get('last_modified'),
+                'body_bytes': validators.get('body_bytes', 0),
+                'parse_seconds': parse_seconds,
+                'result': result
             }
-                
-        except Exception as e:
-            logger.error(f"Error obteniendo estado de GCP: {e}")
-            return {"error": True, "message": str(e)}
+        else:
+            self.validators.pop(url, None)
+        
+        return result
+    
+    def get_conditional_stats(self) -> Dict[str, Dict]:
+        """Obtener métricas de peticiones condicionales por proveedor"""
+        return {provider: dict(stats) for provider, stats in self.conditional_stats.items()}
     
-    async def get_aws_status(self) -> Dict:
-        """Obtener estado de AWS"""
+    def _record_latency(self, url: str, seconds: float, provider: str = 'unknown', status: str = '200'):
+        """Registrar la latencia de una respuesta correcta de una URL"""
+        UPSTREAM_REQUEST_SECONDS.observe(seconds, provider, url, status)
+        histogram = self.latency.get(url)
+        if histogram is None:
+            histogram = self.latency[url] = LatencyHistogram()
+        histogram.record(seconds)
+    
+    def _hedge_delay(self, url: str) -> float:
+        """Espera antes de lanzar la siguiente URL si `url` aún no respondió
+        
+        Es el percentil HEDGE_PERCENTILE de la latencia reciente de la URL o
+        HEDGE_DEFAULT_DELAY mientras no haya observaciones suficientes.
+        """
+        histogram = self.latency.get(url)
+        if histogram is None or histogram.count < Config.HEDGE_MIN_SAMPLES:
+            return Config.HEDGE_DEFAULT_DELAY
+        return min(histogram.percentile(Config.HEDGE_PERCENTILE), Config.HTTP_TIMEOUT)
+    
+    async def _fetch_first(self, provider: str, urls: List, parser=None, stream_parser=None) -> Optional[Dict]:
+        """Obtener el primer resultado válido de una lista de URLs alternativas
+        
+        Cada elemento es una URL (se usan `parser` y `stream_parser`) o un
+        `StatusSource` con su propio parser.
+        
+        Sin cobertura las URLs se prueban una tras otra. Con HEDGED_REQUESTS,
+        si una URL no respondió dentro de su espera de cobertura se lanza
+        también la siguiente sin cancelar la anterior; la primera respuesta
+        válida gana y el resto se cancela. Si una URL falla, la siguiente se
+        lanza en el acto.
+        """
+        sources = [
+            source if isinstance(source, StatusSource) else StatusSource(source, parser, stream_parser)
+            for source in urls
+        ]
+        urls = [source.url for source in sources]
+        
+        if not Config.HEDGED_REQUESTS or len(sources) < 2:
+            for source in sources:
+                try:
+                    result = await self._fetch_source(provider, source)
+                except Exception as e:
+                    # Igual que con cobertura: el error de una fuente da paso a la siguiente
+                    logger.warning(f"Error consultando {source.url}: {e}")
+                    continue
+                if result:
+                    return result
+            return None
+        
+        stats = self.hedge_stats.setdefault(provider, {'requests': 0, 'hedged': 0, 'fallback_wins': 0})
+        stats['requests'] += 1
+        tasks: Dict[asyncio.Task, str] = {}
         try:
-            # AWS tiene una API RSS que podemos parsear
-            url = "https://status.aws.amazon.com/rss/all.rss"
-            data = await self._make_request_with_retry(url)
-            
-            if data:
-                return self._parse_aws_data(data)
-            else:
-                return {"error": True, "message": "No se pudo obtener datos de AWS"}
-                
-        except Exception as e:
-            logger.error(f"Error obteniendo estado de AWS: {e}")
-            return {"error": True, "message": str(e)}
+            for index, source in enumerate(sources):
+                url = source.url
+                task = asyncio.ensure_future(self._fetch_source(provider, source))
+                tasks[task] = url
+                # La última URL no tiene a quién ceder: se espera a todas las pendientes
+                delay = self._hedge_delay(url) if index < len(urls) - 1 else None
+                result, winner, timed_out = await self._wait_first_valid(tasks, delay)
+                if result:
+                    if winner != urls[0]:
+                        stats['fallback_wins'] += 1
+                    return result
+                if timed_out:
+                    stats['hedged'] += 1
+                    logger.info(f"{url} supera {delay:.2f}s, consultando también {urls[index + 1]}")
+            return None
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    def _fetch_source(self, provider: str, source: StatusSource):
+        """Descargar y parsear una fuente con su parser (y el estado incremental del proveedor)"""
+        parser = source.parser
+        spec = self.providers.get(provider)
+        streaming = spec.streaming if spec is not None else Config.STREAMING_FETCH
+        stream_parser = source.stream_parser if streaming else None
+        tracker = self.trackers.get(provider)
+        if tracker is not None:
+            parser = partial(parser, tracker=tracker)
+            if stream_parser is not None:
+                stream_parser = partial(stream_parser, tracker=tracker)
+        return self._fetch_url(provider, source.url, parser, stream_parser, shared_state=tracker is not None)
+    
+    async def _wait_first_valid(self, tasks: Dict[asyncio.Task, str], timeout: Optional[float]):
+        """Esperar el primer resultado válido entre las peticiones en curso
+        
+        Devuelve (resultado, url, agotado): el resultado es None si venció la
+        espera (agotado=True) o si todas las peticiones en curso fallaron.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while tasks:
+            remaining = None if deadline is None else max(deadline - loop.time(), 0)
+            done, _ = await asyncio.wait(tasks, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                return None, None, True
+            for task in done:
+                url = tasks.pop(task)
+                if task.exception() is not None:
+                    logger.warning(f"Error consultando {url}: {task.exception()}")
+                elif task.result():
+                    return task.result(), url, False
+        return None, None, False
+    
+    def get_parse_stats(self) -> Dict[str, int]:
+        """Obtener el número de parseos por modo de ejecución (bucle, hilos o procesos)"""
+        return dict(self.parse_pool.stats)
+    
+    def get_tracker_stats(self) -> Dict[str, Dict[str, int]]:
+        """Obtener métricas del procesamiento incremental por proveedor"""
+        return {provider: dict(tracker.stats) for provider, tracker in self.trackers.items()}
+    
+    def get_latency_stats(self) -> Dict[str, Dict]:
+        """Obtener percentiles de latencia por URL"""
+        return {url: histogram.summary() for url, histogram in self.latency.items()}
     
-    async def get_oci_status(self) -> Dict:
-        """Obtener estado de Oracle Cloud Infrastructure"""
+    def get_hedge_stats(self) -> Dict[str, Dict[str, int]]:
+        """Obtener métricas de peticiones con cobertura por proveedor"""
+        return {provider: dict(stats) for provider, stats in self.hedge_stats.items()}
+    
+    async def fetch_status(self, provider: str) -> Dict:
+        """Consultar el estado de un proveedor del registro en sus fuentes
+        
+        Las fuentes se prueban en orden de preferencia (con cobertura si está
+        activada), cada una con el parser de su formato. Si ninguna responde se asume operativo el servicio de
+        respaldo del proveedor o, si no declara ninguno, se devuelve un error.
+        """
+        spec = self.providers[provider]
         try:
-            # OCI tiene una página de estado pública
-            urls = [
-                "https://ocistatus.oraclecloud.com/",
-                "https://status.oraclecloud.com/"
-            ]
+            result = await self._fetch_first(provider, spec.sources)
+            if result:
+                return result
             
-            for url in urls:
-                html_content = await self._make_request_with_retry(url)
-                if html_content:
-                    return self._parse_oci_html(html_content)
+            if spec.fallback_service is None:
+                return {"error": True, "message": f"No se pudo obtener datos de {spec.label}"}
             
             # Si todas las URLs fallan, devolver estado operativo por defecto
             return {
-                'provider': 'Oracle Cloud Infrastructure',
+                'provider': spec.name,
                 'overall_status': 'Operational',
-                'services': [{'name': 'OCI Services', 'status': 'Operational', 'region': 'Global'}],
+                'services': [{'name': spec.fallback_service, 'status': 'Operational', 'region': 'Global'}],
                 'last_updated': datetime.now().isoformat(),
-                'note': 'Estado asumido - no se pudo verificar'
+                'note': ASSUMED_STATUS_NOTE
             }
                 
         except Exception as e:
-            logger.error(f"Error obteniendo estado de OCI: {e}")
+            logger.error(f"Error obteniendo estado de {spec.label}: {e}")
             return {"error": True, "message": str(e)}
     
-    def _parse_azure_html(self, html_content: str) -> Dict:
-        """Parsear HTML de Azure para obtener estado"""
-        try:
-            # Buscar indicadores de estado en el HTML
-            services = []
-            
-            # Buscar patrones más específicos que indiquen problemas activos
-            content_lower = html_content.lower()
-            
-            # Buscar indicadores de problemas activos (más específicos)
-            active_issues = [
-                "investigating",
-                "service degradation",
-                "service disruption",
-                "partial outage",
-                "major outage",
-                "service unavailable"
-            ]
-            
-            # Buscar indicadores de estado operativo
-            operational_indicators = [
-                "all services are operating normally",
-                "no issues reported",
-                "all systems operational",
-                "service is healthy"
-            ]
-            
-            has_active_issues = any(indicator in content_lower for indicator in active_issues)
-            has_operational_indicators = any(indicator in content_lower for indicator in operational_indicators)
-            
-            if has_active_issues and not has_operational_indicators:
-                services.append({
-                    'name': 'Azure Services',
-                    'status': 'Issue',
-                    'region': 'Global'
-                })
-                overall_status = 'Issues Detected'
-            else:
-                services.append({
-                    'name': 'Azure Services',
-                    'status': 'Operational',
-                    'region': 'Global'
-                })
-                overall_status = 'Operational'
-            
-            return {
-                'provider': 'Azure',
-                'overall_status': overall_status,
-                'services': services,
-                'last_updated': datetime.now().isoformat()
-            }
-        except Exception as e:
-            logger.error(f"Error parseando HTML de Azure: {e}")
-            return {"error": True, "message": "Error parseando datos"}
+    def _is_cache_valid(self, provider: str) -> bool:
+        """Verificar si el caché es válido para un proveedor
+        
+        Los resultados de error caducan antes (ERROR_CACHE_DURATION) que los válidos.
+        """
+        if provider not in self.cache_timestamps:
+            return False
+        
+        cache_time = self.cache_timestamps[provider]
+        if self._is_failed_status(self.cache[provider]):
+            ttl = Config.ERROR_CACHE_DURATION
+        else:
+            ttl = self._cache_ttl(provider)
+        return datetime.now() - cache_time < timedelta(seconds=ttl)
     
-    def _parse_gcp_html(self, html_content: str) -> Dict:
-        """Parsear HTML de GCP para obtener estado"""
-        try:
-            services = []
-            
-            # Buscar patrones más específicos que indiquen problemas activos
-            content_lower = html_content.lower()
-            
-            # Buscar indicadores de problemas activos (más específicos)
-            active_issues = [
-                "investigating",
-                "service degradation",
-                "service disruption",
-                "partial outage",
-                "major outage",
-                "service unavailable",
-                "ongoing issue"
-            ]
-            
-            # Buscar indicadores de estado operativo
-            operational_indicators = [
-                "all services are operating normally",
-                "no issues reported",
-                "all systems operational",
-                "service is healthy",
-                "operational"
-            ]
-            
-            has_active_issues = any(indicator in content_lower for indicator in active_issues)
-            has_operational_indicators = any(indicator in content_lower for indicator in operational_indicators)
-            
-            if has_active_issues and not has_operational_indicators:
-                services.append({
-                    'name': 'Google Cloud Services',
-                    'status': 'Issue',
-                    'region': 'Global'
-                })
-                overall_status = 'Issues Detected'
-            else:
-                services.append({
-                    'name': 'Google Cloud Services',
-                    'status': 'Operational',
-                    'region': 'Global'
-                })
-                overall_status = 'Operational'
-            
-            return {
-                'provider': 'Google Cloud Platform',
-                'overall_status': overall_status,
-                'services': services,
-                'last_updated': datetime.now().isoformat()
-            }
-        except Exception as e:
-            logger.error(f"Error parseando HTML de GCP: {e}")
-            return {"error": True, "message": "Error parseando datos"}
+    def _cache_ttl(self, provider: str) -> int:
+        """Duración de la caché de un proveedor (la declarada en el registro o CACHE_DURATION)"""
+        spec = self.providers.get(provider)
+        return spec.cache_ttl if spec is not None else Config.CACHE_DURATION
+    
+    @staticmethod
+    def _is_failed_status(status: Optional[Dict]) -> bool:
+        """Indicar si un resultado es un error o un estado asumido por no poder consultar"""
+        return not status or bool(status.get('error')) or status.get('note') == ASSUMED_STATUS_NOTE
+    
+    @staticmethod
+    def _get_breaker(breakers: Dict[str, CircuitBreaker], key: str) -> CircuitBreaker:
+        """Obtener o crear el circuit breaker de un proveedor o URL"""
+        breaker = breakers.get(key)
+        if breaker is None:
+            breaker = breakers[key] = CircuitBreaker(Config.BREAKER_FAILURE_THRESHOLD, Config.BREAKER_RESET_TIMEOUT)
+        return breaker
+    
+    def _store_failure(self, provider: str, status: Dict, breaker: CircuitBreaker) -> Dict:
+        """Registrar un fallo del proveedor (caché negativa)
+        
+        El proveedor no se vuelve a consultar hasta que pase ERROR_CACHE_DURATION
+        o se cierre su circuito. Si hay una instantánea válida anterior se sigue
+        sirviendo, marcada como obsoleta; si no, se guarda el error.
+        """
+        retry_in = max(Config.ERROR_CACHE_DURATION, breaker.retry_in())
+        self.failed_until[provider] = time.monotonic() + retry_in
+        if not self._is_failed_status(self.cache.get(provider)):
+            logger.warning(f"{provider} no disponible, sirviendo la última instantánea válida")
+            return self.cache[provider]
+        entry = {'status': status, 'timestamp': time.time(), 'version': time.time_ns()}
+        return self._store_snapshot(provider, entry)
+    
+    def get_breaker_stats(self) -> Dict[str, Dict]:
+        """Obtener el estado de los circuit breakers por proveedor y por URL"""
+        return {
+            'providers': {provider: breaker.snapshot() for provider, breaker in self.provider_breakers.items()},
+            'urls': {url: breaker.snapshot() for url, breaker in self.url_breakers.items()}
+        }
+    
+    def _get_provider_functions(self) -> Dict:
+        """Mapa de proveedores soportados y su función de consulta, por prioridad"""
+        return {provider: partial(self.fetch_status, provider) for provider in self.providers}
+    
+    def _start_fetch(self, provider: str, provider_func) -> asyncio.Future:
+        """Lanzar la consulta de un proveedor o devolver la que ya está en curso
+        
+        Si ya hay una consulta en marcha para el proveedor, se devuelve ese mismo
+        futuro en lugar de lanzar otra petición idéntica.
+        """
+        stats = self.coalescing_stats.setdefault(provider, {'fetches': 0, 'coalesced': 0})
+        
+        task = self._inflight.get(provider)
+        if task is not None:
+            stats['coalesced'] += 1
+            logger.info(f"Reutilizando petición en curso para {provider}")
+        else:
+            stats['fetches'] += 1
+            task = asyncio.ensure_future(self._run_provider_fetch(provider, provider_func))
+            self._inflight[provider] = task
+            task.add_done_callback(lambda t: self._clear_inflight(provider, t))
+        return task
     
-    def _parse_aws_data(self, data: str) -> Dict:
-        """Parsear datos de AWS desde RSS"""
+    def supported_providers(self) -> List[str]:
+        """Nombres de los proveedores soportados"""
+        return list(self.providers)
+    
+    async def _fetch_provider(self, provider: str, provider_func) -> Dict:
+        """Obtener estado de un proveedor compartiendo la petición en curso"""
+        # La instantánea del disco sirve de estado anterior si la consulta falla
+        self._restore_snapshot(provider)
+        with span('provider.fetch', provider=provider, coalesced=provider in self._inflight):
+            task = self._start_fetch(provider, provider_func)
+            # shield: si un llamador se cancela no se cancela la petición compartida
+            return await asyncio.shield(task)
+    
+    async def _run_provider_fetch(self, provider: str, provider_func) -> Dict:
+        """Ejecutar la consulta de un proveedor y guardar el resultado en caché
+        
+        Antes de consultar se mira la caché compartida: si alguna réplica ya
+        refrescó el proveedor dentro del TTL se reutiliza su instantánea, de
+        modo que el refresco periódico de todas las réplicas consulta una sola
+        vez por TTL. Con el backend en memoria la instantánea es la propia de
+        este proceso y solo cuenta si es más nueva que la copia local. Solo la
+        réplica que obtiene el bloqueo del proveedor hace la consulta real.
+        """
+        shared = await self._backend_call('get', provider)
+        if (shared and time.time() - shared['timestamp'] < self._cache_ttl(provider)
+                and (self.cache_backend.shared or shared['version'] != self.cache_versions.get(provider))):
+            self.failed_until.pop(provider, None)
+            return self._store_snapshot(provider, shared)
+        
+        breaker = self._get_breaker(self.provider_breakers, provider)
+        if not breaker.allow():
+            # Circuito abierto: responder al momento con la última instantánea válida
+            logger.info(f"Circuito abierto para {provider}, sin consultar")
+            error = {"error": True, "message": "Proveedor no disponible temporalmente"}
+            return self._store_failure(provider, error, breaker)
+        
+        token = await self._backend_call('acquire_lock', provider, Config.CACHE_LOCK_TTL)
+        if token is None and self._backend_available:
+            # Otra réplica está refrescando: servir su última instantánea
+            breaker.release()
+            if shared:
+                logger.info(f"Otra réplica está refrescando {provider}, usando instantánea compartida")
+                return self._store_snapshot(provider, shared)
+            # Sin instantánea previa se espera a que la otra réplica la publique
+            shared, token = await self._wait_for_shared_snapshot(provider)
+            if shared:
+                return self._store_snapshot(provider, shared)
+        
         try:
-            import xml.etree.ElementTree as ET
-            root = ET.fromstring(data)
-            
-            services = []
-            for item in root.findall('.//item'):
-                title = item.find('title').text if item.find('title') is not None else 'Unknown'
-                description = item.find('description').text if item.find('description') is not None else 'No description'
-                
-                # Determinar si es un problema activo
-                status = 'Issue' if 'investigating' in description.lower() or 'issue' in description.lower() else 'Operational'
-                
-                services.append({
-                    'name': title,
-                    'status': status,
-                    'description': description,
-                    'region': 'Global'
-                })
+            # Instantánea anterior más reciente conocida, para detectar cambios
+            previous = shared['status'] if shared else self.cache.get(provider)
+            try:
+                status = await provider_func()
+            except asyncio.CancelledError:
+                breaker.release()
+                raise
+            except Exception as e:
+                logger.error(f"Error obteniendo estado de {provider}: {e}")
+                status = {"error": True, "message": str(e)}
             
-            # Si no hay items, asumimos que todo está operativo
-            if not services:
-                services = [{'name': 'All Services', 'status': 'Operational', 'region': 'Global'}]
+            if self._is_failed_status(status):
+                breaker.record_failure()
+                return self._store_failure(provider, status, breaker)
             
-            return {
-                'provider': 'AWS',
-                'overall_status': 'Operational' if all(s['status'] == 'Operational' for s in services) else 'Issues Detected',
-                'services': services,
-                'last_updated': datetime.now().isoformat()
+            breaker.record_success()
+            self.failed_until.pop(provider, None)
+            entry = {'status': status, 'timestamp': time.time(), 'version': time.time_ns()}
+            self._store_snapshot(provider, entry)
+            await self._backend_call('set', provider, entry)
+            self._notify_snapshot(provider, previous, status)
+        finally:
+            if token is not None:
+                await self._backend_call('release_lock', provider, token)
+        return status
+    
+    async def _wait_for_shared_snapshot(self, provider: str):
+        """Esperar la instantánea que está obteniendo otra réplica
+        
+        Devuelve la instantánea en cuanto aparece, o un token de bloqueo si la
+        otra réplica lo liberó o dejó caducar sin publicar nada.
+        """
+        deadline = time.monotonic() + Config.CACHE_LOCK_TTL
+        while time.monotonic() < deadline:
+            await asyncio.sleep(SHARED_SNAPSHOT_POLL_INTERVAL)
+            shared = await self._backend_call('get', provider)
+            if shared:
+                return shared, None
+            token = await self._backend_call('acquire_lock', provider, Config.CACHE_LOCK_TTL)
+            if token is not None or not self._backend_available:
+                return None, token
+        return None, None
+    
+    def add_snapshot_listener(self, listener):
+        """Registrar una función `listener(provider, anterior, actual)`
+        
+        Se llama con cada instantánea obtenida por esta réplica. Las que se
+        adoptan de la caché compartida no se notifican, así cada cambio se
+        notifica una sola vez aunque haya varias réplicas.
+        """
+        self._snapshot_listeners.append(listener)
+    
+    def _notify_snapshot(self, provider: str, previous: Optional[Dict], current: Dict):
+        """Avisar a los listeners de una nueva instantánea"""
+        for listener in self._snapshot_listeners:
+            try:
+                listener(provider, previous, current)
+            except Exception as e:
+                logger.error(f"Error en listener de instantáneas de {provider}: {e}")
+    
+    def _store_snapshot(self, provider: str, entry: Dict) -> Dict:
+        """Guardar una instantánea en la copia local de la caché"""
+        self.cache[provider] = entry['status']
+        self.cache_timestamps[provider] = datetime.fromtimestamp(entry['timestamp'])
+        self.cache_versions[provider] = entry['version']
+        self.service_index.update(provider, entry['status'], entry['version'])
+        self._restored.discard(provider)
+        return entry['status']
+    
+    def _restore_snapshot(self, provider: str) -> bool:
+        """Cargar la instantánea guardada en disco de un proveedor sin datos en memoria
+        
+        Se sirve como obsoleta (y se refresca en segundo plano) hasta la
+        primera consulta real. Las instantáneas más antiguas que
+        SNAPSHOT_MAX_AGE se descartan.
+        """
+        if self.snapshot_store is None or provider in self.cache:
+            return False
+        entry = self.snapshot_store.pop_snapshot(provider)
+        if entry is None:
+            return False
+        age = time.time() - entry['timestamp']
+        if age > Config.SNAPSHOT_MAX_AGE:
+            logger.info(f"Instantánea en disco de {provider} demasiado antigua ({age:.0f}s), se descarta")
+            return False
+        self._store_snapshot(provider, entry)
+        self._restored.add(provider)
+        self._saved_versions[provider] = entry['version']
+        logger.info(f"Instantánea de {provider} restaurada del disco ({age:.0f}s)")
+        return True
+    
+    def _restore_validators(self, url: str) -> Optional[Dict]:
+        """Cargar los validadores HTTP guardados en disco de una URL"""
+        if self.snapshot_store is None:
+            return None
+        validators = self.snapshot_store.pop_validators(url)
+        if validators is not None:
+            self.validators[url] = validators
+        return validators
+    
+    async def save_snapshots(self) -> bool:
+        """Guardar en disco las instantáneas válidas y los validadores HTTP
+        
+        Solo se escribe si alguna instantánea cambió desde el último volcado.
+        Los registros del disco que aún no se habían restaurado se cargan
+        antes para no perderlos. La serialización y la escritura se hacen
+        fuera del bucle de eventos.
+        """
+        if self.snapshot_store is None:
+            return False
+        for provider, spec in self.providers.items():
+            self._restore_snapshot(provider)
+            for url in spec.urls:
+                if url not in self.validators:
+                    self._restore_validators(url)
+        
+        versions = {
+            provider: version for provider, version in self.cache_versions.items()
+            if not self._is_failed_status(self.cache.get(provider))
+        }
+        if versions == self._saved_versions:
+            return False
+        
+        snapshots = {
+            provider: {
+                'status': self.cache[provider],
+                'timestamp': self.cache_timestamps[provider].timestamp(),
+                'version': version
             }
+            for provider, version in versions.items()
+        }
+        try:
+            with span('snapshots.save', providers=len(snapshots), urls=len(self.validators)):
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self.snapshot_store.write, snapshots, dict(self.validators)
+                )
         except Exception as e:
-            logger.error(f"Error parseando datos de AWS: {e}")
-            return {"error": True, "message": "Error parseando datos"}
+            logger.error(f"Error guardando instantáneas en disco: {e}")
+            return False
+        self._saved_versions = versions
+        logger.info(f"Instantáneas guardadas en {self.snapshot_store.path} ({len(snapshots)} proveedores)")
+        return True
     
-    def _parse_oci_html(self, html_content: str) -> Dict:
-        """Parsear HTML de OCI para obtener estado"""
+    async def _snapshot_loop(self, interval: int):
+        """Guardar periódicamente las instantáneas en disco"""
+        while True:
+            await asyncio.sleep(interval)
+            await self.save_snapshots()
+    
+    def start_snapshot_persistence(self):
+        """Iniciar el guardado periódico de instantáneas en disco"""
+        if self.snapshot_store is None:
+            return
+        if self._snapshot_task is None or self._snapshot_task.done():
+            self._snapshot_task = asyncio.create_task(self._snapshot_loop(Config.SNAPSHOT_SAVE_INTERVAL))
+    
+    async def _backend_call(self, method: str, *args):
+        """Llamar a la caché compartida sin que sus fallos afecten a las consultas"""
         try:
-            services = []
-            
-            # Buscar patrones que indiquen problemas en OCI
-            if "investigating" in html_content.lower() or "issue" in html_content.lower() or "outage" in html_content.lower() or "degraded" in html_content.lower():
-                services.append({
-                    'name': 'OCI Services',
-                    'status': 'Issue',
-                    'region': 'Global'
-                })
-                overall_status = 'Issues Detected'
-            else:
-                services.append({
-                    'name': 'OCI Services',
-                    'status': 'Operational',
-                    'region': 'Global'
-                })
-                overall_status = 'Operational'
-            
-            return {
-                'provider': 'Oracle Cloud Infrastructure',
-                'overall_status': overall_status,
-                'services': services,
-                'last_updated': datetime.now().isoformat()
-            }
+            result = await getattr(self.cache_backend, method)(*args)
+            self._backend_available = True
+            return result
         except Exception as e:
-            logger.error(f"Error parseando HTML de OCI: {e}")
-            return {"error": True, "message": "Error parseando datos"}
+            self._backend_available = False
+            logger.warning(f"Caché compartida no disponible ({method}): {e}")
+            return None
     
-    def _is_cache_valid(self, provider: str) -> bool:
-        """Verificar si el caché es válido para un proveedor"""
-        if provider not in self.cache_timestamps:
-            return False
+    def _clear_inflight(self, provider: str, task: asyncio.Future):
+        """Eliminar la petición terminada del registro de peticiones en curso"""
+        if self._inflight.get(provider) is task:
+            del self._inflight[provider]
+        # Evitar avisos de excepción no recuperada si nadie espera ya el futuro
+        if not task.cancelled():
+            task.exception()
+    
+    def get_coalescing_stats(self) -> Dict[str, Dict[str, int]]:
+        """Obtener métricas de peticiones deduplicadas por proveedor"""
+        return {provider: dict(stats) for provider, stats in self.coalescing_stats.items()}
+    
+    def _get_cached_status(self, provider: str) -> Dict:
+        """Obtener el estado en memoria de un proveedor marcando su antigüedad
         
-        cache_time = self.cache_timestamps[provider]
-        return datetime.now() - cache_time < timedelta(seconds=Config.CACHE_DURATION)
+        Si el dato ha caducado se marca como obsoleto y se lanza un refresco
+        en segundo plano sin esperar a que termine.
+        """
+        age = (datetime.now() - self.cache_timestamps[provider]).total_seconds()
+        retry_at = self.failed_until.get(provider)
+        # Tras un fallo se sirve la última instantánea válida marcada como obsoleta,
+        # igual que las restauradas del disco hasta su primer refresco
+        stale = not self._is_cache_valid(provider) or provider in self._restored or (
+            retry_at is not None and not self._is_failed_status(self.cache[provider])
+        )
+        if stale and (retry_at is None or time.monotonic() >= retry_at):
+            logger.info(f"Datos obsoletos para {provider} ({age:.0f}s), refrescando en segundo plano")
+            self._start_fetch(provider, self._get_provider_functions()[provider])
+        
+        status = dict(self.cache[provider])
+        status['cache_age'] = int(age)
+        status['stale'] = stale
+        status['version'] = self.cache_versions[provider]
+        return status
+    
+    def _serve_cached(self, provider: str) -> Dict:
+        """Responder desde la caché registrando si el dato estaba vigente u obsoleto"""
+        status = self._get_cached_status(provider)
+        CACHE_REQUESTS.inc(provider, 'stale' if status['stale'] else 'hit')
+        return status
     
     async def get_all_status(self) -> Dict:
         """Obtener estado de todos los proveedores cloud"""
         results = {}
         
         # Verificar caché para cada proveedor
-        providers = {
-            'azure': self.get_azure_status,
-            'gcp': self.get_gcp_status,
-            'aws': self.get_aws_status,
-            'oci': self.get_oci_status
-        }
+        providers = self._get_provider_functions()
         
-        # Ejecutar todas las verificaciones en paralelo para mejor rendimiento
+        # Solo se espera a los proveedores sin ningún dato en memoria
         tasks = []
         for provider_name, provider_func in providers.items():
-            if self._is_cache_valid(provider_name):
-                results[provider_name] = self.cache[provider_name]
+            if provider_name in self.cache or self._restore_snapshot(provider_name):
+                results[provider_name] = self._serve_cached(provider_name)
                 logger.info(f"Usando caché para {provider_name}")
             else:
+                CACHE_REQUESTS.inc(provider_name, 'miss')
                 logger.info(f"Obteniendo estado actual de {provider_name}")
-                tasks.append((provider_name, provider_func()))
+                tasks.append((provider_name, self._fetch_provider(provider_name, provider_func)))
         
         # Ejecutar tareas en paralelo
         if tasks:
@@ -362,34 +933,90 @@ class CloudStatusChecker:
                     logger.error(f"Error obteniendo estado de {provider_name}: {task_results[i]}")
                     results[provider_name] = {"error": True, "message": str(task_results[i])}
                 else:
-                    results[provider_name] = task_results[i]
-                    self.cache[provider_name] = task_results[i]
-                    self.cache_timestamps[provider_name] = datetime.now()
+                    results[provider_name] = self._get_cached_status(provider_name)
         
-        return results
+        # Mantener el orden de los proveedores
+        return {provider_name: results[provider_name] for provider_name in providers}
     
     async def get_provider_status(self, provider: str) -> Dict:
         """Obtener estado de un proveedor específico"""
         provider = provider.lower()
         
-        provider_functions = {
-            'azure': self.get_azure_status,
-            'gcp': self.get_gcp_status,
-            'aws': self.get_aws_status,
-            'oci': self.get_oci_status
-        }
+        provider_functions = self._get_provider_functions()
         
         if provider in provider_functions:
-            if self._is_cache_valid(provider):
-                return self.cache[provider]
-            status = await provider_functions[provider]()
-            self.cache[provider] = status
-            self.cache_timestamps[provider] = datetime.now()
-            return status
+            if provider in self.cache or self._restore_snapshot(provider):
+                return self._serve_cached(provider)
+            CACHE_REQUESTS.inc(provider, 'miss')
+            await self._fetch_provider(provider, provider_functions[provider])
+            return self._get_cached_status(provider)
         else:
             return {"error": True, "message": f"Proveedor '{provider}' no soportado"}
     
+    async def lookup_service(self, provider: str, service: str, region: Optional[str] = None) -> Dict:
+        """Obtener el estado de un servicio (y región) de un proveedor desde el índice
+        
+        Usa la misma caché que `get_provider_status`; la búsqueda no recorre
+        la instantánea completa. `matches` es {servicio: {región: entradas}}.
+        """
+        status = await self.get_provider_status(provider)
+        if status.get('error'):
+            return status
+        
+        provider = provider.lower()
+        return {
+            'provider': status.get('provider', provider.upper()),
+            'key': provider,
+            'service': service,
+            'region': region,
+            'matches': self.service_index.lookup(provider, service, region),
+            'known_services': self.service_index.services(provider),
+            'last_updated': status.get('last_updated'),
+            'stale': status.get('stale', False)
+        }
+    
+    async def _refresh_loop(self, provider: str, provider_func, interval: int):
+        """Refrescar periódicamente el estado de un proveedor"""
+        while True:
+            try:
+                await self._fetch_provider(provider, provider_func)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error en refresco en segundo plano de {provider}: {e}")
+            await asyncio.sleep(interval)
+    
+    def start_background_refresh(self):
+        """Iniciar el refresco periódico de todos los proveedores"""
+        for provider, provider_func in self._get_provider_functions().items():
+            task = self._refresh_tasks.get(provider)
+            if task is not None and not task.done():
+                continue
+            interval = self.providers[provider].refresh_interval
+            self._refresh_tasks[provider] = asyncio.create_task(
+                self._refresh_loop(provider, provider_func, interval)
+            )
+            logger.info(f"Refresco en segundo plano de {provider} cada {interval}s")
+    
+    async def stop_background_refresh(self):
+        """Detener el refresco periódico"""
+        tasks = list(self._refresh_tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refresh_tasks.clear()
+    
     async def close(self):
-        """Cerrar sesión HTTP"""
+        """Detener el refresco, guardar las instantáneas en disco y cerrar sesión HTTP"""
+        await self.stop_background_refresh()
+        if self._snapshot_task is not None:
+            self._snapshot_task.cancel()
+            await asyncio.gather(self._snapshot_task, return_exceptions=True)
+            self._snapshot_task = None
+        if self.snapshot_store is not None:
+            await self.save_snapshots()
+            self.snapshot_store.close()
+        self.parse_pool.close()
+        await self._backend_call('close')
         if self.session and not self.session.closed:
             await self.session.close() 
\ No newline at end of file
@@ -1,24 +1,196 @@
 import os
+import logging
 from dotenv import load_dotenv
 
 # Cargar variables de entorno
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+def _provider_settings(suffix: str, convert) -> dict:
+    """Valores de las variables <PROVEEDOR><suffix> por proveedor
+    
+    Los valores que `convert` no admite se ignoran con un aviso, así una
+    variable ajena con el mismo sufijo no impide arrancar.
+    """
+    settings = {}
+    for name, value in os.environ.items():
+        if not name.endswith(suffix) or not value:
+            continue
+        try:
+            settings[name[:-len(suffix)].lower()] = convert(value)
+        except ValueError:
+            logger.warning(f"Se ignora {name}={value!r}: valor no válido")
+    return settings
+
 class Config:
     """Configuración del bot de Telegram para monitoreo de servicios cloud"""
     
     # Token del bot de Telegram
     TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
     
+    # URL base de la API de Telegram (para un servidor Bot API local)
+    TELEGRAM_BASE_URL = os.getenv('TELEGRAM_BASE_URL', 'https://api.telegram.org/bot')
+    
+    # Conexiones del cliente HTTP de la Bot API (256 es el valor por defecto de python-telegram-bot)
+    TELEGRAM_CONNECTION_POOL_SIZE = int(os.getenv('TELEGRAM_CONNECTION_POOL_SIZE', 256))
+    
+    # Modo de recepción de actualizaciones: 'polling' o 'webhook'
+    BOT_MODE = os.getenv('BOT_MODE', 'polling').lower()
+    
+    # Configuración del webhook
+    WEBHOOK_URL = os.getenv('WEBHOOK_URL')
+    WEBHOOK_LISTEN = os.getenv('WEBHOOK_LISTEN', '0.0.0.0')
+    WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', 8443))
+    WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', 'telegram')
+    WEBHOOK_SECRET_TOKEN = os.getenv('WEBHOOK_SECRET_TOKEN')
+    
+    # Límites del webhook: conexiones simultáneas que abre Telegram, peticiones
+    # recibiéndose a la vez en el servidor (solo la recepción y el encolado; los
+    # handlers los limita CONCURRENT_UPDATES) y tamaño máximo del cuerpo
+    WEBHOOK_MAX_CONNECTIONS = int(os.getenv('WEBHOOK_MAX_CONNECTIONS', 40))
+    WEBHOOK_INTAKE_LIMIT = int(os.getenv('WEBHOOK_INTAKE_LIMIT', 100))
+    WEBHOOK_MAX_BODY_SIZE = int(os.getenv('WEBHOOK_MAX_BODY_SIZE', 1024 * 1024))
+    
+    # Actualizaciones procesadas en paralelo por los handlers (0 = de una en una)
+    CONCURRENT_UPDATES = int(os.getenv('CONCURRENT_UPDATES', 0))
+    
+    # Límite de comandos y botones por usuario y por chat (cubo de fichas):
+    # acciones por segundo recuperadas y ráfaga máxima (ritmo 0 = sin límite)
+    THROTTLE_USER_RATE = float(os.getenv('THROTTLE_USER_RATE', 0.5))
+    THROTTLE_USER_BURST = int(os.getenv('THROTTLE_USER_BURST', 5))
+    THROTTLE_CHAT_RATE = float(os.getenv('THROTTLE_CHAT_RATE', 1.0))
+    THROTTLE_CHAT_BURST = int(os.getenv('THROTTLE_CHAT_BURST', 10))
+    
+    # Segundos en los que repetir un botón sobre el mismo mensaje no lo vuelve a editar
+    CALLBACK_DEBOUNCE_WINDOW = float(os.getenv('CALLBACK_DEBOUNCE_WINDOW', 1.0))
+    
+    # Endpoint de métricas en formato Prometheus
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'false').lower() == 'true'
+    METRICS_LISTEN = os.getenv('METRICS_LISTEN', '0.0.0.0')
+    METRICS_PORT = int(os.getenv('METRICS_PORT', 9100))
+    METRICS_PATH = os.getenv('METRICS_PATH', '/metrics')
+    
+    # Trazas por actualización: las que superen TRACE_SLOW_THRESHOLD segundos
+    # se registran en el log con el desglose de cada paso
+    TRACE_ENABLED = os.getenv('TRACE_ENABLED', 'true').lower() == 'true'
+    TRACE_SLOW_THRESHOLD = float(os.getenv('TRACE_SLOW_THRESHOLD', 5.0))
+    
+    # Exportación de trazas en formato OTLP/JSON: '' (ninguna), 'file' u 'otlp' (colector HTTP)
+    TRACE_EXPORT = os.getenv('TRACE_EXPORT', '').lower()
+    TRACE_EXPORT_FILE = os.getenv('TRACE_EXPORT_FILE', 'traces.jsonl')
+    TRACE_OTLP_ENDPOINT = os.getenv('TRACE_OTLP_ENDPOINT', 'http://localhost:4318/v1/traces')
+    
     # Duración del caché en segundos (5 minutos por defecto)
     CACHE_DURATION = int(os.getenv('CACHE_DURATION', 300))
     
+    # Duración del caché de resultados de error en segundos (caché negativa)
+    ERROR_CACHE_DURATION = int(os.getenv('ERROR_CACHE_DURATION', 30))
+    
+    # Circuit breaker por proveedor y URL: fallos seguidos para abrir el
+    # circuito y segundos abierto antes de dejar pasar una consulta de prueba
+    BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', 3))
+    BREAKER_RESET_TIMEOUT = int(os.getenv('BREAKER_RESET_TIMEOUT', 60))
+    
+    # Suscripciones a cambios de estado
+    SUBSCRIPTIONS_FILE = os.getenv('SUBSCRIPTIONS_FILE', 'subscriptions.json')
+    NOTIFY_OUTBOX_FILE = os.getenv('NOTIFY_OUTBOX_FILE', 'notify_outbox.json')
+    
+    # Límites de envío de notificaciones: mensajes por segundo en total,
+    # segundos mínimos entre mensajes a un mismo chat y chats por lote
+    NOTIFY_GLOBAL_RATE = float(os.getenv('NOTIFY_GLOBAL_RATE', 25))
+    NOTIFY_PER_CHAT_INTERVAL = float(os.getenv('NOTIFY_PER_CHAT_INTERVAL', 1.0))
+    NOTIFY_BATCH_SIZE = int(os.getenv('NOTIFY_BATCH_SIZE', 25))
+    
+    # Caché compartida entre réplicas: 'memory' (solo este proceso), 'redis' o 'disk'
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory').lower()
+    REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_DIR = os.getenv('CACHE_DIR', '.cache')
+    
+    # Tiempo máximo de conexión y de cada comando del servidor Redis en segundos
+    REDIS_TIMEOUT = float(os.getenv('REDIS_TIMEOUT', 2.0))
+    
+    # Duración máxima del bloqueo de refresco de un proveedor en segundos
+    CACHE_LOCK_TTL = int(os.getenv('CACHE_LOCK_TTL', 60))
+    
+    # Instantáneas persistentes para arranques en caliente: archivo ('' = desactivado),
+    # intervalo de guardado y antigüedad máxima de las que se cargan (segundos)
+    SNAPSHOT_FILE = os.getenv('SNAPSHOT_FILE', 'snapshots.bin')
+    SNAPSHOT_SAVE_INTERVAL = int(os.getenv('SNAPSHOT_SAVE_INTERVAL', 60))
+    SNAPSHOT_MAX_AGE = int(os.getenv('SNAPSHOT_MAX_AGE', 86400))
+    
+    # Refresco periódico en segundo plano (stale-while-revalidate)
+    BACKGROUND_REFRESH = os.getenv('BACKGROUND_REFRESH', 'true').lower() == 'true'
+    
+    # Intervalo de refresco por proveedor en segundos (<PROVEEDOR>_REFRESH_INTERVAL);
+    # sin definir se usa el TTL del proveedor en el registro
+    REFRESH_INTERVALS = _provider_settings('_REFRESH_INTERVAL', int)
+    
     # Timeout para peticiones HTTP (10 segundos por defecto)
     HTTP_TIMEOUT = int(os.getenv('HTTP_TIMEOUT', 10))
     
     # Número máximo de reintentos para peticiones HTTP
     MAX_RETRIES = int(os.getenv('MAX_RETRIES', 3))
     
+    # Peticiones simultáneas a páginas de estado, en total y por host
+    MAX_CONCURRENT_FETCHES = int(os.getenv('MAX_CONCURRENT_FETCHES', 8))
+    MAX_FETCHES_PER_HOST = int(os.getenv('MAX_FETCHES_PER_HOST', 2))
+    
+    # Pool de conexiones HTTP: conexiones totales y por host, segundos que se
+    # mantiene viva una conexión sin uso y duración de la caché DNS
+    HTTP_POOL_LIMIT = int(os.getenv('HTTP_POOL_LIMIT', 100))
+    HTTP_POOL_LIMIT_PER_HOST = int(os.getenv('HTTP_POOL_LIMIT_PER_HOST', 4))
+    HTTP_KEEPALIVE_TIMEOUT = float(os.getenv('HTTP_KEEPALIVE_TIMEOUT', 120))
+    DNS_CACHE_TTL = int(os.getenv('DNS_CACHE_TTL', 300))
+    
+    # Retardo entre intentos IPv6/IPv4 (happy eyeballs) en segundos; vacío = valor de aiohttp
+    HAPPY_EYEBALLS_DELAY = float(os.getenv('HAPPY_EYEBALLS_DELAY')) if os.getenv('HAPPY_EYEBALLS_DELAY') else None
+    
+    # Resolver y conectar con los hosts de estado al arrancar el bot
+    HTTP_WARMUP = os.getenv('HTTP_WARMUP', 'true').lower() == 'true'
+    
+    # Peticiones con cobertura (hedging): si la URL principal de un proveedor no
+    # responde dentro del percentil HEDGE_PERCENTILE de su latencia reciente, se
+    # lanza también la URL alternativa y se usa la primera respuesta válida
+    HEDGED_REQUESTS = os.getenv('HEDGED_REQUESTS', 'true').lower() == 'true'
+    HEDGE_PERCENTILE = float(os.getenv('HEDGE_PERCENTILE', 95))
+    
+    # Observaciones mínimas antes de usar el histograma y espera usada hasta entonces (segundos)
+    HEDGE_MIN_SAMPLES = int(os.getenv('HEDGE_MIN_SAMPLES', 10))
+    HEDGE_DEFAULT_DELAY = float(os.getenv('HEDGE_DEFAULT_DELAY', 2.0))
+    
+    # Parsear de forma incremental mientras se descargan los formatos que lo
+    # admiten (el feed RSS de AWS y las páginas HTML clasificadas por palabras
+    # clave, cuya descarga se corta en cuanto la clasificación es definitiva)
+    STREAMING_FETCH = os.getenv('STREAMING_FETCH', 'true').lower() == 'true'
+    
+    # Descarga incremental por proveedor (<PROVEEDOR>_STREAMING_FETCH=true/false);
+    # AWS_STREAMING_PARSER se mantiene como nombre anterior de AWS_STREAMING_FETCH
+    STREAMING_FETCH_PROVIDERS = _provider_settings('_STREAMING_FETCH', lambda value: value.lower() == 'true')
+    if os.getenv('AWS_STREAMING_PARSER') and 'aws' not in STREAMING_FETCH_PROVIDERS:
+        STREAMING_FETCH_PROVIDERS['aws'] = os.getenv('AWS_STREAMING_PARSER').lower() == 'true'
+    
+    # Tamaño de los fragmentos leídos en las descargas incrementales (bytes)
+    STREAM_CHUNK_SIZE = int(os.getenv('STREAM_CHUNK_SIZE', 16384))
+    
+    # Bytes leídos como máximo en una descarga incremental (<PROVEEDOR>_STREAM_MAX_BYTES
+    # para un proveedor concreto); al llegar al límite se clasifica con lo leído
+    STREAM_MAX_BYTES = int(os.getenv('STREAM_MAX_BYTES', 8 * 1024 * 1024))
+    STREAM_MAX_BYTES_PROVIDERS = _provider_settings('_STREAM_MAX_BYTES', int)
+    
+    # Ejecutor de los parsers: 'thread' (un hilo), 'process' (pool de procesos) o
+    # 'inline' (en el bucle de eventos), procesos del pool y tamaño mínimo del
+    # cuerpo en bytes para salir del bucle (los más pequeños se parsean en él)
+    PARSE_EXECUTOR = os.getenv('PARSE_EXECUTOR', 'thread').lower()
+    PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', 2))
+    PARSE_EXECUTOR_MIN_BYTES = int(os.getenv('PARSE_EXECUTOR_MIN_BYTES', 65536))
+    
+    # Medición del bloqueo del bucle de eventos: intervalo en segundos (0 = desactivado)
+    # y retraso a partir del cual se registra un aviso
+    LOOP_LAG_INTERVAL = float(os.getenv('LOOP_LAG_INTERVAL', 0.25))
+    LOOP_LAG_WARN_THRESHOLD = float(os.getenv('LOOP_LAG_WARN_THRESHOLD', 0.1))
+    
     # URLs de las APIs de estado
     AZURE_STATUS_URL = os.getenv('AZURE_STATUS_URL', 'https://status.azure.com/en-us/status/')
     GCP_STATUS_URL = os.getenv('GCP_STATUS_URL', 'https://status.cloud.google.com/')
@@ -30,6 +202,20 @@ class Config:
     # Configuración de estadísticas
     ENABLE_STATISTICS = os.getenv('ENABLE_STATISTICS', 'true').lower() == 'true'
     
+    # Escritura diferida de estadísticas: volcar cada N segundos o tras N cambios
+    STATS_WRITE_BEHIND = os.getenv('STATS_WRITE_BEHIND', 'true').lower() == 'true'
+    STATS_FLUSH_INTERVAL = int(os.getenv('STATS_FLUSH_INTERVAL', 30))
+    STATS_FLUSH_THRESHOLD = int(os.getenv('STATS_FLUSH_THRESHOLD', 50))
+    
+    # Almacenamiento de estadísticas: 'json' (archivo único) o 'sqlite' (registro de eventos)
+    STATS_BACKEND = os.getenv('STATS_BACKEND', 'json').lower()
+    STATS_FILE = os.getenv('STATS_FILE', 'bot_stats.json')
+    STATS_DB_FILE = os.getenv('STATS_DB_FILE', 'bot_stats.db')
+    
+    # Días de estadísticas diarias que se conservan y días de eventos sin compactar
+    STATS_RETENTION_DAYS = int(os.getenv('STATS_RETENTION_DAYS', 30))
+    STATS_EVENT_RETENTION_DAYS = int(os.getenv('STATS_EVENT_RETENTION_DAYS', 7))
+    
     # Headers para las peticiones HTTP
     HEADERS = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
@@ -40,4 +226,11 @@ class Config:
         """Validar que las configuraciones requeridas estén presentes"""
         if not cls.TELEGRAM_BOT_TOKEN:
             raise ValueError("TELEGRAM_BOT_TOKEN es requerido en las variables de entorno")
+        if cls.BOT_MODE not in ('polling', 'webhook'):
+            raise ValueError("BOT_MODE debe ser 'polling' o 'webhook'")
+        if cls.BOT_MODE == 'webhook':
+            if not cls.WEBHOOK_URL:
+                raise ValueError("WEBHOOK_URL es requerido en modo webhook")
+            if not cls.WEBHOOK_SECRET_TOKEN:
+                raise ValueError("WEBHOOK_SECRET_TOKEN es requerido en modo webhook")
         return True 
\ No newline at end of file
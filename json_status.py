@@ -0,0 +1,150 @@
+"""
+Adaptadores de APIs de estado en JSON
+
+Muchas páginas de estado publican, además del HTML, un documento JSON
+compacto con el estado de cada componente. Estos parsers lo decodifican en
+estados por componente en lugar de buscar palabras clave en la página:
+
+- `StatuspageSummaryParser`: `/api/v2/summary.json` de las páginas de
+  Atlassian Statuspage (componentes, grupos e incidentes abiertos)
+- `GcpIncidentsParser`: `incidents.json` de Google Cloud (historial de
+  incidentes; los que no tienen `end` siguen abiertos)
+
+El resultado tiene el mismo formato que el de los parsers HTML. `services`
+lista solo los componentes afectados (o una entrada operativa si no hay
+ninguno) para que el mensaje de Telegram no crezca con el número de
+componentes; la lista completa queda en `components`.
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import Dict, List, Union
+
+logger = logging.getLogger(__name__)
+
+# Estado de los componentes de Statuspage en el formato del bot
+STATUSPAGE_COMPONENT_STATUS = {
+    'operational': 'Operational',
+    'degraded_performance': 'Degraded',
+    'partial_outage': 'Issue',
+    'major_outage': 'Issue',
+    'under_maintenance': 'Maintenance'
+}
+
+# Impacto de los incidentes de Google Cloud en el formato del bot
+GCP_IMPACT_STATUS = {
+    'SERVICE_OUTAGE': 'Issue',
+    'SERVICE_DISRUPTION': 'Degraded',
+    'SERVICE_INFORMATION': 'Information'
+}
+
+# Estados de componente que cuentan como problema en el estado general
+ISSUE_STATUSES = ('Issue', 'Degraded')
+
+
+def build_component_status(provider: str, components: List[Dict], all_clear_name: str,
+                           incidents: List[Dict]) -> Dict:
+    """Construir el estado de un proveedor a partir de sus componentes"""
+    affected = [component for component in components if component['status'] != 'Operational']
+    services = affected or [{'name': all_clear_name, 'status': 'Operational', 'region': 'Global'}]
+    has_issues = any(component['status'] in ISSUE_STATUSES for component in affected)
+
+    return {
+        'provider': provider,
+        'overall_status': 'Issues Detected' if has_issues else 'Operational',
+        'services': services,
+        'components': components,
+        'incidents': incidents,
+        'last_updated': datetime.now().isoformat()
+    }
+
+
+class JsonStatusParser:
+    """Base de los adaptadores JSON: decodifica el documento y captura los errores"""
+
+    def __init__(self, provider: str, label: str, all_clear_name: str):
+        self.provider = provider
+        self.label = label
+        self.all_clear_name = all_clear_name
+
+    def __call__(self, body: Union[str, bytes]) -> Dict:
+        try:
+            return self.parse(json.loads(body))
+        except Exception as e:
+            logger.error(f"Error parseando JSON de {self.label}: {e}")
+            return {"error": True, "message": "Error parseando datos"}
+
+    def parse(self, document) -> Dict:
+        raise NotImplementedError
+
+
+class StatuspageSummaryParser(JsonStatusParser):
+    """Parser del `summary.json` de Atlassian Statuspage
+
+    Los grupos de componentes se usan como región de sus componentes (las
+    páginas de los proveedores cloud suelen agrupar por región).
+    """
+
+    def parse(self, document: Dict) -> Dict:
+        raw_components = document['components']
+        groups = {item['id']: item['name'] for item in raw_components if item.get('group')}
+
+        components = []
+        for item in raw_components:
+            if item.get('group'):
+                continue
+            components.append({
+                'name': item['name'],
+                'status': STATUSPAGE_COMPONENT_STATUS.get(item.get('status'), 'Unknown'),
+                'region': groups.get(item.get('group_id'), 'Global')
+            })
+
+        incidents = [
+            {
+                'name': incident.get('name'),
+                'status': incident.get('status'),
+                'impact': incident.get('impact'),
+                'url': incident.get('shortlink')
+            }
+            for incident in document.get('incidents', [])
+        ]
+        status = build_component_status(self.provider, components, self.all_clear_name, incidents)
+
+        # Un incidente abierto sin componentes afectados también cuenta como problema
+        indicator = document.get('status', {}).get('indicator', 'none')
+        if indicator in ('minor', 'major', 'critical'):
+            status['overall_status'] = 'Issues Detected'
+        return status
+
+
+class GcpIncidentsParser(JsonStatusParser):
+    """Parser del `incidents.json` de Google Cloud
+
+    Cada producto afectado por un incidente abierto es un componente con las
+    ubicaciones afectadas como región.
+    """
+
+    def parse(self, document: List[Dict]) -> Dict:
+        components = []
+        incidents = []
+        for incident in document:
+            if incident.get('end'):
+                continue
+            status = GCP_IMPACT_STATUS.get(incident.get('status_impact'), 'Issue')
+            locations = incident.get('currently_affected_locations') or []
+            region = ', '.join(location['title'] for location in locations) or 'Global'
+            for product in incident.get('affected_products') or []:
+                components.append({
+                    'name': product['title'],
+                    'status': status,
+                    'region': region,
+                    'description': incident.get('external_desc', '')
+                })
+            incidents.append({
+                'name': incident.get('external_desc'),
+                'status': incident.get('status_impact'),
+                'impact': incident.get('severity'),
+                'url': f"https://status.cloud.google.com/{incident['uri']}" if incident.get('uri') else None
+            })
+        return build_component_status(self.provider, components, self.all_clear_name, incidents)
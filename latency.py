@@ -0,0 +1,66 @@
+"""
+Histogramas de latencia por URL
+"""
+
+from typing import Dict, Optional, Tuple
+
+# Límites superiores de los cubos del histograma en segundos
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.2, 0.3, 0.4, 0.5,
+    0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 30.0, float('inf')
+)
+
+
+class LatencyHistogram:
+    """Histograma de latencias con cubos fijos que da más peso a lo reciente
+
+    Cuando el número de observaciones supera `window`, todos los cubos se
+    reducen a la mitad, de modo que los percentiles siguen la latencia
+    reciente sin guardar cada muestra.
+    """
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        # Total de observaciones desde el arranque (sin reducir)
+        self.observations = 0
+        self.max_seconds = 0.0
+
+    def record(self, seconds: float):
+        """Registrar una latencia"""
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.counts[index] += 1
+                break
+        self.count += 1
+        self.observations += 1
+        self.max_seconds = max(self.max_seconds, seconds)
+
+        if self.count > self.window:
+            self.counts = [count // 2 for count in self.counts]
+            self.count = sum(self.counts)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Límite superior del cubo que contiene el percentil pedido
+
+        Devuelve None si no hay observaciones.
+        """
+        if not self.count:
+            return None
+        target = self.count * percent / 100
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            cumulative += count
+            if cumulative >= target and count:
+                return bound if bound != float('inf') else self.max_seconds
+        return self.max_seconds
+
+    def summary(self) -> Dict:
+        """Resumen con número de observaciones y percentiles principales"""
+        return {
+            'count': self.observations,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99)
+        }
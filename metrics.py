@@ -0,0 +1,234 @@
+"""
+Métricas en formato de exposición de Prometheus
+
+Los contadores e histogramas guardan sus valores en diccionarios indexados
+por la tupla de etiquetas; registrar una observación es una búsqueda en un
+diccionario, una búsqueda binaria en los límites y dos sumas, de modo que se
+pueden dejar siempre activas.
+"""
+
+import logging
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# Tipo de contenido del formato de exposición de texto
+EXPOSITION_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Límites por defecto de los histogramas de latencia (segundos)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    """Escapar el valor de una etiqueta"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    """Formatear las etiquetas como `{a="1",b="2"}`"""
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Contador monotónico con etiquetas"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1):
+        """Incrementar el contador de la combinación de etiquetas"""
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def collect(self) -> List[str]:
+        lines = []
+        for labelvalues, value in list(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Histograma con límites fijos y etiquetas"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Por etiquetas: [recuento por cubo (el último es +Inf), suma, total]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labelvalues: str):
+        """Registrar una observación para la combinación de etiquetas"""
+        entry = self._values.get(labelvalues)
+        if entry is None:
+            entry = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def count(self, *labelvalues: str) -> int:
+        entry = self._values.get(labelvalues)
+        return entry[2] if entry else 0
+
+    def collect(self) -> List[str]:
+        lines = []
+        bounds = self.buckets + (float('inf'),)
+        for labelvalues, (counts, total, count) in list(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, labelvalues, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Conjunto de métricas que se exponen juntas"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Métrica duplicada: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def exposition(self) -> str:
+        """Texto en formato de exposición de Prometheus (versión 0.0.4)"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.collect())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+UPSTREAM_REQUEST_SECONDS = REGISTRY.histogram(
+    'cloudstatus_upstream_request_seconds',
+    'Duración de cada intento de petición a una página de estado',
+    ('provider', 'url', 'status')
+)
+UPSTREAM_RETRIES = REGISTRY.counter(
+    'cloudstatus_upstream_retries_total',
+    'Reintentos de peticiones a páginas de estado',
+    ('provider', 'url')
+)
+UPSTREAM_RESPONSE_BYTES = REGISTRY.counter(
+    'cloudstatus_upstream_response_bytes_total',
+    'Bytes descargados de las páginas de estado',
+    ('provider', 'url')
+)
+PARSE_SECONDS = REGISTRY.histogram(
+    'cloudstatus_parse_seconds',
+    'Duración del análisis de las páginas de estado',
+    ('provider',)
+)
+STREAM_DECISION_SECONDS = REGISTRY.histogram(
+    'cloudstatus_stream_decision_seconds',
+    'Tiempo desde la petición hasta el resultado en las descargas incrementales '
+    '(decided: cortada al decidir, complete, truncated: límite de bytes, failed)',
+    ('provider', 'outcome')
+)
+STREAM_BYTES_SKIPPED = REGISTRY.counter(
+    'cloudstatus_stream_bytes_skipped_total',
+    'Bytes de las páginas de estado que no se descargaron al cortar la lectura',
+    ('provider',)
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    'cloudstatus_cache_requests_total',
+    'Consultas de estado por resultado en caché (hit, stale o miss)',
+    ('provider', 'result')
+)
+HANDLER_SECONDS = REGISTRY.histogram(
+    'cloudstatus_handler_seconds',
+    'Duración de los handlers de comandos y botones',
+    ('handler',)
+)
+THROTTLED_UPDATES = REGISTRY.counter(
+    'cloudstatus_throttled_updates_total',
+    'Comandos y botones no atendidos: rechazados por el límite del usuario o del chat '
+    '(rejected) o fusionados con otra pulsación sobre el mismo mensaje (merged)',
+    ('handler', 'result')
+)
+TELEGRAM_API_SECONDS = REGISTRY.histogram(
+    'cloudstatus_telegram_api_seconds',
+    'Duración de las llamadas a la Bot API de Telegram',
+    ('method',)
+)
+STATS_FLUSH_SECONDS = REGISTRY.histogram(
+    'cloudstatus_stats_flush_seconds',
+    'Duración del volcado de estadísticas al almacenamiento'
+)
+EVENT_LOOP_LAG_SECONDS = REGISTRY.histogram(
+    'cloudstatus_event_loop_lag_seconds',
+    'Retraso del bucle de eventos al atender una tarea programada (tiempo bloqueado)'
+)
+
+
+class MetricsServer:
+    """Servidor HTTP que expone las métricas para Prometheus"""
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY, listen: str = '0.0.0.0',
+                 port: int = 9100, path: str = '/metrics'):
+        self.registry = registry
+        self.listen = listen
+        self.port = port
+        self.path = '/' + path.lstrip('/')
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self):
+        """Arrancar el servidor de métricas"""
+        app = web.Application()
+        app.router.add_get(self.path, self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.listen, self.port).start()
+        logger.info(f"Métricas disponibles en {self.listen}:{self.port}{self.path}")
+
+    async def stop(self):
+        """Detener el servidor de métricas"""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        return web.Response(body=self.registry.exposition().encode('utf-8'),
+                            headers={'Content-Type': EXPOSITION_CONTENT_TYPE})
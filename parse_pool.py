@@ -0,0 +1,158 @@
+"""
+Ejecución de los parsers de páginas de estado fuera del bucle de eventos
+
+Las páginas de Azure y GCP ocupan varios megabytes: parsearlas en el bucle
+de eventos bloquea a todos los usuarios mientras dura. `ParsePool` las
+parsea en un pool de hilos o de procesos y `LoopLagMonitor` mide cuánto
+tiempo queda bloqueado el bucle.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import pickle
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Optional
+
+from metrics import EVENT_LOOP_LAG_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Modos de ejecución de los parsers
+PARSE_MODES = ('inline', 'thread', 'process')
+
+
+class ParsePool:
+    """Ejecutor de los parsers de páginas de estado
+
+    - `inline`: en el propio bucle de eventos
+    - `thread`: en un único hilo; el cuerpo (bytes) se pasa por referencia,
+      sin copias. Los parsers retienen el GIL, así que más hilos no parsean
+      más rápido y solo compiten más con el bucle por él
+    - `process`: en un pool de `workers` procesos, en paralelo real; el
+      cuerpo se copia una vez al proceso hijo. Los parsers con estado
+      compartido (el seguimiento incremental de AWS) se ejecutan en el hilo
+      para que su estado siga en este proceso
+
+    Los cuerpos de menos de `min_bytes` se parsean en el bucle: el salto al
+    ejecutor cuesta más que el propio parseo.
+    """
+
+    def __init__(self, mode: str = 'thread', workers: int = 2, min_bytes: int = 65536):
+        if mode not in PARSE_MODES:
+            logger.warning(f"Ejecutor de parsers '{mode}' desconocido, usando 'thread'")
+            mode = 'thread'
+        self.mode = mode
+        self.workers = workers
+        self.min_bytes = min_bytes
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+        # Parseos por modo de ejecución
+        self.stats: Dict[str, int] = {mode: 0 for mode in PARSE_MODES}
+
+    def mode_for(self, size: int, shared_state: bool = False) -> str:
+        """Modo en el que se parsea un cuerpo de `size` bytes"""
+        if self.mode == 'inline' or size < self.min_bytes:
+            return 'inline'
+        if self.mode == 'process' and not shared_state:
+            return 'process'
+        return 'thread'
+
+    def _get_threads(self) -> ThreadPoolExecutor:
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=1, thread_name_prefix='parse')
+        return self._threads
+
+    def _get_processes(self) -> ProcessPoolExecutor:
+        if self._processes is None:
+            # 'spawn': los hijos no heredan el bucle de eventos ni los sockets abiertos
+            self._processes = ProcessPoolExecutor(max_workers=self.workers,
+                                                  mp_context=multiprocessing.get_context('spawn'))
+        return self._processes
+
+    async def run(self, parser: Callable[[bytes], Dict], body: bytes, shared_state: bool = False) -> Dict:
+        """Parsear un cuerpo con el modo que le corresponde"""
+        mode = self.mode_for(len(body), shared_state)
+        self.stats[mode] += 1
+        if mode == 'inline':
+            return parser(body)
+
+        loop = asyncio.get_running_loop()
+        if mode == 'process':
+            try:
+                return await loop.run_in_executor(self._get_processes(), parser, body)
+            except BrokenProcessPool as e:
+                logger.warning(f"Pool de procesos de parseo caído ({e}), se recrea; parseando en un hilo")
+                self._processes = None
+            except (pickle.PicklingError, AttributeError) as e:
+                logger.warning(f"El parser no se puede enviar a otro proceso ({e}), parseando en un hilo")
+        return await loop.run_in_executor(self._get_threads(), parser, body)
+
+    def close(self):
+        """Detener los pools sin esperar a los parseos en curso"""
+        for executor in (self._threads, self._processes):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._threads = None
+        self._processes = None
+
+
+class LoopLagMonitor:
+    """Medidor del tiempo que el bucle de eventos pasa bloqueado
+
+    Cada `interval` segundos programa un despertar y compara cuándo se
+    atendió con cuándo debía: la diferencia es el tiempo que el bucle
+    estuvo ocupado con otra cosa (por ejemplo, un parseo). Los retrasos se
+    publican en la métrica `cloudstatus_event_loop_lag_seconds` y los que
+    superan `warn_threshold` se registran en el log.
+    """
+
+    def __init__(self, interval: float = 0.25, warn_threshold: float = 0.1, keep: int = 4096):
+        self.interval = interval
+        self.warn_threshold = warn_threshold
+        # Últimos retrasos medidos (segundos)
+        self.lags = deque(maxlen=keep)
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+        self.samples = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, lag: float):
+        """Registrar un retraso medido"""
+        self.lags.append(lag)
+        self.samples += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+        EVENT_LOOP_LAG_SECONDS.observe(lag)
+        if self.warn_threshold and lag >= self.warn_threshold:
+            logger.warning(f"Bucle de eventos bloqueado {lag * 1000:.0f} ms")
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, loop.time() - expected))
+
+    def start(self):
+        """Empezar a medir en el bucle de eventos actual"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Dejar de medir"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def summary(self) -> Dict:
+        """Resumen de los retrasos medidos en milisegundos"""
+        return {
+            'samples': self.samples,
+            'max_ms': round(self.max_lag * 1000, 3),
+            'mean_ms': round(self.total_lag / self.samples * 1000, 3) if self.samples else 0.0,
+            'blocked_ms': round(self.total_lag * 1000, 3)
+        }
@@ -0,0 +1,229 @@
+"""
+Registro declarativo de proveedores de estado
+
+Cada proveedor declara sus fuentes (URLs en orden de preferencia, cada una
+con su parser), el TTL de su caché y su prioridad. El comprobador de estado,
+los comandos y los teclados del bot se generan a partir de PROVIDERS, de
+modo que añadir una página de estado es añadir una entrada a `_SPECS`.
+"""
+
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Union
+
+from aws_feed import AwsFeedStreamParser, AwsIncidentTracker, parse_aws_rss
+from classifier import AZURE_CLASSIFIER, GCP_CLASSIFIER, OCI_CLASSIFIER, KeywordClassifier, KeywordStreamMatcher
+from config import Config
+from json_status import GcpIncidentsParser, StatuspageSummaryParser
+
+logger = logging.getLogger(__name__)
+
+
+def single_service_status(provider: str, service_name: str, has_issues: bool) -> Dict:
+    """Construir el estado de un proveedor con un único servicio global"""
+    return {
+        'provider': provider,
+        'overall_status': 'Issues Detected' if has_issues else 'Operational',
+        'services': [{
+            'name': service_name,
+            'status': 'Issue' if has_issues else 'Operational',
+            'region': 'Global'
+        }],
+        'last_updated': datetime.now().isoformat()
+    }
+
+
+class KeywordPageParser:
+    """Parser de páginas HTML clasificadas por palabras clave"""
+
+    def __init__(self, provider: str, service_name: str, classifier: KeywordClassifier, label: str):
+        self.provider = provider
+        self.service_name = service_name
+        self.classifier = classifier
+        self.label = label
+
+    def __call__(self, html_content: Union[str, bytes]) -> Dict:
+        try:
+            has_issues, matches = self.classifier.classify(html_content)
+            logger.debug(f"Indicadores de {self.label}: {matches}")
+            return single_service_status(self.provider, self.service_name, has_issues)
+        except Exception as e:
+            logger.error(f"Error parseando HTML de {self.label}: {e}")
+            return {"error": True, "message": "Error parseando datos"}
+
+    def stream(self) -> 'KeywordStreamParser':
+        """Parser incremental de la página, para descargas por fragmentos"""
+        return KeywordStreamParser(self)
+
+
+class KeywordStreamParser:
+    """Parser incremental de páginas HTML clasificadas por palabras clave
+
+    Clasifica los fragmentos según llegan y marca `done` en cuanto la
+    clasificación es definitiva, para que la descarga se corte ahí sin leer
+    el resto de la página.
+    """
+
+    def __init__(self, page_parser: KeywordPageParser):
+        self.page_parser = page_parser
+        self._matcher = KeywordStreamMatcher(page_parser.classifier)
+        self.parse_seconds = 0.0
+        self.failed = False
+        self.done = False
+
+    @property
+    def bytes_fed(self) -> int:
+        return self._matcher.bytes_fed
+
+    def feed(self, chunk: bytes):
+        """Clasificar un fragmento de la página"""
+        start = time.perf_counter()
+        self.done = self._matcher.feed(chunk)
+        self.parse_seconds += time.perf_counter() - start
+
+    def close(self) -> Dict:
+        """Devolver el estado con lo leído de la página"""
+        has_issues, matches = self._matcher.result()
+        logger.debug(f"Indicadores de {self.page_parser.label} ({self.bytes_fed} bytes leídos): {matches}")
+        return single_service_status(self.page_parser.provider, self.page_parser.service_name, has_issues)
+
+
+class StatusSource:
+    """Fuente de estado de un proveedor: una URL y el parser de su formato"""
+
+    def __init__(self, url: str, parser: Callable[[bytes], Dict], stream_parser: Optional[Callable] = None):
+        self.url = url
+        self.parser = parser
+        self.stream_parser = stream_parser
+
+
+class ProviderSpec:
+    """Declaración de un proveedor de estado
+
+    - `key`: identificador, usado también como comando del bot (/key)
+    - `label`: nombre corto para botones y listados
+    - `name`: nombre completo del proveedor
+    - `urls`: fuentes en orden de preferencia (las siguientes son alternativas);
+      una URL sin más usa `parser` y `stream_parser`, un `StatusSource` el suyo
+    - `parser`: función que convierte el cuerpo descargado (bytes) en el
+      estado; las páginas grandes se parsean fuera del bucle de eventos
+    - `stream_parser`: fábrica de parsers incrementales, si el formato lo
+      admite: reciben el cuerpo por fragmentos (`feed`) y pueden marcar
+      `done` para dejar de descargar en cuanto el resultado es definitivo
+    - `ttl`: duración de la caché en segundos (None = CACHE_DURATION)
+    - `priority`: orden en listados y consultas (menor primero)
+    - `fallback_service`: si ninguna URL responde, se asume operativo este
+      servicio; sin él se devuelve un error
+    - `tracker`: fábrica del estado incremental que se conserva entre
+      refrescos; cada comprobador crea uno y sus fuentes lo reciben en el
+      argumento `tracker` de `parser` y `stream_parser`
+    """
+
+    def __init__(self, key: str, label: str, name: str, urls: List[Union[str, StatusSource]],
+                 parser: Callable[[bytes], Dict], stream_parser: Optional[Callable] = None,
+                 ttl: Optional[int] = None, priority: int = 100, fallback_service: Optional[str] = None,
+                 tracker: Optional[Callable[[], object]] = None):
+        self.key = key
+        self.label = label
+        self.name = name
+        self.parser = parser
+        self.stream_parser = stream_parser
+        self.sources = [
+            source if isinstance(source, StatusSource) else StatusSource(source, parser, stream_parser)
+            for source in urls
+        ]
+        self.ttl = ttl
+        self.priority = priority
+        self.fallback_service = fallback_service
+        self.tracker = tracker
+
+    @property
+    def urls(self) -> List[str]:
+        """URLs de las fuentes en orden de preferencia"""
+        return [source.url for source in self.sources]
+
+    @property
+    def cache_ttl(self) -> int:
+        """Duración de la caché del proveedor en segundos"""
+        return self.ttl if self.ttl is not None else Config.CACHE_DURATION
+
+    @property
+    def refresh_interval(self) -> int:
+        """Intervalo de refresco en segundo plano (<KEY>_REFRESH_INTERVAL o el TTL)"""
+        return Config.REFRESH_INTERVALS.get(self.key, self.cache_ttl)
+
+    @property
+    def streaming(self) -> bool:
+        """Si las fuentes se descargan de forma incremental (<KEY>_STREAMING_FETCH o STREAMING_FETCH)"""
+        return Config.STREAMING_FETCH_PROVIDERS.get(self.key, Config.STREAMING_FETCH)
+
+    @property
+    def stream_max_bytes(self) -> int:
+        """Bytes leídos como máximo en una descarga incremental (<KEY>_STREAM_MAX_BYTES o STREAM_MAX_BYTES)"""
+        return Config.STREAM_MAX_BYTES_PROVIDERS.get(self.key, Config.STREAM_MAX_BYTES)
+
+
+_AZURE_PAGE = KeywordPageParser('Azure', 'Azure Services', AZURE_CLASSIFIER, 'Azure')
+_GCP_PAGE = KeywordPageParser('Google Cloud Platform', 'Google Cloud Services', GCP_CLASSIFIER, 'GCP')
+_OCI_PAGE = KeywordPageParser('Oracle Cloud Infrastructure', 'OCI Services', OCI_CLASSIFIER, 'OCI')
+
+_SPECS = [
+    ProviderSpec(
+        'azure', 'Azure', 'Microsoft Azure',
+        [
+            "https://status.azure.com/en-us/status/",
+            "https://azure.microsoft.com/en-us/status/"
+        ],
+        _AZURE_PAGE,
+        stream_parser=_AZURE_PAGE.stream,
+        priority=10,
+        fallback_service='Azure Services'
+    ),
+    # GCP publica sus incidentes en JSON; el HTML queda como alternativa
+    ProviderSpec(
+        'gcp', 'GCP', 'Google Cloud Platform',
+        [
+            StatusSource(
+                "https://status.cloud.google.com/incidents.json",
+                GcpIncidentsParser('Google Cloud Platform', 'GCP', 'Google Cloud Services')
+            ),
+            "https://status.cloud.google.com/",
+            "https://cloud.google.com/status"
+        ],
+        _GCP_PAGE,
+        stream_parser=_GCP_PAGE.stream,
+        priority=20,
+        fallback_service='Google Cloud Services'
+    ),
+    # AWS tiene una API RSS que podemos parsear; sus avisos se procesan por GUID
+    ProviderSpec(
+        'aws', 'AWS', 'Amazon Web Services',
+        ["https://status.aws.amazon.com/rss/all.rss"],
+        parse_aws_rss,
+        stream_parser=AwsFeedStreamParser,
+        priority=30,
+        tracker=AwsIncidentTracker
+    ),
+    # La página de estado de OCI es de Statuspage y publica su resumen en JSON
+    ProviderSpec(
+        'oci', 'OCI', 'Oracle Cloud Infrastructure',
+        [
+            StatusSource(
+                "https://ocistatus.oraclecloud.com/api/v2/summary.json",
+                StatuspageSummaryParser('Oracle Cloud Infrastructure', 'OCI', 'OCI Services')
+            ),
+            "https://ocistatus.oraclecloud.com/",
+            "https://status.oraclecloud.com/"
+        ],
+        _OCI_PAGE,
+        stream_parser=_OCI_PAGE.stream,
+        priority=40,
+        fallback_service='OCI Services'
+    )
+]
+
+# Proveedores soportados, ordenados por prioridad
+PROVIDERS: Dict[str, ProviderSpec] = {
+    spec.key: spec for spec in sorted(_SPECS, key=lambda spec: spec.priority)
+}
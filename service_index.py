@@ -0,0 +1,89 @@
+"""
+Índice en memoria de servicios y regiones por proveedor
+
+Cada vez que se guarda una instantánea de un proveedor se indexan sus
+entradas (componentes o servicios) por servicio y región, de modo que una
+consulta como `/aws ec2 us-east-1` es una búsqueda en un diccionario en
+lugar de recorrer y renderizar la lista completa.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_key(value: Optional[str]) -> str:
+    """Normalizar un nombre de servicio o región para usarlo como clave
+
+    "US East (Ashburn)" -> "us-east-ashburn", "EC2" -> "ec2".
+    """
+    return _NON_ALNUM.sub('-', (value or '').lower()).strip('-')
+
+
+class ServiceIndex:
+    """Índice proveedor -> servicio -> región -> entradas
+
+    Las entradas de cada servicio y región conservan el orden de la
+    instantánea (en los feeds, el aviso más reciente primero).
+    """
+
+    def __init__(self):
+        self._index: Dict[str, Dict[str, Dict[str, List[Dict]]]] = {}
+        self._versions: Dict[str, int] = {}
+
+    def update(self, provider: str, status: Dict, version: Optional[int] = None):
+        """Reindexar un proveedor con su nueva instantánea
+
+        Las instantáneas con error no cambian el índice y una versión ya
+        indexada no se vuelve a procesar.
+        """
+        if status.get('error'):
+            return
+        if version is not None and self._versions.get(provider) == version:
+            return
+
+        index: Dict[str, Dict[str, List[Dict]]] = {}
+        for entry in status.get('components') or status.get('services') or []:
+            service = normalize_key(entry.get('service') or entry.get('name'))
+            region = normalize_key(entry.get('region')) or 'global'
+            index.setdefault(service, {}).setdefault(region, []).append(entry)
+
+        self._index[provider] = index
+        if version is not None:
+            self._versions[provider] = version
+
+    def lookup(self, provider: str, service: str, region: Optional[str] = None) -> Dict[str, Dict[str, List[Dict]]]:
+        """Buscar las entradas de un servicio (y opcionalmente una región)
+
+        Se busca primero la clave exacta y, si no existe, los servicios o
+        regiones que contienen el texto buscado. Devuelve
+        {servicio: {región: entradas}}.
+        """
+        index = self._index.get(provider, {})
+        services = self._match(index, normalize_key(service))
+
+        results = {}
+        for service_key in services:
+            regions = index[service_key]
+            if region is not None:
+                regions = {key: regions[key] for key in self._match(regions, normalize_key(region))}
+            if regions:
+                results[service_key] = regions
+        return results
+
+    @staticmethod
+    def _match(keys: Dict, query: str) -> List[str]:
+        if not query:
+            return []
+        if query in keys:
+            return [query]
+        return [key for key in keys if query in key]
+
+    def services(self, provider: str) -> List[str]:
+        """Servicios indexados de un proveedor"""
+        return sorted(self._index.get(provider, {}))
+
+    def regions(self, provider: str, service: str) -> List[str]:
+        """Regiones indexadas de un servicio"""
+        return sorted(self._index.get(provider, {}).get(normalize_key(service), {}))
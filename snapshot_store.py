@@ -0,0 +1,143 @@
+"""
+Instantáneas persistentes de la caché para arranques en caliente
+
+Las instantáneas de los proveedores y los validadores HTTP (ETag /
+Last-Modified con su último resultado) se guardan en un único archivo
+binario de registros con longitud prefijada:
+
+    cabecera: MAGIC (8 bytes)
+    registro: tipo (1 byte) | longitud de la clave (2 bytes) |
+              longitud de los datos (4 bytes) | clave (UTF-8) | datos
+
+Los datos son JSON comprimido con zlib. Al arrancar el archivo se proyecta
+en memoria con mmap y solo se recorren las cabeceras; cada registro se
+decodifica la primera vez que se pide.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Identificador y versión del formato
+MAGIC = b'CSBSNAP1'
+
+# Cabecera de cada registro: tipo, longitud de la clave y longitud de los datos
+RECORD_HEADER = struct.Struct('>BHI')
+
+# Tipos de registro
+SNAPSHOT_RECORD = 1
+VALIDATORS_RECORD = 2
+
+# Nivel de compresión de los datos (rápido; el JSON de estado comprime bien igualmente)
+COMPRESSION_LEVEL = 1
+
+
+class SnapshotStore:
+    """Archivo de instantáneas con carga perezosa por registro
+
+    `pop_snapshot` y `pop_validators` devuelven cada registro una sola vez:
+    lo que ya se restauró vive en la memoria del comprobador.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        # (tipo, clave) -> (posición, longitud) de los datos pendientes de restaurar
+        self._index: Optional[Dict[Tuple[int, str], Tuple[int, int]]] = None
+        self._map: Optional[mmap.mmap] = None
+
+    def _open(self):
+        """Proyectar el archivo en memoria e indexar sus registros sin decodificarlos"""
+        if self._index is not None:
+            return
+        self._index = {}
+        try:
+            with open(self.path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size <= len(MAGIC):
+                    return
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"No se pudo abrir el archivo de instantáneas {self.path}: {e}")
+            return
+
+        if self._map[:len(MAGIC)] != MAGIC:
+            logger.warning(f"{self.path} no es un archivo de instantáneas, se ignora")
+            self.close()
+            return
+
+        offset = len(MAGIC)
+        size = len(self._map)
+        while offset + RECORD_HEADER.size <= size:
+            kind, key_length, data_length = RECORD_HEADER.unpack_from(self._map, offset)
+            offset += RECORD_HEADER.size
+            if offset + key_length + data_length > size:
+                logger.warning(f"Archivo de instantáneas {self.path} truncado, se ignora el resto")
+                break
+            key = self._map[offset:offset + key_length].decode('utf-8')
+            self._index[(kind, key)] = (offset + key_length, data_length)
+            offset += key_length + data_length
+        logger.info(f"Archivo de instantáneas {self.path}: {len(self._index)} registros")
+
+    def _pop(self, kind: int, key: str) -> Optional[Dict]:
+        """Decodificar un registro y retirarlo del índice"""
+        self._open()
+        location = self._index.pop((kind, key), None)
+        if location is None:
+            return None
+        start, length = location
+        try:
+            return json.loads(zlib.decompress(self._map[start:start + length]))
+        except (zlib.error, ValueError) as e:
+            logger.warning(f"Registro {key} del archivo de instantáneas dañado: {e}")
+            return None
+
+    def pop_snapshot(self, provider: str) -> Optional[Dict]:
+        """Instantánea guardada de un proveedor ({'status', 'timestamp', 'version'})"""
+        return self._pop(SNAPSHOT_RECORD, provider)
+
+    def pop_validators(self, url: str) -> Optional[Dict]:
+        """Validadores HTTP guardados de una URL, con su último resultado"""
+        return self._pop(VALIDATORS_RECORD, url)
+
+    def write(self, snapshots: Dict[str, Dict], validators: Dict[str, Dict]):
+        """Escribir el archivo completo de forma atómica
+
+        Es E/S bloqueante: desde el bucle de eventos se llama en un executor.
+        Antes se libera la proyección del archivo anterior (Windows no deja
+        reemplazar un archivo proyectado), así que los registros que se
+        quieran conservar deben haberse restaurado ya.
+        """
+        self.close()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix='.snapshots.', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(MAGIC)
+                for kind, records in ((SNAPSHOT_RECORD, snapshots), (VALIDATORS_RECORD, validators)):
+                    for key, value in records.items():
+                        key_bytes = key.encode('utf-8')
+                        data = zlib.compress(json.dumps(value, ensure_ascii=False).encode('utf-8'),
+                                             COMPRESSION_LEVEL)
+                        f.write(RECORD_HEADER.pack(kind, len(key_bytes), len(data)))
+                        f.write(key_bytes)
+                        f.write(data)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def close(self):
+        """Liberar la proyección en memoria del archivo (los registros sin restaurar se descartan)"""
+        self._index = {}
+        if self._map is not None:
+            self._map.close()
+            self._map = None
@@ -2,55 +2,171 @@
 Módulo para manejar estadísticas y métricas del bot
 """
 
-import json
-import os
+import asyncio
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import logging
+import time
+from metrics import STATS_FLUSH_SECONDS
+from providers import PROVIDERS
+from stats_storage import JsonStatsStorage, StatsStorage
 
 logger = logging.getLogger(__name__)
 
 class BotStatistics:
     """Clase para manejar estadísticas del bot"""
     
-    def __init__(self, stats_file: str = "bot_stats.json"):
+    def __init__(self, stats_file: str = "bot_stats.json", write_behind: bool = False,
+                 flush_interval: int = 30, flush_threshold: int = 50,
+                 storage: Optional[StatsStorage] = None, retention_days: int = 30):
         self.stats_file = stats_file
+        self.storage = storage or JsonStatsStorage(stats_file)
+        # Días de estadísticas diarias que se mantienen en memoria
+        self.retention_days = retention_days
         self.stats = self._load_stats()
+        # Escritura diferida: los cambios se acumulan en memoria y se vuelcan
+        # cada `flush_interval` segundos o al llegar a `flush_threshold` cambios
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._dirty = 0
+        self._pending_events: List[Dict] = []
+        # Un solo volcado a la vez: uno antiguo no puede pisar a otro más reciente
+        self._flush_lock = asyncio.Lock()
+        self._flush_task = None
+        self._periodic_task = None
     
     def _load_stats(self) -> Dict:
-        """Cargar estadísticas desde archivo"""
-        try:
-            if os.path.exists(self.stats_file):
-                with open(self.stats_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception as e:
-            logger.error(f"Error cargando estadísticas: {e}")
-        
-        return {
+        """Cargar estadísticas desde el almacenamiento"""
+        stats = {
             'total_commands': 0,
             'commands_by_type': {},
             'uptime_start': datetime.now().isoformat(),
             'last_command': None,
             'daily_stats': {},
             'provider_checks': {
-                'azure': {'total': 0, 'success': 0, 'errors': 0},
-                'gcp': {'total': 0, 'success': 0, 'errors': 0},
-                'aws': {'total': 0, 'success': 0, 'errors': 0},
-                'oci': {'total': 0, 'success': 0, 'errors': 0}
-            }
+                provider: {'total': 0, 'success': 0, 'errors': 0} for provider in PROVIDERS
+            },
+            # Comandos y botones rechazados por los límites o fusionados con otra pulsación
+            'throttled': {'rejected': 0, 'merged': 0}
         }
+        
+        try:
+            loaded = self.storage.load()
+            if loaded:
+                provider_checks = stats['provider_checks']
+                provider_checks.update(loaded.get('provider_checks', {}))
+                throttled = stats['throttled']
+                throttled.update(loaded.get('throttled', {}))
+                stats.update(loaded)
+                stats['provider_checks'] = provider_checks
+                stats['throttled'] = throttled
+        except Exception as e:
+            logger.error(f"Error cargando estadísticas: {e}")
+        
+        return stats
+    
+    def _compact_daily_stats(self):
+        """Descartar de memoria las estadísticas diarias fuera de la retención"""
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).strftime('%Y-%m-%d')
+        for day in [day for day in self.stats['daily_stats'] if day < cutoff]:
+            del self.stats['daily_stats'][day]
+    
+    def _prepare_payload(self):
+        """Tomar una instantánea consistente de los cambios pendientes"""
+        self._compact_daily_stats()
+        payload = self.storage.prepare(self.stats, self._pending_events)
+        self._pending_events = []
+        self._dirty = 0
+        return payload
+    
+    def _requeue(self, events: List[Dict]):
+        """Devolver a la cola los eventos de un guardado fallido para reintentarlos"""
+        if events is not self._pending_events:
+            self._pending_events[:0] = events
+            self._dirty += len(events)
     
     def _save_stats(self):
-        """Guardar estadísticas en archivo"""
+        """Guardar estadísticas en el almacenamiento"""
+        start = time.perf_counter()
+        events = self._pending_events
         try:
-            with open(self.stats_file, 'w', encoding='utf-8') as f:
-                json.dump(self.stats, f, indent=2, ensure_ascii=False)
+            self.storage.write(self._prepare_payload())
+            STATS_FLUSH_SECONDS.observe(time.perf_counter() - start)
         except Exception as e:
             logger.error(f"Error guardando estadísticas: {e}")
+            self._requeue(events)
+    
+    def _mark_dirty(self, event: Dict):
+        """Registrar un cambio pendiente de guardar"""
+        self._pending_events.append(event)
+        self._dirty += 1
+        if not self.write_behind:
+            self._save_stats()
+        elif self._dirty >= self.flush_threshold:
+            self._schedule_flush()
+    
+    def _schedule_flush(self):
+        """Lanzar un volcado en segundo plano si no hay otro en curso"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Sin bucle de eventos se guarda directamente
+            self._save_stats()
+            return
+        
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self.flush())
+    
+    async def flush(self):
+        """Volcar los cambios pendientes fuera del bucle de eventos
+        
+        Los volcados se hacen de uno en uno y, si el guardado falla, los
+        eventos vuelven a la cola para el siguiente.
+        """
+        async with self._flush_lock:
+            if self._dirty == 0:
+                return
+            start = time.perf_counter()
+            events = self._pending_events
+            try:
+                # La instantánea se toma en el bucle para que sea consistente
+                payload = self._prepare_payload()
+                await asyncio.get_running_loop().run_in_executor(None, self.storage.write, payload)
+                STATS_FLUSH_SECONDS.observe(time.perf_counter() - start)
+            except Exception as e:
+                logger.error(f"Error guardando estadísticas: {e}")
+                self._requeue(events)
+    
+    async def _flush_loop(self):
+        """Volcar periódicamente los cambios pendientes"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+    
+    def start(self):
+        """Iniciar el volcado periódico de estadísticas"""
+        if self.write_behind and (self._periodic_task is None or self._periodic_task.done()):
+            self._periodic_task = asyncio.get_running_loop().create_task(self._flush_loop())
+    
+    async def close(self):
+        """Detener el volcado periódico, guardar los cambios pendientes y cerrar el almacenamiento"""
+        if self._periodic_task is not None:
+            # Con el bloqueo tomado no se cancela un volcado a medio escribir
+            async with self._flush_lock:
+                self._periodic_task.cancel()
+            await asyncio.gather(self._periodic_task, return_exceptions=True)
+            self._periodic_task = None
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        await self.flush()
+        async with self._flush_lock:
+            self.storage.close()
     
     def record_command(self, command: str, user_id: Optional[int] = None):
         """Registrar un comando ejecutado"""
-        today = datetime.now().strftime('%Y-%m-%d')
+        now = datetime.now()
+        today = now.strftime('%Y-%m-%d')
         
         # Incrementar contador total
         self.stats['total_commands'] += 1
@@ -63,7 +179,7 @@ class BotStatistics:
         # Actualizar último comando
         self.stats['last_command'] = {
             'command': command,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': now.isoformat(),
             'user_id': user_id
         }
         
@@ -80,18 +196,41 @@ class BotStatistics:
             self.stats['daily_stats'][today]['commands_by_type'][command] = 0
         self.stats['daily_stats'][today]['commands_by_type'][command] += 1
         
-        self._save_stats()
+        self._mark_dirty({
+            'type': 'command',
+            'command': command,
+            'user_id': user_id,
+            'timestamp': now.isoformat()
+        })
     
     def record_provider_check(self, provider: str, success: bool):
         """Registrar verificación de proveedor"""
-        if provider in self.stats['provider_checks']:
-            self.stats['provider_checks'][provider]['total'] += 1
-            if success:
-                self.stats['provider_checks'][provider]['success'] += 1
-            else:
-                self.stats['provider_checks'][provider]['errors'] += 1
+        if provider not in self.stats['provider_checks']:
+            return
+        
+        self.stats['provider_checks'][provider]['total'] += 1
+        if success:
+            self.stats['provider_checks'][provider]['success'] += 1
+        else:
+            self.stats['provider_checks'][provider]['errors'] += 1
         
-        self._save_stats()
+        self._mark_dirty({
+            'type': 'provider_check',
+            'provider': provider,
+            'success': success,
+            'timestamp': datetime.now().isoformat()
+        })
+    
+    def record_throttled(self, result: str, command: str, user_id: Optional[int] = None):
+        """Registrar un comando o botón no atendido ('rejected' o 'merged')"""
+        self.stats['throttled'][result] += 1
+        self._mark_dirty({
+            'type': 'throttled',
+            'result': result,
+            'command': command,
+            'user_id': user_id,
+            'timestamp': datetime.now().isoformat()
+        })
     
     def get_uptime(self) -> str:
         """Obtener tiempo de actividad del bot"""
@@ -145,6 +284,11 @@ class BotStatistics:
             for stat in provider_stats:
                 summary += f"• {stat}\n"
         
+        throttled = self.stats['throttled']
+        if throttled['rejected'] or throttled['merged']:
+            summary += (f"\n🚦 *Pulsaciones limitadas:* {throttled['rejected']} rechazadas, "
+                        f"{throttled['merged']} fusionadas\n")
+        
         return summary
     
     def get_daily_stats(self, days: int = 7) -> str:
@@ -0,0 +1,305 @@
+"""
+Backends de almacenamiento para las estadísticas del bot
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class StatsStorage:
+    """Interfaz de almacenamiento de estadísticas
+
+    `prepare` se ejecuta en el bucle de eventos y debe devolver una copia
+    consistente de lo que hay que guardar; `write` recibe esa copia y puede
+    ejecutarse en otro hilo.
+    """
+
+    def load(self) -> Optional[Dict]:
+        """Cargar las estadísticas acumuladas o None si no hay datos"""
+        raise NotImplementedError
+
+    def prepare(self, stats: Dict, events: List[Dict]) -> Any:
+        """Preparar los datos a guardar a partir del estado y los eventos nuevos"""
+        raise NotImplementedError
+
+    def write(self, payload: Any):
+        """Guardar los datos preparados"""
+        raise NotImplementedError
+
+    def close(self):
+        """Liberar recursos"""
+
+
+class JsonStatsStorage(StatsStorage):
+    """Almacenamiento en un único archivo JSON reescrito completo"""
+
+    def __init__(self, stats_file: str = "bot_stats.json"):
+        self.stats_file = stats_file
+
+    def load(self) -> Optional[Dict]:
+        if os.path.exists(self.stats_file):
+            with open(self.stats_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return None
+
+    def prepare(self, stats: Dict, events: List[Dict]) -> str:
+        # Sin indentación json usa el codificador en C, mucho más rápido
+        return json.dumps(stats, ensure_ascii=False)
+
+    def write(self, payload: str):
+        """Escribir el archivo de forma atómica (archivo temporal + rename)"""
+        directory = os.path.dirname(os.path.abspath(self.stats_file))
+        fd, tmp_path = tempfile.mkstemp(prefix='.bot_stats.', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.stats_file)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+class SQLiteStatsStorage(StatsStorage):
+    """Registro de eventos en SQLite (modo WAL) con agregados incrementales
+
+    Cada comando, verificación de proveedor y pulsación limitada se añade a
+    la tabla `events` y, en la misma transacción, se actualizan los agregados diarios y totales.
+    Los eventos más antiguos que `event_retention_days` se compactan (se
+    borran), ya que sus agregados se conservan. Si la base de datos está
+    vacía y existe `legacy_json` (el archivo del almacenamiento JSON), se
+    importan sus totales para no empezar de cero.
+    """
+
+    def __init__(self, db_file: str = "bot_stats.db", daily_retention_days: int = 30,
+                 event_retention_days: int = 7, legacy_json: Optional[str] = None):
+        self.db_file = db_file
+        self.daily_retention_days = daily_retention_days
+        self.event_retention_days = event_retention_days
+        self._lock = threading.Lock()
+        self._last_compaction = None
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+        if legacy_json:
+            self._import_json(legacy_json)
+
+    def _create_schema(self):
+        """Crear las tablas si no existen"""
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    type TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    user_id INTEGER,
+                    success INTEGER
+                );
+                CREATE INDEX IF NOT EXISTS events_timestamp ON events (timestamp);
+                CREATE TABLE IF NOT EXISTS command_totals (
+                    command TEXT PRIMARY KEY,
+                    count INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS daily_commands (
+                    day TEXT NOT NULL,
+                    command TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (day, command)
+                );
+                CREATE TABLE IF NOT EXISTS provider_checks (
+                    provider TEXT PRIMARY KEY,
+                    total INTEGER NOT NULL,
+                    success INTEGER NOT NULL,
+                    errors INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS throttle_totals (
+                    result TEXT PRIMARY KEY,
+                    count INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+            """)
+
+    def _import_json(self, stats_file: str):
+        """Importar los totales de un archivo JSON en una base de datos vacía
+
+        Solo se importan los agregados: el archivo JSON no guarda eventos.
+        """
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM meta WHERE key = 'uptime_start'").fetchone():
+                return
+        try:
+            stats = JsonStatsStorage(stats_file).load()
+        except (OSError, ValueError) as e:
+            logger.error(f"No se pudieron importar las estadísticas de {stats_file}: {e}")
+            return
+        if not stats or 'uptime_start' not in stats:
+            return
+
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO meta (key, value) VALUES ('uptime_start', ?)", (stats['uptime_start'],))
+            if stats.get('last_command') is not None:
+                self._conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('last_command', ?)",
+                    (json.dumps(stats['last_command']),)
+                )
+            self._conn.executemany(
+                "INSERT INTO command_totals (command, count) VALUES (?, ?)",
+                stats.get('commands_by_type', {}).items()
+            )
+            self._conn.executemany(
+                "INSERT INTO daily_commands (day, command, count) VALUES (?, ?, ?)",
+                [(day, command, count) for day, daily in stats.get('daily_stats', {}).items()
+                 for command, count in daily.get('commands_by_type', {}).items()]
+            )
+            self._conn.executemany(
+                "INSERT INTO provider_checks (provider, total, success, errors) VALUES (?, ?, ?, ?)",
+                [(provider, checks['total'], checks['success'], checks['errors'])
+                 for provider, checks in stats.get('provider_checks', {}).items()]
+            )
+            self._conn.executemany(
+                "INSERT INTO throttle_totals (result, count) VALUES (?, ?)",
+                stats.get('throttled', {}).items()
+            )
+        logger.info(f"Importadas las estadísticas de {stats_file} en {self.db_file}")
+
+    def load(self) -> Optional[Dict]:
+        cutoff = (datetime.now() - timedelta(days=self.daily_retention_days)).strftime('%Y-%m-%d')
+        with self._lock:
+            meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+            if 'uptime_start' not in meta:
+                return None
+
+            commands_by_type = dict(self._conn.execute("SELECT command, count FROM command_totals"))
+
+            daily_stats = {}
+            rows = self._conn.execute(
+                "SELECT day, command, count FROM daily_commands WHERE day >= ? ORDER BY day", (cutoff,)
+            )
+            for day, command, count in rows:
+                daily = daily_stats.setdefault(day, {'total_commands': 0, 'commands_by_type': {}})
+                daily['total_commands'] += count
+                daily['commands_by_type'][command] = count
+
+            provider_checks = {
+                provider: {'total': total, 'success': success, 'errors': errors}
+                for provider, total, success, errors in self._conn.execute(
+                    "SELECT provider, total, success, errors FROM provider_checks"
+                )
+            }
+
+            throttled = dict(self._conn.execute("SELECT result, count FROM throttle_totals"))
+
+        return {
+            'total_commands': sum(commands_by_type.values()),
+            'commands_by_type': commands_by_type,
+            'uptime_start': meta['uptime_start'],
+            'last_command': json.loads(meta['last_command']) if 'last_command' in meta else None,
+            'daily_stats': daily_stats,
+            'provider_checks': provider_checks,
+            'throttled': throttled
+        }
+
+    def prepare(self, stats: Dict, events: List[Dict]) -> Dict:
+        return {
+            'uptime_start': stats['uptime_start'],
+            'last_command': stats['last_command'],
+            'events': list(events)
+        }
+
+    def write(self, payload: Dict):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('uptime_start', ?)",
+                (payload['uptime_start'],)
+            )
+            if payload['last_command'] is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('last_command', ?)",
+                    (json.dumps(payload['last_command']),)
+                )
+
+            for event in payload['events']:
+                if event['type'] == 'command':
+                    self._record_command(event)
+                elif event['type'] == 'throttled':
+                    self._record_throttled(event)
+                else:
+                    self._record_provider_check(event)
+
+        self._compact()
+
+    def _record_command(self, event: Dict):
+        """Añadir un comando al registro y actualizar sus agregados"""
+        self._conn.execute(
+            "INSERT INTO events (timestamp, type, name, user_id) VALUES (?, 'command', ?, ?)",
+            (event['timestamp'], event['command'], event['user_id'])
+        )
+        self._conn.execute(
+            "INSERT INTO command_totals (command, count) VALUES (?, 1) "
+            "ON CONFLICT (command) DO UPDATE SET count = count + 1",
+            (event['command'],)
+        )
+        self._conn.execute(
+            "INSERT INTO daily_commands (day, command, count) VALUES (?, ?, 1) "
+            "ON CONFLICT (day, command) DO UPDATE SET count = count + 1",
+            (event['timestamp'][:10], event['command'])
+        )
+
+    def _record_provider_check(self, event: Dict):
+        """Añadir una verificación de proveedor al registro y actualizar sus agregados"""
+        success = 1 if event['success'] else 0
+        self._conn.execute(
+            "INSERT INTO events (timestamp, type, name, success) VALUES (?, 'provider_check', ?, ?)",
+            (event['timestamp'], event['provider'], success)
+        )
+        self._conn.execute(
+            "INSERT INTO provider_checks (provider, total, success, errors) VALUES (?, 1, ?, ?) "
+            "ON CONFLICT (provider) DO UPDATE SET total = total + 1, "
+            "success = success + excluded.success, errors = errors + excluded.errors",
+            (event['provider'], success, 1 - success)
+        )
+
+    def _record_throttled(self, event: Dict):
+        """Añadir un comando o botón no atendido al registro y actualizar su total"""
+        self._conn.execute(
+            "INSERT INTO events (timestamp, type, name, user_id) VALUES (?, 'throttled', ?, ?)",
+            (event['timestamp'], event['command'], event['user_id'])
+        )
+        self._conn.execute(
+            "INSERT INTO throttle_totals (result, count) VALUES (?, 1) "
+            "ON CONFLICT (result) DO UPDATE SET count = count + 1",
+            (event['result'],)
+        )
+
+    def _compact(self):
+        """Borrar eventos antiguos una vez al día"""
+        today = datetime.now().strftime('%Y-%m-%d')
+        if self._last_compaction == today:
+            return
+        cutoff = (datetime.now() - timedelta(days=self.event_retention_days)).isoformat()
+        with self._lock, self._conn:
+            deleted = self._conn.execute("DELETE FROM events WHERE timestamp < ?", (cutoff,)).rowcount
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._last_compaction = today
+        if deleted:
+            logger.info(f"Compactados {deleted} eventos de estadísticas anteriores a {cutoff[:10]}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,290 @@
+"""
+Suscripciones a cambios de estado y envío de notificaciones con límite de ritmo
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+import uuid
+from typing import Dict, List, Optional, Set
+import logging
+
+from telegram.error import Forbidden, NetworkError, RetryAfter, TelegramError
+
+logger = logging.getLogger(__name__)
+
+# Pausa del envío tras un error de red o inesperado (segundos)
+SEND_ERROR_PAUSE = 2.0
+
+
+def _write_json_atomic(path: str, data):
+    """Escribir un archivo JSON de forma atómica (archivo temporal + rename)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _read_json(path: str, default):
+    """Leer un archivo JSON o devolver `default` si no existe o está dañado"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except Exception as e:
+        logger.error(f"Error leyendo {path}: {e}")
+        return default
+
+
+def _service_statuses(snapshot: Dict) -> Dict:
+    """Estado de cada servicio de una instantánea por (servicio, región)
+
+    Se usa la lista completa `components` si existe (los adaptadores JSON
+    solo ponen en `services` los componentes afectados). Los avisos de AWS
+    se identifican por servicio y no por título, que cambia en cada
+    actualización; si varios coinciden, prevalece el que no está operativo.
+    """
+    statuses = {}
+    for entry in snapshot.get('components') or snapshot.get('services', []):
+        key = (entry.get('service') or entry.get('name'), entry.get('region'))
+        status = entry.get('status', 'Unknown')
+        if statuses.get(key, 'Operational') == 'Operational':
+            statuses[key] = status
+    return statuses
+
+
+def diff_snapshots(previous: Optional[Dict], current: Optional[Dict]) -> List[Dict]:
+    """Comparar dos instantáneas de un proveedor
+
+    Devuelve los cambios de `overall_status` y de estado de cada servicio.
+    Un servicio que solo aparece en una de las dos cuenta como Operational
+    en la otra, así que las altas y bajas también son cambios. No hay
+    cambios si falta alguna de las dos o alguna es un error.
+    """
+    if not previous or not current or previous.get('error') or current.get('error'):
+        return []
+
+    changes = []
+    if previous.get('overall_status') != current.get('overall_status'):
+        changes.append({
+            'name': None,
+            'before': previous.get('overall_status', 'Unknown'),
+            'after': current.get('overall_status', 'Unknown')
+        })
+
+    before = _service_statuses(previous)
+    after = _service_statuses(current)
+    for key in list(before) + [key for key in after if key not in before]:
+        old, new = before.get(key, 'Operational'), after.get(key, 'Operational')
+        if old != new:
+            name, region = key
+            label = f"{name} ({region})" if region and region != 'Global' else name
+            changes.append({'name': label, 'before': old, 'after': new})
+    return changes
+
+
+def format_change_message(provider_name: str, changes: List[Dict]) -> str:
+    """Formatear la notificación de un cambio de estado"""
+    message = f"🔔 *Cambio de estado en {provider_name}*\n\n"
+    for change in changes:
+        emoji = "🟢" if change['after'] in ('Operational',) else "🔴"
+        if change['name'] is None:
+            message += f"{emoji} *Estado general:* {change['before']} → {change['after']}\n"
+        else:
+            message += f"{emoji} *{change['name']}:* {change['before']} → {change['after']}\n"
+    return message
+
+
+class SubscriptionStore:
+    """Suscripciones persistentes de chats a proveedores"""
+
+    def __init__(self, path: str = "subscriptions.json"):
+        self.path = path
+        data = _read_json(path, {})
+        self._subscriptions: Dict[str, Set[int]] = {provider: set(chats) for provider, chats in data.items()}
+
+    def _save(self):
+        _write_json_atomic(self.path, {provider: sorted(chats) for provider, chats in self._subscriptions.items()})
+
+    def subscribe(self, chat_id: int, provider: str) -> bool:
+        """Suscribir un chat a un proveedor; devuelve False si ya lo estaba"""
+        chats = self._subscriptions.setdefault(provider, set())
+        if chat_id in chats:
+            return False
+        chats.add(chat_id)
+        self._save()
+        return True
+
+    def unsubscribe(self, chat_id: int, provider: Optional[str] = None) -> List[str]:
+        """Cancelar la suscripción a un proveedor o a todos; devuelve los cancelados"""
+        removed = []
+        for name, chats in self._subscriptions.items():
+            if (provider is None or name == provider) and chat_id in chats:
+                chats.discard(chat_id)
+                removed.append(name)
+        if removed:
+            self._save()
+        return removed
+
+    def subscribers(self, provider: str) -> List[int]:
+        """Chats suscritos a un proveedor"""
+        return sorted(self._subscriptions.get(provider, ()))
+
+    def providers_for(self, chat_id: int) -> List[str]:
+        """Proveedores a los que está suscrito un chat"""
+        return sorted(name for name, chats in self._subscriptions.items() if chat_id in chats)
+
+
+class ChangeNotifier:
+    """Envío de notificaciones por lotes respetando los límites de Telegram
+
+    Cada notificación pendiente se guarda en un archivo con los chats que aún
+    no la recibieron; tras cada lote se guarda el progreso (en otro hilo), de
+    modo que un reinicio continúa donde se quedó. Se limita el ritmo global
+    de envío y el intervalo mínimo entre mensajes a un mismo chat. Los errores
+    de red dejan el chat para un lote posterior.
+    """
+
+    def __init__(self, store: SubscriptionStore, outbox_path: str = "notify_outbox.json",
+                 global_rate: float = 25, per_chat_interval: float = 1.0, batch_size: int = 25):
+        self.store = store
+        self.outbox_path = outbox_path
+        self.global_interval = 1.0 / global_rate
+        self.per_chat_interval = per_chat_interval
+        self.batch_size = batch_size
+        self._jobs: List[Dict] = _read_json(outbox_path, [])
+        self._last_sent: Dict[int, float] = {}
+        self._next_send = 0.0
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._bot = None
+        self._write_future = None
+        self.stats = {'sent': 0, 'failed': 0, 'retried': 0, 'unsubscribed': 0}
+
+    def notify(self, provider: str, text: str):
+        """Encolar una notificación para los suscriptores de un proveedor"""
+        chat_ids = self.store.subscribers(provider)
+        if not chat_ids:
+            return
+        self._jobs.append({'id': uuid.uuid4().hex, 'provider': provider, 'text': text, 'chat_ids': chat_ids})
+        # El envío en segundo plano la guarda en el archivo al despertar
+        self._wakeup.set()
+        logger.info(f"Notificación de {provider} encolada para {len(chat_ids)} chats")
+
+    def _save_outbox(self, jobs: Optional[List[Dict]] = None):
+        try:
+            _write_json_atomic(self.outbox_path, self._jobs if jobs is None else jobs)
+        except Exception as e:
+            logger.error(f"Error guardando notificaciones pendientes: {e}")
+
+    async def _save_outbox_async(self):
+        """Guardar en otro hilo una copia de las notificaciones pendientes"""
+        jobs = [dict(job, chat_ids=list(job['chat_ids'])) for job in self._jobs]
+        self._write_future = asyncio.get_running_loop().run_in_executor(None, self._save_outbox, jobs)
+        # shield: si se detiene el envío, stop() espera a que termine esta escritura
+        await asyncio.shield(self._write_future)
+
+    def start(self, bot):
+        """Iniciar el envío en segundo plano (reanuda lo pendiente)"""
+        self._bot = bot
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        if self._jobs:
+            logger.info(f"Reanudando {len(self._jobs)} notificaciones pendientes")
+            self._wakeup.set()
+
+    async def stop(self):
+        """Detener el envío; lo pendiente queda guardado"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._write_future is not None:
+            await asyncio.gather(self._write_future, return_exceptions=True)
+        self._save_outbox()
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await self._save_outbox_async()
+            while self._jobs:
+                try:
+                    await self._send_batch(self._jobs[0])
+                except Exception as e:
+                    # Un error inesperado no detiene el envío: los chats pendientes siguen en la cola
+                    logger.error(f"Error enviando notificaciones: {e}")
+                    await asyncio.sleep(SEND_ERROR_PAUSE)
+                if not self._jobs[0]['chat_ids']:
+                    self._jobs.pop(0)
+                await self._save_outbox_async()
+
+    async def _send_batch(self, job: Dict):
+        """Enviar un lote de la notificación y quitar los chats ya atendidos
+
+        Cada chat se quita de `job['chat_ids']` en cuanto se atiende, así una
+        interrupción a mitad de lote no repite los mensajes ya enviados.
+        """
+        batch, deferred = [], []
+        now = time.monotonic()
+        for chat_id in job['chat_ids']:
+            if len(batch) >= self.batch_size:
+                deferred.append(chat_id)
+            elif now - self._last_sent.get(chat_id, 0) < self.per_chat_interval:
+                # Se envió a este chat hace muy poco: se deja para otro lote
+                deferred.append(chat_id)
+            else:
+                batch.append(chat_id)
+
+        if not batch:
+            await asyncio.sleep(self.per_chat_interval)
+        job['chat_ids'] = deferred + batch
+        for chat_id in batch:
+            retry = not await self._send(chat_id, job['text'])
+            job['chat_ids'].remove(chat_id)
+            if retry:
+                job['chat_ids'].append(chat_id)
+
+    async def _send(self, chat_id: int, text: str) -> bool:
+        """Enviar un mensaje respetando el ritmo global; False si hay que reintentarlo"""
+        wait = self._next_send - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._next_send = time.monotonic() + self.global_interval
+        self._last_sent[chat_id] = time.monotonic()
+
+        try:
+            await self._bot.send_message(chat_id, text, parse_mode='Markdown')
+            self.stats['sent'] += 1
+        except RetryAfter as e:
+            # Telegram pide esperar: se pausa todo el envío y se reintenta el chat
+            retry_after = e.retry_after.total_seconds() if hasattr(e.retry_after, 'total_seconds') else e.retry_after
+            logger.warning(f"Límite de Telegram alcanzado, esperando {retry_after}s")
+            self._next_send = time.monotonic() + retry_after
+            return False
+        except Forbidden:
+            # El bot fue bloqueado o expulsado del chat
+            self.store.unsubscribe(chat_id)
+            for job in self._jobs[1:]:
+                if chat_id in job['chat_ids']:
+                    job['chat_ids'].remove(chat_id)
+            self.stats['unsubscribed'] += 1
+        except NetworkError as e:
+            # Error transitorio (incluye TimedOut): se pausa el envío y se reintenta el chat
+            logger.warning(f"Error de red notificando al chat {chat_id}: {e}")
+            self._next_send = time.monotonic() + SEND_ERROR_PAUSE
+            self.stats['retried'] += 1
+            return False
+        except TelegramError as e:
+            self.stats['failed'] += 1
+            logger.warning(f"No se pudo notificar al chat {chat_id}: {e}")
+        return True
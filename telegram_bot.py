@@ -1,11 +1,26 @@
 import asyncio
 import logging
+import signal
+import time
+from contextlib import contextmanager
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes
+from telegram.request import HTTPXRequest
 from cloud_status import CloudStatusChecker
+from snapshot_store import SnapshotStore
+from providers import PROVIDERS
 from config import Config
 from statistics import BotStatistics
+from stats_storage import JsonStatsStorage, SQLiteStatsStorage
+from webhook import WebhookServer
+from metrics import HANDLER_SECONDS, TELEGRAM_API_SECONDS, THROTTLED_UPDATES, MetricsServer
+from parse_pool import LoopLagMonitor
+from throttle import CallbackDebouncer, UpdateThrottle
+import tracing
+from tracing import span, start_trace
+from subscriptions import ChangeNotifier, SubscriptionStore, diff_snapshots, format_change_message
 from datetime import datetime
+from typing import Dict, Optional
 
 # Configurar logging
 logging.basicConfig(
@@ -14,65 +29,31 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-class CloudStatusBot:
-    """Bot de Telegram para monitorear el estado de servicios cloud"""
-    
-    def __init__(self):
-        self.status_checker = CloudStatusChecker()
-        self.application = None
-        self.stats = BotStatistics() if Config.ENABLE_STATISTICS else None
-    
-    async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Comando /start - Mensaje de bienvenida"""
-        if self.stats:
-            self.stats.record_command("start", update.effective_user.id)
-        
-        welcome_message = """
+# Mensajes estáticos, construidos una sola vez
+WELCOME_MESSAGE = """
 🤖 *Bot de Estado de Servicios Cloud*
 
 ¡Hola! Soy tu asistente inteligente para monitorear el estado de los principales proveedores cloud en tiempo real.
 
 ☁️ *Proveedores soportados:*
-• **Azure** - Microsoft Cloud Services
-• **GCP** - Google Cloud Platform  
-• **AWS** - Amazon Web Services
-• **OCI** - Oracle Cloud Infrastructure
+{provider_list}
 
 📊 *Comandos disponibles:*
 /start - Mensaje de bienvenida
 /status - Estado general de todos los proveedores
-/azure - Estado específico de Azure
-/gcp - Estado específico de Google Cloud
-/aws - Estado específico de Amazon Web Services
-/oci - Estado específico de Oracle Cloud
+{provider_commands}
+/subscribe - Avisos de cambios de un proveedor
+/unsubscribe - Cancelar avisos
 /stats - Estadísticas del bot
 /help - Mostrar esta ayuda
 
 💡 *Usa los botones para navegación rápida*
-        """
-        
-        keyboard = [
-            [InlineKeyboardButton("🌐 Estado General", callback_data="status_all")],
-            [InlineKeyboardButton("☁️ Azure", callback_data="status_azure")],
-            [InlineKeyboardButton("☁️ GCP", callback_data="status_gcp")],
-            [InlineKeyboardButton("☁️ AWS", callback_data="status_aws")],
-            [InlineKeyboardButton("☁️ OCI", callback_data="status_oci")],
-            [InlineKeyboardButton("📊 Estadísticas", callback_data="show_stats")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await update.message.reply_text(
-            welcome_message,
-            parse_mode='Markdown',
-            reply_markup=reply_markup
-        )
-    
-    async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Comando /help - Mostrar ayuda"""
-        if self.stats:
-            self.stats.record_command("help", update.effective_user.id)
-        
-        help_message = """
+        """.format(
+    provider_list='\n'.join(f"• **{spec.label}** - {spec.name}" for spec in PROVIDERS.values()),
+    provider_commands='\n'.join(f"/{spec.key} - Estado específico de {spec.label}" for spec in PROVIDERS.values())
+)
+
+HELP_MESSAGE = """
 📚 *Comandos del Bot*
 
 *Comandos principales:*
@@ -82,24 +63,183 @@ class CloudStatusBot:
 /help - Mostrar esta ayuda
 
 *Comandos específicos:*
-/azure - Estado detallado de Azure
-/gcp - Estado detallado de Google Cloud Platform
-/aws - Estado detallado de Amazon Web Services
-/oci - Estado detallado de Oracle Cloud Infrastructure
+{provider_commands}
+/<proveedor> <servicio> [región] - Estado de un servicio, p. ej. `/aws ec2 us-east-1`
+
+*Avisos de cambios:*
+/subscribe <proveedor> - Recibir un aviso cuando cambie el estado
+/unsubscribe [proveedor] - Cancelar uno o todos los avisos
 
 *Estados posibles:*
 🟢 **Operational** - Servicio funcionando normalmente
 🔴 **Issue** - Problema detectado
-🟡 **Investigating** - Investigando problema
+🟡 **Investigating** / **Degraded** - Investigando problema o rendimiento degradado
+🔧 **Maintenance** - Mantenimiento programado
 ⚪ **Unknown** - Estado desconocido
 
 💡 *Consejos:*
 • Los datos se actualizan cada 5 minutos
 • Usa los botones para navegación rápida
 • El bot registra estadísticas de uso
-        """
+        """.format(
+    provider_commands='\n'.join(f"/{spec.key} - Estado detallado de {spec.name}" for spec in PROVIDERS.values())
+)
+
+# Emoji de los estados de componente de las APIs JSON
+SERVICE_STATUS_EMOJIS = {
+    'Degraded': "🟡",
+    'Maintenance': "🔧",
+    'Information': "ℹ️"
+}
+
+# Etiquetas del ciclo de vida de los incidentes (feed de AWS)
+INCIDENT_STATE_LABELS = {
+    'open': "abierto",
+    'updated': "actualizado",
+    'resolved': "resuelto"
+}
+
+# Máximo de combinaciones servicio/región mostradas en una consulta de servicio
+MAX_LOOKUP_RESULTS = 10
+
+# Número máximo de mensajes renderizados en memoria
+RENDER_CACHE_SIZE = 64
+
+# Botones de proveedores por fila en los teclados
+PROVIDER_BUTTONS_PER_ROW = 2
+
+# Aviso de un botón rechazado por el límite de pulsaciones
+THROTTLED_MESSAGE = "⏳ Demasiadas peticiones seguidas, espera unos segundos"
+
+# Tipos de actualización que usan los handlers
+ALLOWED_UPDATES = [Update.MESSAGE, Update.CALLBACK_QUERY]
+
+class MetricsHTTPXRequest(HTTPXRequest):
+    """Cliente HTTP de la Bot API que mide la duración de cada llamada"""
+    
+    async def do_request(self, url: str, method: str, *args, **kwargs):
+        # El método de la Bot API es el último segmento de la URL
+        api_method = url.rsplit('/', 1)[-1]
+        start = time.perf_counter()
+        try:
+            with span('telegram.api', method=api_method):
+                return await super().do_request(url, method, *args, **kwargs)
+        finally:
+            TELEGRAM_API_SECONDS.observe(time.perf_counter() - start, api_method)
+
+class CloudStatusBot:
+    """Bot de Telegram para monitorear el estado de servicios cloud"""
+    
+    def __init__(self):
+        self.status_checker = CloudStatusChecker(
+            snapshot_store=SnapshotStore(Config.SNAPSHOT_FILE) if Config.SNAPSHOT_FILE else None
+        )
+        self.application = None
+        self.stats = self._create_statistics() if Config.ENABLE_STATISTICS else None
+        self.subscriptions = SubscriptionStore(Config.SUBSCRIPTIONS_FILE)
+        self.notifier = ChangeNotifier(
+            self.subscriptions,
+            Config.NOTIFY_OUTBOX_FILE,
+            global_rate=Config.NOTIFY_GLOBAL_RATE,
+            per_chat_interval=Config.NOTIFY_PER_CHAT_INTERVAL,
+            batch_size=Config.NOTIFY_BATCH_SIZE
+        )
+        self.status_checker.add_snapshot_listener(self._on_snapshot)
+        self.metrics_server = MetricsServer(
+            listen=Config.METRICS_LISTEN, port=Config.METRICS_PORT, path=Config.METRICS_PATH
+        ) if Config.METRICS_ENABLED else None
+        self.trace_exporter = tracing.create_exporter(
+            Config.TRACE_EXPORT, path=Config.TRACE_EXPORT_FILE, endpoint=Config.TRACE_OTLP_ENDPOINT
+        )
+        tracing.configure(Config.TRACE_ENABLED, Config.TRACE_SLOW_THRESHOLD, self.trace_exporter)
+        # Medición del tiempo que el bucle de eventos pasa bloqueado
+        self.loop_monitor = LoopLagMonitor(
+            Config.LOOP_LAG_INTERVAL, Config.LOOP_LAG_WARN_THRESHOLD
+        ) if Config.LOOP_LAG_INTERVAL > 0 else None
+        # Límites de comandos y botones por usuario y chat, y fusión de pulsaciones repetidas
+        self.throttle = UpdateThrottle(
+            Config.THROTTLE_USER_RATE, Config.THROTTLE_USER_BURST,
+            Config.THROTTLE_CHAT_RATE, Config.THROTTLE_CHAT_BURST
+        )
+        self.debouncer = CallbackDebouncer(Config.CALLBACK_DEBOUNCE_WINDOW, on_merge=self._on_merged_callback)
+        self._build_keyboards()
+        # Mensajes de estado renderizados por versión de instantánea
+        self._render_cache: Dict[tuple, str] = {}
+    
+    def _build_keyboards(self):
+        """Construir una sola vez los teclados inline estáticos"""
+        provider_buttons = [
+            InlineKeyboardButton(f"☁️ {spec.label}", callback_data=f"status_{spec.key}")
+            for spec in PROVIDERS.values()
+        ]
+        provider_rows = [
+            provider_buttons[index:index + PROVIDER_BUTTONS_PER_ROW]
+            for index in range(0, len(provider_buttons), PROVIDER_BUTTONS_PER_ROW)
+        ]
+        
+        def provider_keyboard(general_label: str) -> InlineKeyboardMarkup:
+            return InlineKeyboardMarkup(
+                [[InlineKeyboardButton(general_label, callback_data="status_all")]]
+                + provider_rows
+                + [[InlineKeyboardButton("📊 Estadísticas", callback_data="show_stats")]]
+            )
         
-        await update.message.reply_text(help_message, parse_mode='Markdown')
+        self.main_keyboard = provider_keyboard("🌐 Estado General")
+        self.status_keyboard = provider_keyboard("🌐 General")
+        self.stats_keyboard = InlineKeyboardMarkup([
+            [InlineKeyboardButton("📅 Últimos 7 días", callback_data="daily_stats")],
+            [InlineKeyboardButton("🔙 Volver", callback_data="back_to_main")]
+        ])
+        self.daily_stats_keyboard = InlineKeyboardMarkup([
+            [InlineKeyboardButton("📊 Resumen", callback_data="show_stats")],
+            [InlineKeyboardButton("🔙 Volver", callback_data="back_to_main")]
+        ])
+        # Datos de botón conocidos, usados como etiquetas de métricas
+        self._callback_data = {
+            button.callback_data
+            for keyboard in (self.main_keyboard, self.stats_keyboard, self.daily_stats_keyboard)
+            for row in keyboard.inline_keyboard
+            for button in row
+        }
+    
+    def _create_statistics(self) -> BotStatistics:
+        """Crear las estadísticas con el almacenamiento configurado"""
+        if Config.STATS_BACKEND == 'sqlite':
+            storage = SQLiteStatsStorage(
+                Config.STATS_DB_FILE,
+                daily_retention_days=Config.STATS_RETENTION_DAYS,
+                event_retention_days=Config.STATS_EVENT_RETENTION_DAYS,
+                legacy_json=Config.STATS_FILE
+            )
+        else:
+            storage = JsonStatsStorage(Config.STATS_FILE)
+        
+        return BotStatistics(
+            Config.STATS_FILE,
+            write_behind=Config.STATS_WRITE_BEHIND,
+            flush_interval=Config.STATS_FLUSH_INTERVAL,
+            flush_threshold=Config.STATS_FLUSH_THRESHOLD,
+            storage=storage,
+            retention_days=Config.STATS_RETENTION_DAYS
+        )
+    
+    async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Comando /start - Mensaje de bienvenida"""
+        if self.stats:
+            self.stats.record_command("start", update.effective_user.id)
+        
+        await update.message.reply_text(
+            WELCOME_MESSAGE,
+            parse_mode='Markdown',
+            reply_markup=self.main_keyboard
+        )
+    
+    async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Comando /help - Mostrar ayuda"""
+        if self.stats:
+            self.stats.record_command("help", update.effective_user.id)
+        
+        await update.message.reply_text(HELP_MESSAGE, parse_mode='Markdown')
     
     async def stats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Comando /stats - Mostrar estadísticas del bot"""
@@ -108,15 +248,9 @@ class CloudStatusBot:
             return
         
         self.stats.record_command("stats", update.effective_user.id)
-        stats_message = self.stats.get_stats_summary()
-        
-        keyboard = [
-            [InlineKeyboardButton("📅 Últimos 7 días", callback_data="daily_stats")],
-            [InlineKeyboardButton("🔙 Volver", callback_data="back_to_main")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        stats_message = self._stats_message()
         
-        await update.message.reply_text(stats_message, parse_mode='Markdown', reply_markup=reply_markup)
+        await update.message.reply_text(stats_message, parse_mode='Markdown', reply_markup=self.stats_keyboard)
     
     async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Comando /status - Estado general de todos los proveedores"""
@@ -124,35 +258,107 @@ class CloudStatusBot:
             self.stats.record_command("status", update.effective_user.id)
         await self._send_status_message(update, context, "all")
     
-    async def azure_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Comando /azure - Estado específico de Azure"""
-        if self.stats:
-            self.stats.record_command("azure", update.effective_user.id)
-        await self._send_status_message(update, context, "azure")
+    def _provider_command(self, provider: str):
+        """Crear el comando /<proveedor> - Estado específico de un proveedor del registro"""
+        async def command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+            if self.stats:
+                self.stats.record_command(provider, update.effective_user.id)
+            if context.args:
+                # /<proveedor> <servicio> [región]: consulta al índice de servicios
+                await self._send_lookup_message(update, provider, context.args[0], ' '.join(context.args[1:]) or None)
+            else:
+                await self._send_status_message(update, context, provider)
+        return command
     
-    async def gcp_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Comando /gcp - Estado específico de GCP"""
-        if self.stats:
-            self.stats.record_command("gcp", update.effective_user.id)
-        await self._send_status_message(update, context, "gcp")
+    async def _send_lookup_message(self, update: Update, provider: str, service: str, region: Optional[str]):
+        """Responder con el estado de un servicio (y región) de un proveedor"""
+        with span('status.lookup', provider=provider, service=service, region=region):
+            result = await self.status_checker.lookup_service(provider, service, region)
+        with span('render'):
+            if result.get('error'):
+                response_text = f"❌ *Error:* {result.get('message', 'Error desconocido')}"
+            else:
+                response_text = self._format_service_lookup(result)
+        with span('reply'):
+            await update.message.reply_text(response_text, parse_mode='Markdown')
     
-    async def aws_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Comando /aws - Estado específico de AWS"""
+    async def subscribe_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Comando /subscribe <proveedor> - Recibir avisos de cambios de estado"""
         if self.stats:
-            self.stats.record_command("aws", update.effective_user.id)
-        await self._send_status_message(update, context, "aws")
+            self.stats.record_command("subscribe", update.effective_user.id)
+        
+        chat_id = update.effective_chat.id
+        providers = self.status_checker.supported_providers()
+        provider = context.args[0].lower() if context.args else None
+        
+        if provider not in providers:
+            current = self.subscriptions.providers_for(chat_id)
+            message = f"ℹ️ *Uso:* /subscribe <{'|'.join(providers)}>\n"
+            if current:
+                message += f"🔔 *Suscripciones actuales:* {', '.join(p.upper() for p in current)}"
+            await update.message.reply_text(message, parse_mode='Markdown')
+            return
+        
+        if self.subscriptions.subscribe(chat_id, provider):
+            message = f"🔔 Recibirás avisos cuando cambie el estado de *{provider.upper()}*"
+        else:
+            message = f"ℹ️ Ya estabas suscrito a *{provider.upper()}*"
+        await update.message.reply_text(message, parse_mode='Markdown')
     
-    async def oci_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Comando /oci - Estado específico de OCI"""
+    async def unsubscribe_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Comando /unsubscribe [proveedor] - Dejar de recibir avisos"""
         if self.stats:
-            self.stats.record_command("oci", update.effective_user.id)
-        await self._send_status_message(update, context, "oci")
+            self.stats.record_command("unsubscribe", update.effective_user.id)
+        
+        provider = context.args[0].lower() if context.args else None
+        removed = self.subscriptions.unsubscribe(update.effective_chat.id, provider)
+        if removed:
+            message = f"🔕 Suscripción cancelada: {', '.join(p.upper() for p in removed)}"
+        else:
+            message = "ℹ️ No tenías suscripciones que cancelar"
+        await update.message.reply_text(message)
+    
+    def _on_snapshot(self, provider: str, previous: dict, current: dict):
+        """Notificar a los suscriptores si cambió el estado de un proveedor"""
+        changes = diff_snapshots(previous, current)
+        if changes:
+            provider_name = current.get('provider', provider.upper())
+            self.notifier.notify(provider, format_change_message(provider_name, changes))
     
     async def button_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Manejar callbacks de botones inline"""
+        """Manejar callbacks de botones inline
+        
+        Las pulsaciones repetidas sobre un mismo mensaje se fusionan: el
+        mensaje se edita una sola vez, con el último botón pulsado. Una
+        pulsación aplazada se atiende en otra tarea, con su propia traza y
+        su propia etiqueta de duración.
+        """
         query = update.callback_query
         await query.answer()
         
+        message = query.message
+        key = (message.chat_id, message.message_id) if message else None
+        handler_task = asyncio.current_task()
+        
+        async def run():
+            if asyncio.current_task() is handler_task:
+                await self._handle_button(update, context)
+                return
+            with self._observed(update, self._callback_label(update)):
+                await self._handle_button(update, context)
+        
+        await self.debouncer.submit(key, query.data, run)
+    
+    def _on_merged_callback(self, data: str):
+        """Contar una pulsación fusionada con otra sobre el mismo mensaje"""
+        label = f"callback:{data}" if data in self._callback_data else "callback:other"
+        THROTTLED_UPDATES.inc(label, 'merged')
+        if self.stats:
+            self.stats.record_throttled('merged', label)
+    
+    async def _handle_button(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Atender el botón pulsado"""
+        query = update.callback_query
         if query.data.startswith("status_"):
             provider = query.data.replace("status_", "")
             if self.stats:
@@ -162,118 +368,67 @@ class CloudStatusBot:
         elif query.data == "show_stats":
             if self.stats:
                 self.stats.record_command("button_stats", query.from_user.id)
-                stats_message = self.stats.get_stats_summary()
+                stats_message = self._stats_message()
                 
-                keyboard = [
-                    [InlineKeyboardButton("📅 Últimos 7 días", callback_data="daily_stats")],
-                    [InlineKeyboardButton("🔙 Volver", callback_data="back_to_main")]
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                
-                await query.edit_message_text(stats_message, parse_mode='Markdown', reply_markup=reply_markup)
+                await query.edit_message_text(stats_message, parse_mode='Markdown', reply_markup=self.stats_keyboard)
         
         elif query.data == "daily_stats":
             if self.stats:
                 self.stats.record_command("button_daily_stats", query.from_user.id)
                 daily_stats = self.stats.get_daily_stats()
                 
-                keyboard = [
-                    [InlineKeyboardButton("📊 Resumen", callback_data="show_stats")],
-                    [InlineKeyboardButton("🔙 Volver", callback_data="back_to_main")]
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                
-                await query.edit_message_text(daily_stats, parse_mode='Markdown', reply_markup=reply_markup)
+                await query.edit_message_text(daily_stats, parse_mode='Markdown', reply_markup=self.daily_stats_keyboard)
         
         elif query.data == "back_to_main":
-            # Crear un mensaje de bienvenida para el callback
             if self.stats:
                 self.stats.record_command("button_back_to_main", query.from_user.id)
             
-            welcome_message = """
-🤖 *Bot de Estado de Servicios Cloud*
-
-¡Hola! Soy tu asistente inteligente para monitorear el estado de los principales proveedores cloud en tiempo real.
-
-☁️ *Proveedores soportados:*
-• **Azure** - Microsoft Cloud Services
-• **GCP** - Google Cloud Platform  
-• **AWS** - Amazon Web Services
-• **OCI** - Oracle Cloud Infrastructure
-
-📊 *Comandos disponibles:*
-/start - Mensaje de bienvenida
-/status - Estado general de todos los proveedores
-/azure - Estado específico de Azure
-/gcp - Estado específico de Google Cloud
-/aws - Estado específico de Amazon Web Services
-/oci - Estado específico de Oracle Cloud
-/stats - Estadísticas del bot
-/help - Mostrar esta ayuda
-
-💡 *Usa los botones para navegación rápida*
-        """
-            
-            keyboard = [
-                [InlineKeyboardButton("🌐 Estado General", callback_data="status_all")],
-                [InlineKeyboardButton("☁️ Azure", callback_data="status_azure")],
-                [InlineKeyboardButton("☁️ GCP", callback_data="status_gcp")],
-                [InlineKeyboardButton("☁️ AWS", callback_data="status_aws")],
-                [InlineKeyboardButton("☁️ OCI", callback_data="status_oci")],
-                [InlineKeyboardButton("📊 Estadísticas", callback_data="show_stats")]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
             await query.edit_message_text(
-                welcome_message,
+                WELCOME_MESSAGE,
                 parse_mode='Markdown',
-                reply_markup=reply_markup
+                reply_markup=self.main_keyboard
             )
     
     async def _send_status_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE, provider: str, is_callback: bool = False):
         """Enviar mensaje de estado"""
         loading_message = "🔄 Obteniendo estado de los servicios cloud..."
         
-        if is_callback:
-            await update.callback_query.edit_message_text(loading_message)
-        else:
-            message = await update.message.reply_text(loading_message)
+        with span('loading_message'):
+            if is_callback:
+                await update.callback_query.edit_message_text(loading_message)
+            else:
+                message = await update.message.reply_text(loading_message)
         
         try:
             if provider == "all":
-                status_data = await self.status_checker.get_all_status()
-                response_text = self._format_all_status(status_data)
+                with span('status.get', provider=provider):
+                    status_data = await self.status_checker.get_all_status()
+                with span('render'):
+                    response_text = self._render_all_status(status_data)
             else:
-                status_data = await self.status_checker.get_provider_status(provider)
-                response_text = self._format_provider_status(status_data)
+                with span('status.get', provider=provider):
+                    status_data = await self.status_checker.get_provider_status(provider)
+                with span('render'):
+                    response_text = self._render_provider_status(provider, status_data)
                 
                 # Registrar estadísticas de verificación
                 if self.stats:
                     success = not status_data.get("error", False)
                     self.stats.record_provider_check(provider, success)
             
-            keyboard = [
-                [InlineKeyboardButton("🌐 General", callback_data="status_all")],
-                [InlineKeyboardButton("☁️ Azure", callback_data="status_azure")],
-                [InlineKeyboardButton("☁️ GCP", callback_data="status_gcp")],
-                [InlineKeyboardButton("☁️ AWS", callback_data="status_aws")],
-                [InlineKeyboardButton("☁️ OCI", callback_data="status_oci")],
-                [InlineKeyboardButton("📊 Estadísticas", callback_data="show_stats")]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            if is_callback:
-                await update.callback_query.edit_message_text(
-                    response_text,
-                    parse_mode='Markdown',
-                    reply_markup=reply_markup
-                )
-            else:
-                await message.edit_text(
-                    response_text,
-                    parse_mode='Markdown',
-                    reply_markup=reply_markup
-                )
+            with span('edit_message'):
+                if is_callback:
+                    await update.callback_query.edit_message_text(
+                        response_text,
+                        parse_mode='Markdown',
+                        reply_markup=self.status_keyboard
+                    )
+                else:
+                    await message.edit_text(
+                        response_text,
+                        parse_mode='Markdown',
+                        reply_markup=self.status_keyboard
+                    )
                 
         except Exception as e:
             error_message = f"❌ Error obteniendo el estado: {str(e)}"
@@ -282,10 +437,79 @@ class CloudStatusBot:
             else:
                 await message.edit_text(error_message)
     
+    def _stats_message(self) -> str:
+        """Resumen de estadísticas junto con el estado de los circuit breakers"""
+        return self.stats.get_stats_summary() + self._format_breakers() + self._format_loop_lag()
+    
+    def _format_loop_lag(self) -> str:
+        """Formatear el bloqueo medido del bucle de eventos"""
+        if self.loop_monitor is None or not self.loop_monitor.samples:
+            return ""
+        summary = self.loop_monitor.summary()
+        return (f"\n⏱️ *Bucle de eventos:* retraso medio {summary['mean_ms']:.1f} ms, "
+                f"máximo {summary['max_ms']:.0f} ms\n")
+    
+    def _format_breakers(self) -> str:
+        """Formatear el estado de los circuit breakers de proveedores y URLs"""
+        breakers = self.status_checker.get_breaker_stats()
+        if not breakers['providers'] and not breakers['urls']:
+            return ""
+        
+        labels = {'closed': "🟢 cerrado", 'half_open': "🟡 semiabierto", 'open': "🔴 abierto"}
+        message = "\n🔌 *Circuitos:*\n"
+        for provider, breaker in breakers['providers'].items():
+            message += f"• {provider.upper()}: {labels[breaker['state']]}"
+            if breaker['state'] == 'open':
+                message += f" (reintento en {breaker['retry_in']:.0f}s)"
+            message += "\n"
+        # De las URLs solo se muestran las que no están cerradas
+        for url, breaker in breakers['urls'].items():
+            if breaker['state'] != 'closed':
+                message += f"• `{url}`: {labels[breaker['state']]}\n"
+        return message
+    
+    def _render_cached(self, key: Optional[tuple], render) -> str:
+        """Devolver el mensaje renderizado para una clave o renderizarlo y guardarlo"""
+        if key is None:
+            return render()
+        
+        message = self._render_cache.get(key)
+        if message is None:
+            if len(self._render_cache) >= RENDER_CACHE_SIZE:
+                self._render_cache.clear()
+            message = render()
+            self._render_cache[key] = message
+        return message
+    
+    def _render_all_status(self, status_data: dict) -> str:
+        """Renderizar el estado general reutilizando el mensaje si los datos no cambiaron"""
+        key = ('all',) + tuple(
+            (provider, data.get('version'), data.get('stale', False))
+            for provider, data in status_data.items()
+        )
+        if any(version is None for _, version, _ in key[1:]):
+            key = None
+        return self._render_cached(key, lambda: self._format_all_status(status_data))
+    
+    def _render_provider_status(self, provider: str, data: dict) -> str:
+        """Renderizar el estado de un proveedor reutilizando el mensaje si los datos no cambiaron"""
+        version = data.get('version')
+        key = ('provider', provider, version, data.get('stale', False)) if version is not None else None
+        return self._render_cached(key, lambda: self._format_provider_status(data))
+    
+    def _format_updated_at(self, data: dict) -> str:
+        """Fecha de obtención de los datos en formato legible"""
+        try:
+            updated = datetime.fromisoformat(data['last_updated'])
+        except (KeyError, TypeError, ValueError):
+            updated = datetime.now()
+        return updated.strftime('%d/%m/%Y %H:%M:%S')
+    
     def _format_all_status(self, status_data: dict) -> str:
         """Formatear estado de todos los proveedores"""
         message = "🌐 *Estado General de Servicios Cloud*\n\n"
-        message += f"📅 *Actualizado:* {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n"
+        timestamps = [data['last_updated'] for data in status_data.values() if data.get('last_updated')]
+        message += f"📅 *Actualizado:* {self._format_updated_at({'last_updated': max(timestamps, default=None)})}\n"
         message += f"⏱️ *Caché:* {Config.CACHE_DURATION}s\n\n"
         
         operational_count = 0
@@ -304,7 +528,8 @@ class CloudStatusBot:
                 else:
                     status_emoji = "⚪"
                 
-                message += f"{status_emoji} *{data.get('provider', provider.upper())}*: {status}\n\n"
+                stale_mark = " ⏳" if data.get('stale') else ""
+                message += f"{status_emoji} *{data.get('provider', provider.upper())}*: {status}{stale_mark}\n\n"
         
         # Resumen general
         if operational_count == total_count:
@@ -314,9 +539,66 @@ class CloudStatusBot:
         else:
             message += "🚨 *Todos los servicios tienen problemas*\n\n"
         
+        if any(data.get('stale') for data in status_data.values()):
+            message += "⏳ *Datos en caché, actualizando en segundo plano*\n\n"
+        
         message += "💡 *Usa los botones para ver detalles específicos*"
         return message
     
+    def _format_service_lookup(self, result: dict) -> str:
+        """Formatear el resultado de una consulta de servicio y región"""
+        target = f"*{result['service']}*" + (f" en *{result['region']}*" if result['region'] else "")
+        message = f"🔎 *{result['provider']}* · {target}\n"
+        message += f"📅 *Actualizado:* {self._format_updated_at(result)}\n"
+        if result.get('stale'):
+            message += "⏳ *Datos en caché*, actualizando en segundo plano\n"
+        message += "\n"
+        
+        rows = [
+            (service, region, entries)
+            for service, regions in result['matches'].items()
+            for region, entries in regions.items()
+        ]
+        if not rows:
+            message += f"🟢 Sin avisos para {target}\n"
+            known = result.get('known_services', [])
+            if known:
+                message += f"\n📋 *Servicios con datos:* {', '.join(known[:20])}"
+                if len(known) > 20:
+                    message += f" y {len(known) - 20} más"
+                message += "\n"
+            return message
+        
+        for service, region, entries in rows[:MAX_LOOKUP_RESULTS]:
+            # La primera entrada es la más reciente y marca el estado actual
+            latest = entries[0]
+            latest_status = latest.get('status', 'Unknown')
+            if latest_status == 'Operational':
+                emoji = "🟢"
+            elif latest_status == 'Issue':
+                emoji = "🔴"
+            else:
+                emoji = SERVICE_STATUS_EMOJIS.get(latest_status, "⚪")
+            message += f"{emoji} *{service}* ({region}): {latest_status}{self._format_incident_state(latest)}\n"
+            if latest.get('name') and latest.get('name') != service:
+                message += f"   {latest['name']}\n"
+            if len(entries) > 1:
+                message += f"   _{len(entries) - 1} avisos anteriores_\n"
+        
+        if len(rows) > MAX_LOOKUP_RESULTS:
+            message += f"\n… y {len(rows) - MAX_LOOKUP_RESULTS} combinaciones más; indica la región para acotar\n"
+        return message
+    
+    @staticmethod
+    def _format_incident_state(service: dict) -> str:
+        """Sufijo con el estado del incidente de un servicio, si se conoce"""
+        state = service.get('state')
+        updates = service.get('updates', 1)
+        # Un aviso informativo suelto no es un incidente
+        if state is None or (state == 'resolved' and updates <= 1):
+            return ""
+        return f" · {INCIDENT_STATE_LABELS.get(state, state)} ({updates} avisos)"
+    
     def _format_provider_status(self, data: dict) -> str:
         """Formatear estado de un proveedor específico"""
         if data.get("error", False):
@@ -339,11 +621,14 @@ class CloudStatusBot:
         
         message = f"{status_emoji} *{provider_name}*\n"
         message += f"📊 *Estado General:* {status_text}\n"
-        message += f"📅 *Actualizado:* {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n"
+        message += f"📅 *Actualizado:* {self._format_updated_at(data)}\n"
         
         if note:
             message += f"ℹ️ *Nota:* {note}\n"
         
+        if data.get('stale'):
+            message += "⏳ *Datos en caché*, actualizando en segundo plano\n"
+        
         message += "\n"
         
         if services:
@@ -361,9 +646,12 @@ class CloudStatusBot:
                 elif service_status == 'Issue':
                     service_emoji = "🔴"
                 else:
-                    service_emoji = "⚪"
+                    service_emoji = SERVICE_STATUS_EMOJIS.get(service_status, "⚪")
                 
-                message += f"{service_emoji} *{service_name}*: {service_status}\n"
+                region = service.get('region', 'Global')
+                region_text = f" ({region})" if region != 'Global' else ""
+                message += f"{service_emoji} *{service_name}*{region_text}: {service_status}"
+                message += self._format_incident_state(service) + "\n"
             
             # Resumen de servicios
             if operational_services == total_services:
@@ -377,24 +665,178 @@ class CloudStatusBot:
         
         return message
     
+    async def _post_init(self, application: Application):
+        """Arrancar tareas en segundo plano junto con la aplicación"""
+        if self.loop_monitor:
+            self.loop_monitor.start()
+        if self.metrics_server:
+            await self.metrics_server.start()
+        if Config.HTTP_WARMUP:
+            await self.status_checker.warm_up()
+        if Config.BACKGROUND_REFRESH:
+            self.status_checker.start_background_refresh()
+        self.status_checker.start_snapshot_persistence()
+        if self.stats:
+            self.stats.start()
+        self.notifier.start(application.bot)
+    
+    async def _post_stop(self, application: Application):
+        """Terminar botones aplazados y notificaciones mientras el bot aún puede enviar mensajes"""
+        await self.debouncer.close()
+        await self.notifier.stop()
+    
+    async def _post_shutdown(self, application: Application):
+        """Detener tareas en segundo plano y liberar recursos"""
+        if self.metrics_server:
+            await self.metrics_server.stop()
+        if self.trace_exporter:
+            await self.trace_exporter.close()
+        await self.status_checker.close()
+        if self.loop_monitor:
+            await self.loop_monitor.stop()
+        if self.stats:
+            await self.stats.close()
+    
+    def build_application(self) -> Application:
+        """Crear la aplicación de Telegram y registrar los handlers"""
+        builder = (
+            Application.builder()
+            .token(Config.TELEGRAM_BOT_TOKEN)
+            .base_url(Config.TELEGRAM_BASE_URL)
+            .request(MetricsHTTPXRequest(connection_pool_size=Config.TELEGRAM_CONNECTION_POOL_SIZE))
+            .post_init(self._post_init)
+            .post_stop(self._post_stop)
+            .post_shutdown(self._post_shutdown)
+        )
+        if Config.CONCURRENT_UPDATES > 0:
+            builder = builder.concurrent_updates(Config.CONCURRENT_UPDATES)
+        # En modo webhook no se consulta a Telegram, el servidor propio recibe las actualizaciones
+        if Config.BOT_MODE == 'webhook':
+            builder = builder.updater(None)
+        self.application = builder.build()
+        
+        self.application.add_handler(CommandHandler("start", self._timed(self.start_command, "start")))
+        self.application.add_handler(CommandHandler("help", self._timed(self.help_command, "help")))
+        self.application.add_handler(CommandHandler("stats", self._timed(self.stats_command, "stats")))
+        self.application.add_handler(CommandHandler("status", self._timed(self.status_command, "status")))
+        for provider in PROVIDERS:
+            self.application.add_handler(
+                CommandHandler(provider, self._timed(self._provider_command(provider), provider))
+            )
+        self.application.add_handler(CommandHandler("subscribe", self._timed(self.subscribe_command, "subscribe")))
+        self.application.add_handler(CommandHandler("unsubscribe", self._timed(self.unsubscribe_command, "unsubscribe")))
+        self.application.add_handler(CallbackQueryHandler(self._timed(self.button_callback)))
+        return self.application
+    
+    def _timed(self, callback, name: Optional[str] = None):
+        """Envolver un handler para registrar su duración y abrir la traza de la actualización
+        
+        Sin `name` se usa el dato del botón pulsado como etiqueta.
+        """
+        async def handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+            label = name or self._callback_label(update)
+            chat_id = update.effective_chat.id if update.effective_chat else None
+            if not await self._admit(update, label, chat_id):
+                return
+            with self._observed(update, label):
+                return await callback(update, context)
+        return handler
+    
+    @contextmanager
+    def _observed(self, update: Update, label: str):
+        """Abrir la traza de una actualización y registrar su duración con `label`"""
+        chat_id = update.effective_chat.id if update.effective_chat else None
+        start = time.perf_counter()
+        try:
+            with start_trace(f"update {label}", handler=label, update_id=update.update_id, chat_id=chat_id):
+                yield
+        finally:
+            HANDLER_SECONDS.observe(time.perf_counter() - start, label)
+    
+    async def _admit(self, update: Update, label: str, chat_id: Optional[int]) -> bool:
+        """Aplicar el límite de comandos y botones del usuario y del chat
+        
+        Un comando rechazado se ignora sin responder; un botón se contesta
+        con un aviso para que Telegram deje de mostrarlo como pendiente.
+        """
+        user_id = update.effective_user.id if update.effective_user else None
+        if self.throttle.allow(user_id, chat_id):
+            return True
+        
+        logger.debug(f"{label} de {user_id} en {chat_id} rechazado por el límite de pulsaciones")
+        THROTTLED_UPDATES.inc(label, 'rejected')
+        if self.stats:
+            self.stats.record_throttled('rejected', label, user_id)
+        if update.callback_query:
+            try:
+                await update.callback_query.answer(THROTTLED_MESSAGE)
+            except Exception as e:
+                logger.debug(f"No se pudo contestar el botón rechazado: {e}")
+        return False
+    
+    def _callback_label(self, update: Update) -> str:
+        """Etiqueta de métricas de un botón; los datos desconocidos se agrupan"""
+        data = update.callback_query.data if update.callback_query else None
+        if data in self._callback_data:
+            return f"callback:{data}"
+        return "callback:other"
+    
+    async def run_webhook(self, stop_event: Optional[asyncio.Event] = None):
+        """Ejecutar el bot recibiendo actualizaciones por webhook hasta `stop_event`"""
+        application = self.application
+        server = WebhookServer(
+            application,
+            Config.WEBHOOK_PATH,
+            listen=Config.WEBHOOK_LISTEN,
+            port=Config.WEBHOOK_PORT,
+            secret_token=Config.WEBHOOK_SECRET_TOKEN,
+            allowed_updates=ALLOWED_UPDATES,
+            max_intake=Config.WEBHOOK_INTAKE_LIMIT,
+            max_body_size=Config.WEBHOOK_MAX_BODY_SIZE
+        )
+        
+        if stop_event is None:
+            stop_event = asyncio.Event()
+            loop = asyncio.get_running_loop()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                try:
+                    loop.add_signal_handler(sig, stop_event.set)
+                except (NotImplementedError, RuntimeError):
+                    # Windows no admite señales en el bucle de eventos
+                    pass
+        
+        await application.initialize()
+        await self._post_init(application)
+        try:
+            await application.start()
+            await server.start()
+            await application.bot.set_webhook(
+                Config.WEBHOOK_URL,
+                secret_token=Config.WEBHOOK_SECRET_TOKEN,
+                allowed_updates=ALLOWED_UPDATES,
+                max_connections=Config.WEBHOOK_MAX_CONNECTIONS
+            )
+            logger.info("Bot iniciado correctamente en modo webhook")
+            await stop_event.wait()
+        finally:
+            await server.stop()
+            if application.running:
+                await application.stop()
+            await self._post_stop(application)
+            await application.shutdown()
+            await self._post_shutdown(application)
+    
     def run(self):
         """Ejecutar el bot"""
         try:
             Config.validate()
-            self.application = Application.builder().token(Config.TELEGRAM_BOT_TOKEN).build()
-            
-            self.application.add_handler(CommandHandler("start", self.start_command))
-            self.application.add_handler(CommandHandler("help", self.help_command))
-            self.application.add_handler(CommandHandler("stats", self.stats_command))
-            self.application.add_handler(CommandHandler("status", self.status_command))
-            self.application.add_handler(CommandHandler("azure", self.azure_command))
-            self.application.add_handler(CommandHandler("gcp", self.gcp_command))
-            self.application.add_handler(CommandHandler("aws", self.aws_command))
-            self.application.add_handler(CommandHandler("oci", self.oci_command))
-            self.application.add_handler(CallbackQueryHandler(self.button_callback))
+            self.build_application()
             
             logger.info("Bot iniciado correctamente")
-            self.application.run_polling(allowed_updates=Update.ALL_TYPES)
+            if Config.BOT_MODE == 'webhook':
+                asyncio.run(self.run_webhook())
+            else:
+                self.application.run_polling(allowed_updates=ALLOWED_UPDATES)
             
         except Exception as e:
             logger.error(f"Error iniciando el bot: {e}")
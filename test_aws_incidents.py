@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Script de prueba del procesamiento incremental del feed de AWS
+"""
+
+import asyncio
+import sys
+import os
+
+# Agregar el directorio actual al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from aiohttp import web
+from aws_feed import AwsFeedStreamParser, AwsIncidentTracker, parse_aws_rss
+from cache_backends import MemoryCacheBackend
+from cloud_status import CloudStatusChecker
+from providers import PROVIDERS, ProviderSpec
+from testutils import patch_config, stub_server
+
+SERVER_PORT = 18093
+
+
+def item(service: str, region: str, timestamp: int, title: str, description: str) -> str:
+    """Un <item> del feed con el formato de AWS"""
+    return (f'<item><title>{title}</title>'
+            f'<guid>https://status.aws.amazon.com/#{service}-{region}_{timestamp}</guid>'
+            f'<description>{description}</description></item>')
+
+
+def feed(*items: str) -> str:
+    """Documento RSS con los avisos dados (el más reciente primero)"""
+    return ('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>AWS</title>'
+            + ''.join(items) + '</channel></rss>')
+
+
+OPENED = item('ec2', 'us-east-1', 100, 'Increased API error rates', 'We are investigating increased error rates.')
+UPDATED = item('ec2', 'us-east-1', 200, 'Increased API error rates', 'We have identified the root cause.')
+RESOLVED = item('ec2', 'us-east-1', 300, '[RESOLVED] Increased API error rates',
+                'The issue has been resolved and the service is operating normally.')
+OLD_S3 = item('s3', 'eu-west-1', 50, 'Elevated latency', 'We were investigating an issue that is now resolved.')
+
+
+def test_resolved_items_are_not_issues():
+    """Un aviso de resolución que menciona "issue" no es un problema activo"""
+    status = parse_aws_rss(feed(OLD_S3))
+    assert status['overall_status'] == 'Operational'
+    assert status['services'][0]['status'] == 'Operational'
+
+
+def test_incident_lifecycle():
+    """El estado actual sale del último aviso de cada servicio y región"""
+    tracker = AwsIncidentTracker()
+
+    status = parse_aws_rss(feed(OPENED, OLD_S3), tracker)
+    ec2 = status['services'][0]
+    assert status['overall_status'] == 'Issues Detected'
+    assert (ec2['service'], ec2['state'], ec2['updates']) == ('ec2', 'open', 1)
+
+    status = parse_aws_rss(feed(UPDATED, OPENED, OLD_S3), tracker)
+    assert (status['services'][0]['state'], status['services'][0]['updates']) == ('updated', 2)
+
+    status = parse_aws_rss(feed(RESOLVED, UPDATED, OPENED, OLD_S3), tracker)
+    ec2 = status['services'][0]
+    assert status['overall_status'] == 'Operational', "Los avisos antiguos no deben marcar problemas"
+    assert (ec2['status'], ec2['state'], ec2['updates']) == ('Operational', 'resolved', 3)
+    assert [entry['region'] for entry in status['services']] == ['us-east-1', 'eu-west-1']
+    assert len(status['components']) == 4, "El historial completo queda en components"
+
+
+def test_only_new_items_processed():
+    """Los avisos ya vistos sin cambios no se vuelven a clasificar"""
+    tracker = AwsIncidentTracker()
+    parse_aws_rss(feed(OPENED, OLD_S3), tracker)
+    first = parse_aws_rss(feed(OPENED, OLD_S3), tracker)
+    assert tracker.stats == {'documents': 2, 'items_processed': 2, 'items_skipped': 2, 'items_removed': 0}
+
+    # Un aviso con la descripción cambiada se vuelve a procesar
+    edited = OPENED.replace('We are investigating', 'We continue to investigate')
+    parse_aws_rss(feed(edited, OLD_S3), tracker)
+    assert tracker.stats['items_processed'] == 3 and tracker.stats['items_skipped'] == 3
+
+    # Los avisos que salen del feed se olvidan
+    status = parse_aws_rss(feed(OLD_S3), tracker)
+    assert tracker.stats['items_removed'] == 1
+    assert [entry['service'] for entry in status['services']] == ['s3']
+    assert first['services'][0]['service'] == 'ec2', "Las instantáneas anteriores no cambian"
+
+
+def test_failed_document_keeps_state():
+    """Un documento que falla a mitad del parseo no altera el seguimiento"""
+    tracker = AwsIncidentTracker()
+    parse_aws_rss(feed(OPENED), tracker)
+
+    parser = AwsFeedStreamParser(tracker)
+    parser.feed(feed(RESOLVED, OPENED).encode('utf-8')[:-20] + b'<<roto')
+    assert parser.close().get('error')
+
+    parser = AwsFeedStreamParser(tracker)
+    parser.feed(feed(OPENED).encode('utf-8'))
+    status = parser.close()
+    assert status['services'][0]['state'] == 'open'
+    assert tracker.stats['documents'] == 2 and tracker.stats['items_skipped'] == 1
+
+
+async def run_checker_refreshes():
+    """Consultar dos veces un feed local con el estado incremental del comprobador"""
+    documents = [feed(OPENED, OLD_S3), feed(RESOLVED, OPENED, OLD_S3)]
+
+    async def handler(request: web.Request) -> web.Response:
+        return web.Response(text=documents.pop(0), content_type='application/rss+xml')
+
+    aws = PROVIDERS['aws']
+    spec = ProviderSpec('aws', 'AWS', aws.name, [f'http://127.0.0.1:{SERVER_PORT}/rss/all.rss'],
+                        aws.parser, stream_parser=aws.stream_parser, tracker=aws.tracker)
+    with patch_config(HEDGED_REQUESTS=False):
+        async with stub_server(SERVER_PORT, [('GET', '/rss/all.rss', handler)]):
+            checker = CloudStatusChecker(cache_backend=MemoryCacheBackend(), providers={'aws': spec})
+            try:
+                first = await checker.fetch_status('aws')
+                second = await checker.fetch_status('aws')
+                return first, second, checker.get_tracker_stats()
+            finally:
+                await checker.close()
+
+
+def test_checker_tracks_between_refreshes():
+    """El comprobador conserva el estado incremental de AWS entre consultas"""
+    first, second, stats = asyncio.run(run_checker_refreshes())
+    assert first['overall_status'] == 'Issues Detected'
+    assert second['overall_status'] == 'Operational'
+    assert stats['aws']['items_skipped'] == 2 and stats['aws']['items_processed'] == 3
+
+
+def main():
+    """Función principal de pruebas"""
+    print("🧪 Probando procesamiento incremental del feed de AWS...")
+    print("=" * 50)
+    for name, test in (('Avisos resueltos', test_resolved_items_are_not_issues),
+                       ('Ciclo de vida de los incidentes', test_incident_lifecycle),
+                       ('Solo avisos nuevos o cambiados', test_only_new_items_processed),
+                       ('Documento con errores', test_failed_document_keeps_state),
+                       ('Estado entre refrescos del comprobador', test_checker_tracks_between_refreshes)):
+        try:
+            test()
+            print(f"   ✅ {name}")
+        except AssertionError as e:
+            print(f"   ❌ {name}: {e}")
+
+
+if __name__ == "__main__":
+    main()
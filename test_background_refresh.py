@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Script de prueba del refresco en segundo plano y de las respuestas desde memoria
+
+Usa un servidor HTTP local lento para comprobar que las consultas no lo esperan.
+"""
+
+import asyncio
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+
+# Agregar el directorio actual al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from aiohttp import web
+from cache_backends import MemoryCacheBackend
+from cloud_status import CloudStatusChecker
+from providers import ProviderSpec, single_service_status
+from testutils import patch_config, stub_server
+
+SERVER_PORT = 18097
+SLOW_SECONDS = 0.5
+
+
+def make_registry():
+    """Dos proveedores en el servidor local, con el TTL de CACHE_DURATION"""
+    providers = {}
+    for index in range(2):
+        name = f'Proveedor {index}'
+        spec = ProviderSpec(
+            f'p{index}', f'P{index}', name,
+            [f'http://127.0.0.1:{SERVER_PORT}/status/{index}'],
+            lambda body, name=name: single_service_status(name, 'Servicios', b'issue' in body)
+        )
+        providers[spec.key] = spec
+    return providers
+
+
+class StatusPages:
+    """Páginas de estado lentas que cuentan las peticiones y pueden cambiar de contenido"""
+
+    def __init__(self):
+        self.requests = {}
+        self.text = 'all good'
+
+    async def handle(self, request: web.Request) -> web.Response:
+        index = request.match_info['index']
+        self.requests[index] = self.requests.get(index, 0) + 1
+        await asyncio.sleep(SLOW_SECONDS)
+        return web.Response(text=self.text, content_type='text/html')
+
+
+async def run_stale_while_revalidate():
+    """Consultar un proveedor con el dato caducado mientras el servidor es lento"""
+    pages = StatusPages()
+    with patch_config(MAX_RETRIES=1, CACHE_DURATION=300):
+        async with stub_server(SERVER_PORT, [('GET', '/status/{index}', pages.handle)]):
+            checker = CloudStatusChecker(cache_backend=MemoryCacheBackend(), providers=make_registry())
+            try:
+                fresh = await checker.get_provider_status('p0')
+
+                # Caducar el dato en memoria y cambiar la página
+                checker.cache_timestamps['p0'] = datetime.now() - timedelta(seconds=400)
+                pages.text = 'issue'
+                start = time.perf_counter()
+                stale = await checker.get_provider_status('p0')
+                elapsed = time.perf_counter() - start
+
+                refreshing = 'p0' in checker._inflight
+                await asyncio.sleep(SLOW_SECONDS + 0.3)
+                refreshed = await checker.get_provider_status('p0')
+            finally:
+                await checker.close()
+    return fresh, stale, elapsed, refreshing, refreshed, pages.requests
+
+
+def test_stale_served_from_memory():
+    """El dato caducado se sirve al momento, marcado como obsoleto, y se refresca aparte"""
+    fresh, stale, elapsed, refreshing, refreshed, requests = asyncio.run(run_stale_while_revalidate())
+
+    assert not fresh['stale'] and fresh['overall_status'] == 'Operational'
+    assert elapsed < SLOW_SECONDS / 2, f"La consulta esperó al servidor ({elapsed:.2f}s)"
+    assert stale['stale'] and stale['cache_age'] >= 400, stale
+    assert stale['overall_status'] == 'Operational', "Se sirve la instantánea anterior"
+    assert refreshing, "El dato caducado debía lanzar un refresco en segundo plano"
+    assert not refreshed['stale'] and refreshed['overall_status'] == 'Issues Detected', refreshed
+    assert refreshed['version'] != fresh['version']
+    assert requests == {'0': 2}
+
+
+async def run_refresh_intervals(duration: float):
+    """Refrescar en segundo plano los dos proveedores durante `duration` segundos"""
+    pages = StatusPages()
+    async with stub_server(SERVER_PORT, [('GET', '/status/{index}', pages.handle)]):
+        checker = CloudStatusChecker(cache_backend=MemoryCacheBackend(), providers=make_registry())
+        intervals = {key: spec.refresh_interval for key, spec in checker.providers.items()}
+        checker.start_background_refresh()
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            await checker.close()
+    return intervals, pages.requests
+
+
+def test_per_provider_interval():
+    """<PROVEEDOR>_REFRESH_INTERVAL cambia el intervalo de un proveedor; el resto usa su TTL"""
+    with patch_config(MAX_RETRIES=1, CACHE_DURATION=300, REFRESH_INTERVALS={'p0': 0.1}):
+        intervals, requests = asyncio.run(run_refresh_intervals(2.0))
+
+    assert intervals == {'p0': 0.1, 'p1': 300}
+    # Cada refresco de p0 tarda SLOW_SECONDS más el intervalo
+    assert requests['0'] >= 3, f"p0 solo se refrescó {requests['0']} veces"
+    assert requests['1'] == 1, f"p1 se refrescó {requests['1']} veces dentro de su TTL"
+
+
+def main():
+    """Función principal de pruebas"""
+    print("🧪 Probando refresco en segundo plano...")
+    print("=" * 50)
+    for name, test in (('Dato obsoleto desde memoria', test_stale_served_from_memory),
+                       ('Intervalo por proveedor', test_per_provider_interval)):
+        try:
+            test()
+            print(f"   ✅ {name}")
+        except AssertionError as e:
+            print(f"   ❌ {name}: {e}")
+
+
+if __name__ == "__main__":
+    main()
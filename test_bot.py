@@ -29,15 +29,15 @@ async def test_cloud_status():
     
     try:
         print("\n1️⃣ Probando estado de Azure...")
-        azure_status = await checker.get_azure_status()
+        azure_status = await checker.fetch_status('azure')
         print(f"   Resultado: {azure_status.get('overall_status', 'Error')}")
         
         print("\n2️⃣ Probando estado de GCP...")
-        gcp_status = await checker.get_gcp_status()
+        gcp_status = await checker.fetch_status('gcp')
         print(f"   Resultado: {gcp_status.get('overall_status', 'Error')}")
         
         print("\n3️⃣ Probando estado de AWS...")
-        aws_status = await checker.get_aws_status()
+        aws_status = await checker.fetch_status('aws')
         print(f"   Resultado: {aws_status.get('overall_status', 'Error')}")
         
         print("\n4️⃣ Probando estado general...")
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de los backends de caché compartida
+
+Usa un sustituto local del protocolo de Redis, sin necesidad de un servidor real.
+"""
+
+import asyncio
+import sys
+import os
+import tempfile
+import time
+
+# Agregar el directorio actual al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from cache_backends import DiskCacheBackend, MemoryCacheBackend, RedisCacheBackend
+from cloud_status import CloudStatusChecker
+from providers import PROVIDERS
+from testutils import patch_config
+
+FAKE_REDIS_PORT = 16379
+
+
+class FakeRedisServer:
+    """Servidor mínimo que habla RESP con GET, SET (NX/PX), DEL, SELECT y PING"""
+
+    def __init__(self, port: int):
+        self.port = port
+        self.data = {}
+        self.expires = {}
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, '127.0.0.1', self.port)
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _read_command(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        count = int(line[1:-2])
+        args = []
+        for _ in range(count):
+            length = int((await reader.readline())[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2].decode())
+        return args
+
+    def _alive(self, key):
+        if key in self.expires and self.expires[key] <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    async def _handle(self, reader, writer):
+        while True:
+            args = await self._read_command(reader)
+            if args is None:
+                break
+            command = args[0].upper()
+            if command == 'GET':
+                value = self.data[args[1]] if self._alive(args[1]) else None
+                reply = b"$-1\r\n" if value is None else f"${len(value.encode())}\r\n{value}\r\n".encode()
+            elif command == 'SET':
+                key, value, options = args[1], args[2], [o.upper() for o in args[3:]]
+                if 'NX' in options and self._alive(key):
+                    reply = b"$-1\r\n"
+                else:
+                    self.data[key] = value
+                    self.expires.pop(key, None)
+                    if 'PX' in options:
+                        self.expires[key] = time.monotonic() + int(args[3 + options.index('PX') + 1]) / 1000
+                    reply = b"+OK\r\n"
+            elif command == 'DEL':
+                existed = self._alive(args[1])
+                self.data.pop(args[1], None)
+                reply = f":{int(existed)}\r\n".encode()
+            else:
+                reply = b"+OK\r\n"
+            writer.write(reply)
+            await writer.drain()
+        writer.close()
+
+
+async def check_backend(backend):
+    """Comprobar guardado, lectura y bloqueo de un backend"""
+    entry = {'status': {'provider': 'AWS', 'overall_status': 'Operational'}, 'timestamp': time.time(), 'version': 1}
+    await backend.set('aws', entry)
+    assert await backend.get('aws') == entry
+    assert await backend.get('gcp') is None
+
+    token = await backend.acquire_lock('aws', 5)
+    assert token is not None
+    assert await backend.acquire_lock('aws', 5) is None, "El bloqueo debe ser exclusivo"
+    await backend.release_lock('aws', token)
+    assert await backend.acquire_lock('aws', 5) is not None, "El bloqueo debe poder volver a tomarse"
+
+
+async def check_replicas_share_snapshots(make_backend):
+    """Dos réplicas con la misma caché compartida consultan el proveedor una sola vez"""
+    calls = 0
+
+    async def fake_aws_status(provider):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.1)
+        return {'provider': 'AWS', 'overall_status': 'Operational', 'services': []}
+
+    replicas = [CloudStatusChecker(cache_backend=make_backend()) for _ in range(2)]
+    for replica in replicas:
+        replica.fetch_status = fake_aws_status
+
+    results = await asyncio.gather(*[replica.get_provider_status('aws') for replica in replicas])
+    replicas.append(CloudStatusChecker(cache_backend=make_backend()))
+    later = await replicas[-1].get_provider_status('aws')
+
+    for replica in replicas:
+        await replica.close()
+    assert calls == 1, f"Se consultó AWS {calls} veces"
+    assert all(result['overall_status'] == 'Operational' for result in results)
+    assert later['version'] == results[0]['version'], "Las réplicas deben compartir la instantánea"
+
+
+async def count_refreshes(duration: float, make_backend=MemoryCacheBackend, replicas: int = 1) -> int:
+    """Consultas reales del refresco periódico de `replicas` réplicas durante `duration` segundos"""
+    calls = 0
+
+    async def fake_aws_status(provider):
+        nonlocal calls
+        calls += 1
+        return {'provider': 'AWS', 'overall_status': 'Operational', 'services': []}
+
+    checkers = [CloudStatusChecker(cache_backend=make_backend(), providers={'aws': PROVIDERS['aws']})
+                for _ in range(replicas)]
+    for checker in checkers:
+        checker.fetch_status = fake_aws_status
+        checker.start_background_refresh()
+    await asyncio.sleep(duration)
+    for checker in checkers:
+        await checker.close()
+    return calls
+
+
+async def run_redis_checks():
+    server = FakeRedisServer(FAKE_REDIS_PORT)
+    await server.start()
+    url = f"redis://127.0.0.1:{FAKE_REDIS_PORT}/0"
+    try:
+        backend = RedisCacheBackend(url)
+        await check_backend(backend)
+        await backend.close()
+        await check_replicas_share_snapshots(lambda: RedisCacheBackend(url, prefix='replicas:'))
+    finally:
+        await server.stop()
+
+
+async def check_redis_timeout():
+    """Un servidor que acepta la conexión pero no responde no cuelga las consultas"""
+    async def silent(reader, writer):
+        await reader.read()
+        writer.close()
+
+    server = await asyncio.start_server(silent, '127.0.0.1', FAKE_REDIS_PORT + 1)
+    backend = RedisCacheBackend(f"redis://127.0.0.1:{FAKE_REDIS_PORT + 1}/0", timeout=0.2)
+    started = time.monotonic()
+    try:
+        for _ in range(2):
+            try:
+                await backend.get('aws')
+                raise AssertionError("Se esperaba un TimeoutError")
+            except asyncio.TimeoutError:
+                assert backend._writer is None, "La conexión debe descartarse"
+    finally:
+        await backend.close()
+        server.close()
+        await server.wait_closed()
+    assert time.monotonic() - started < 1, "Cada comando debe cortarse a los 0,2 s"
+
+
+async def run_disk_checks():
+    with tempfile.TemporaryDirectory() as directory:
+        await check_backend(DiskCacheBackend(directory))
+        await check_replicas_share_snapshots(lambda: DiskCacheBackend(os.path.join(directory, 'replicas')))
+
+
+def test_memory_backend():
+    asyncio.run(check_backend(MemoryCacheBackend()))
+
+
+def test_redis_backend():
+    asyncio.run(run_redis_checks())
+
+
+def test_redis_timeout():
+    asyncio.run(check_redis_timeout())
+
+
+def test_disk_backend():
+    asyncio.run(run_disk_checks())
+
+
+def test_refresh_interval_below_ttl():
+    """El refresco periódico consulta aunque la instantánea propia siga dentro del TTL"""
+    with patch_config(REFRESH_INTERVALS={'aws': 0.2}, CACHE_DURATION=300):
+        calls = asyncio.run(count_refreshes(1.1))
+    assert calls >= 5, f"Solo {calls} consultas en 1,1 s con intervalo de 0,2 s"
+
+
+def test_replicas_refresh_once_per_ttl():
+    """Varias réplicas con refresco periódico sobre la misma caché consultan una vez por TTL"""
+    with tempfile.TemporaryDirectory() as directory:
+        def make_backend():
+            return DiskCacheBackend(directory)
+
+        with patch_config(REFRESH_INTERVALS={'aws': 0.1}, CACHE_DURATION=300):
+            calls = asyncio.run(count_refreshes(1.0, make_backend, replicas=3))
+        assert calls == 1, f"{calls} consultas de 3 réplicas dentro de un mismo TTL"
+
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        with patch_config(REFRESH_INTERVALS={'aws': 0.1}, CACHE_DURATION=0.5):
+            calls = asyncio.run(count_refreshes(1.2, make_backend, replicas=3))
+        assert 2 <= calls <= 3, f"{calls} consultas en 1,2 s con un TTL de 0,5 s"
+
+
+def main():
+    """Función principal de pruebas"""
+    print("🧪 Probando backends de caché compartida...")
+    print("=" * 50)
+    for name, test in (('Memoria', test_memory_backend), ('Redis', test_redis_backend), ('Disco', test_disk_backend),
+                       ('Redis sin respuesta', test_redis_timeout),
+                       ('Refresco por debajo del TTL', test_refresh_interval_below_ttl),
+                       ('Réplicas con refresco periódico', test_replicas_refresh_once_per_ttl)):
+        try:
+            test()
+            print(f"   ✅ {name}")
+        except AssertionError as e:
+            print(f"   ❌ {name}: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Script de prueba del circuit breaker y la caché negativa de proveedores
+"""
+
+import asyncio
+import sys
+import os
+import time
+
+# Agregar el directorio actual al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from circuit_breaker import CircuitBreaker, CLOSED, HALF_OPEN, OPEN
+from cloud_status import CloudStatusChecker
+from testutils import patch_config
+
+
+def test_breaker_states():
+    """El circuito se abre tras los fallos y se cierra con una prueba correcta"""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.1)
+    assert breaker.allow() and breaker.state == CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow(), "Con el circuito abierto no se consulta"
+
+    time.sleep(0.15)
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow(), "En semiabierto solo pasa una consulta de prueba"
+    breaker.record_failure()
+    assert breaker.state == OPEN, "Una prueba fallida vuelve a abrir el circuito"
+
+    time.sleep(0.15)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.snapshot()['times_opened'] == 2
+
+
+async def run_provider_checks():
+    """Un proveedor que empieza a fallar sigue sirviendo su último estado válido"""
+    calls = 0
+    responses = [
+        {'provider': 'AWS', 'overall_status': 'Operational', 'services': []},
+        {'error': True, 'message': 'Servicio caído'}
+    ]
+
+    async def fake_aws_status(provider):
+        nonlocal calls
+        calls += 1
+        return responses[min(calls, len(responses)) - 1]
+
+    checker = CloudStatusChecker()
+    checker.fetch_status = fake_aws_status
+    try:
+        first = await checker.get_provider_status('aws')
+        # El dato ya está caducado (CACHE_DURATION=0): se sirve y se refresca en segundo plano
+        await checker.get_provider_status('aws')
+        await asyncio.sleep(0.05)
+        after_failure = await checker.get_provider_status('aws')
+        await asyncio.sleep(0.05)
+        stats = checker.get_breaker_stats()
+    finally:
+        await checker.close()
+    return calls, first, after_failure, stats
+
+
+def test_provider_fail_fast():
+    """Tras un fallo se sirve la última instantánea válida sin volver a consultar"""
+    with patch_config(CACHE_DURATION=0, ERROR_CACHE_DURATION=30,
+                      BREAKER_FAILURE_THRESHOLD=1, BREAKER_RESET_TIMEOUT=60):
+        calls, first, after_failure, stats = asyncio.run(run_provider_checks())
+
+    assert first['overall_status'] == 'Operational'
+    assert calls == 2, f"Se consultó el proveedor {calls} veces"
+    assert after_failure['overall_status'] == 'Operational', "Debe servirse el último estado válido"
+    assert after_failure['stale'], "El último estado válido debe marcarse como obsoleto"
+    assert stats['providers']['aws']['state'] == OPEN
+
+
+def main():
+    """Función principal de pruebas"""
+    print("🧪 Probando circuit breaker y caché negativa...")
+    print("=" * 50)
+    for name, test in (('Estados del circuito', test_breaker_states),
+                       ('Proveedor caído', test_provider_fail_fast)):
+        try:
+            test()
+            print(f"   ✅ {name}")
+        except AssertionError as e:
+            print(f"   ❌ {name}: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de las peticiones condicionales con ETag y Last-Modified
+
+Usa un servidor HTTP local que responde 304 cuando recibe los validadores.
+"""
+
+import asyncio
+import sys
+import os
+
+# Agregar el directorio actual al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from aiohttp import web
+from cache_backends import MemoryCacheBackend
+from cloud_status import CloudStatusChecker
+from providers import ProviderSpec, single_service_status
+from testutils import patch_config, stub_server
+
+SERVER_PORT = 18096
+ETAG = '"v1"'
+LAST_MODIFIED = 'Wed, 21 Oct 2026 07:28:00 GMT'
+PAGE = b'<html>issue</html>'
+
+
+async def run_conditional_fetches():
+    """Consultar dos veces un proveedor cuya página no cambia"""
+    received = []
+    parsed = []
+
+    async def status_page(request: web.Request) -> web.Response:
+        received.append({name: request.headers.get(name) for name in ('If-None-Match', 'If-Modified-Since')})
+        if request.headers.get('If-None-Match') == ETAG:
+            return web.Response(status=304)
+        return web.Response(body=PAGE, content_type='text/html',
+                            headers={'ETag': ETAG, 'Last-Modified': LAST_MODIFIED})
+
+    def parser(body):
+        parsed.append(body)
+        return single_service_status('Proveedor 0', 'Servicios', b'issue' in body)
+
+    spec = ProviderSpec('p0', 'P0', 'Proveedor 0', [f'http://127.0.0.1:{SERVER_PORT}/status'], parser)
+    with patch_config(MAX_RETRIES=1, HEDGED_REQUESTS=False):
+        async with stub_server(SERVER_PORT, [('GET', '/status', status_page)]):
+            checker = CloudStatusChecker(cache_backend=MemoryCacheBackend(), providers={'p0': spec})
+            try:
+                first = await checker.fetch_status('p0')
+                second = await checker.fetch_status('p0')
+            finally:
+                await checker.close()
+    return received, parsed, first, second, checker.get_conditional_stats()['p0']
+
+
+def test_not_modified_reuses_result():
+    """La segunda consulta envía los validadores y reutiliza el resultado sin parsear"""
+    received, parsed, first, second, stats = asyncio.run(run_conditional_fetches())
+
+    assert received[0] == {'If-None-Match': None, 'If-Modified-Since': None}
+    assert received[1] == {'If-None-Match': ETAG, 'If-Modified-Since': LAST_MODIFIED}, received[1]
+    assert len(parsed) == 1, "La respuesta 304 no debe volver a parsearse"
+    assert second['overall_status'] == first['overall_status'] == 'Issues Detected'
+    assert second['services'] == first['services']
+    assert stats['requests'] == 2 and stats['not_modified'] == 1
+    assert stats['bytes_downloaded'] == len(PAGE)
+    assert stats['bytes_saved'] == len(PAGE), "Los bytes ahorrados son los del cuerpo anterior"
+    assert stats['parse_seconds_saved'] > 0, "El tiempo ahorrado es el del parseo anterior"
+
+
+def main():
+    """Función principal de pruebas"""
+    print("🧪 Probando peticiones condicionales...")
+    print("=" * 50)
+    try:
+        test_not_modified_reuses_result()
+        print("   ✅ Respuesta 304")
+    except AssertionError as e:
+        print(f"   ❌ Respuesta 304: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de las peticiones con cobertura entre URLs alternativas
+
+Usa un servidor HTTP local con una URL lenta y otra rápida.
+"""
+
+import asyncio
+import sys
+import os
+import time
+
+# Agregar el directorio actual al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from aiohttp import web
+from cloud_status import CloudStatusChecker
+from latency import LatencyHistogram
+from testutils import patch_config, stub_server
+
+SERVER_PORT = 18090
+SLOW_SECONDS = 1.5
+
+
+async def slow_page(request: web.Request) -> web.Response:
+    await asyncio.sleep(SLOW_SECONDS)
+    return web.Response(text='lenta', content_type='text/html')
+
+
+async def fast_page(request: web.Request) -> web.Response:
+    return web.Response(text='rapida', content_type='text/html')
+
+
+async def run_hedge_checks():
+    """Consultar una URL principal lenta con una alternativa rápida"""
+    base = f'http://127.0.0.1:{SERVER_PORT}'
+    routes = [('GET', '/slow', slow_page), ('GET', '/fast', fast_page)]
+    with patch_config(HEDGED_REQUESTS=True, HEDGE_DEFAULT_DELAY=0.1, MAX_RETRIES=1):
+        async with stub_server(SERVER_PORT, routes):
+            checker = CloudStatusChecker()
+            try:
+                start = time.perf_counter()
+                result = await checker._fetch_first('azure', [f'{base}/slow', f'{base}/fast'],
+                                                    lambda body: {'body': body})
+                elapsed = time.perf_counter() - start
+
+                # Con la principal rápida no se lanza la alternativa
+                fast_first = await checker._fetch_first('gcp', [f'{base}/fast', f'{base}/slow'],
+                                                        lambda body: {'body': body})
+            finally:
+                await checker.close()
+
+    return result, elapsed, fast_first, checker.get_hedge_stats(), checker.get_latency_stats()
+
+
+def test_hedged_request():
+    """La alternativa rápida gana sin esperar a la principal lenta"""
+    result, elapsed, fast_first, hedge_stats, latency_stats = asyncio.run(run_hedge_checks())
+
+    assert result == {'body': b'rapida'}, f"Resultado inesperado: {result}"
+    assert elapsed < SLOW_SECONDS, f"Se esperó a la URL lenta ({elapsed:.2f}s)"
+    assert hedge_stats['azure'] == {'requests': 1, 'hedged': 1, 'fallback_wins': 1}
+    assert fast_first == {'body': b'rapida'}
+    assert hedge_stats['gcp'] == {'requests': 1, 'hedged': 0, 'fallback_wins': 0}
+    assert not any(url.endswith('/slow') for url in latency_stats), "La petición lenta debía cancelarse"
+
+
+def test_latency_histogram():
+    """Los percentiles siguen a las latencias recientes"""
+    histogram = LatencyHistogram(window=100)
+    assert histogram.percentile(95) is None
+    for _ in range(100):
+        histogram.record(0.04)
+    assert histogram.percentile(95) == 0.05
+
+    # Tras un cambio sostenido de latencia el percentil se desplaza
+    for _ in range(400):
+        histogram.record(1.2)
+    assert histogram.percentile(50) == 1.5
+    assert histogram.summary()['count'] == 500
+
+
+def main():
+    """Función principal de pruebas"""
+    print("🧪 Probando peticiones con cobertura...")
+    print("=" * 50)
+    for name, test in (('Histograma de latencias', test_latency_histogram),
+                       ('Petición con cobertura', test_hedged_request)):
+        try:
+            test()
+            print(f"   ✅ {name}")
+        except AssertionError as e:
+            print(f"   ❌ {name}: {e}")
+
+
+if __name__ == "__main__":
+    main()
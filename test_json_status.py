@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de los adaptadores de APIs de estado en JSON
+"""
+
+import asyncio
+import json
+import sys
+import os
+
+# Agregar el directorio actual al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from aiohttp import web
+from cache_backends import MemoryCacheBackend
+from cloud_status import CloudStatusChecker
+from json_status import GcpIncidentsParser, StatuspageSummaryParser
+from providers import KeywordPageParser, ProviderSpec, StatusSource
+from classifier import OCI_CLASSIFIER
+from testutils import patch_config, stub_server
+
+SERVER_PORT = 18092
+
+SUMMARY = {
+    'status': {'indicator': 'minor', 'description': 'Minor Service Outage'},
+    'components': [
+        {'id': 'g1', 'name': 'US East (Ashburn)', 'status': 'degraded_performance', 'group': True},
+        {'id': 'c1', 'name': 'Compute', 'status': 'degraded_performance', 'group': False, 'group_id': 'g1'},
+        {'id': 'c2', 'name': 'Object Storage', 'status': 'operational', 'group': False, 'group_id': 'g1'},
+        {'id': 'c3', 'name': 'Identity', 'status': 'under_maintenance', 'group': False, 'group_id': None}
+    ],
+    'incidents': [{'name': 'Compute degradation', 'status': 'investigating', 'impact': 'minor',
+                   'shortlink': 'https://stspg.io/x'}]
+}
+
+INCIDENTS = [
+    {
+        'id': 'open', 'uri': 'incidents/open', 'begin': '2024-05-01T10:00:00+00:00', 'end': None,
+        'external_desc': 'Elevated error rates', 'severity': 'high', 'status_impact': 'SERVICE_OUTAGE',
+        'affected_products': [{'title': 'Cloud Storage', 'id': 'storage'}],
+        'currently_affected_locations': [{'title': 'Iowa (us-central1)', 'id': 'us-central1'}]
+    },
+    {
+        'id': 'closed', 'uri': 'incidents/closed', 'begin': '2024-04-01T10:00:00+00:00',
+        'end': '2024-04-01T12:00:00+00:00', 'external_desc': 'Resolved issue', 'severity': 'low',
+        'status_impact': 'SERVICE_DISRUPTION', 'affected_products': [{'title': 'BigQuery', 'id': 'bq'}],
+        'currently_affected_locations': []
+    }
+]
+
+
+def test_statuspage_summary():
+    """Cada componente conserva su estado y su grupo como región"""
+    parser = StatuspageSummaryParser('Oracle Cloud Infrastructure', 'OCI', 'OCI Services')
+    result = parser(json.dumps(SUMMARY))
+
+    assert result['overall_status'] == 'Issues Detected'
+    assert [c['name'] for c in result['components']] == ['Compute', 'Object Storage', 'Identity']
+    assert result['services'] == [
+        {'name': 'Compute', 'status': 'Degraded', 'region': 'US East (Ashburn)'},
+        {'name': 'Identity', 'status': 'Maintenance', 'region': 'Global'}
+    ]
+    assert result['incidents'][0]['url'] == 'https://stspg.io/x'
+
+    # Sin componentes afectados ni incidentes: una única entrada operativa
+    calm = dict(SUMMARY, status={'indicator': 'none'}, incidents=[],
+                components=[dict(c, status='operational') for c in SUMMARY['components']])
+    result = parser(json.dumps(calm))
+    assert result['overall_status'] == 'Operational'
+    assert result['services'] == [{'name': 'OCI Services', 'status': 'Operational', 'region': 'Global'}]
+
+
+def test_gcp_incidents():
+    """Solo los incidentes abiertos generan componentes afectados"""
+    result = GcpIncidentsParser('Google Cloud Platform', 'GCP', 'Google Cloud Services')(json.dumps(INCIDENTS))
+
+    assert result['overall_status'] == 'Issues Detected'
+    assert len(result['services']) == 1
+    service = result['services'][0]
+    assert (service['name'], service['status'], service['region']) == ('Cloud Storage', 'Issue', 'Iowa (us-central1)')
+    assert result['incidents'][0]['url'] == 'https://status.cloud.google.com/incidents/open'
+
+
+def test_invalid_json():
+    """Un documento que no es JSON es un error de parseo, no un estado operativo"""
+    result = StatuspageSummaryParser('OCI', 'OCI', 'OCI Services')('<html>operational</html>')
+    assert result == {'error': True, 'message': 'Error parseando datos'}
+
+
+async def run_source_fallback(json_available: bool):
+    """Consultar un proveedor con una fuente JSON y una HTML alternativa"""
+    async def summary(request: web.Request) -> web.Response:
+        if not json_available:
+            return web.Response(status=503)
+        return web.json_response(SUMMARY)
+
+    async def page(request: web.Request) -> web.Response:
+        return web.Response(text='<html>All systems operational</html>', content_type='text/html')
+
+    base = f'http://127.0.0.1:{SERVER_PORT}'
+    spec = ProviderSpec(
+        'oci', 'OCI', 'Oracle Cloud Infrastructure',
+        [StatusSource(f'{base}/api/v2/summary.json', StatuspageSummaryParser('OCI', 'OCI', 'OCI Services')),
+         f'{base}/'],
+        KeywordPageParser('OCI', 'OCI Services', OCI_CLASSIFIER, 'OCI'),
+        fallback_service='OCI Services'
+    )
+    routes = [('GET', '/api/v2/summary.json', summary), ('GET', '/', page)]
+    with patch_config(MAX_RETRIES=1, HEDGED_REQUESTS=False):
+        async with stub_server(SERVER_PORT, routes):
+            checker = CloudStatusChecker(cache_backend=MemoryCacheBackend(), providers={'oci': spec})
+            try:
+                return await checker.fetch_status('oci')
+            finally:
+                await checker.close()
+
+
+def test_json_source_preferred():
+    """La fuente JSON se usa primero y la página HTML solo si falla"""
+    from_json = asyncio.run(run_source_fallback(json_available=True))
+    assert 'components' in from_json and from_json['overall_status'] == 'Issues Detected'
+
+    from_html = asyncio.run(run_source_fallback(json_available=False))
+    assert 'components' not in from_html and from_html['overall_status'] == 'Operational'
+
+
+def main():
+    """Función principal de pruebas"""
+    print("🧪 Probando adaptadores JSON...")
+    print("=" * 50)
+    for name, test in (('Statuspage summary.json', test_statuspage_summary),
+                       ('Google Cloud incidents.json', test_gcp_incidents),
+                       ('JSON inválido', test_invalid_json),
+                       ('Fuente JSON con alternativa HTML', test_json_source_preferred)):
+        try:
+            test()
+            print(f"   ✅ {name}")
+        except AssertionError as e:
+            print(f"   ❌ {name}: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Script de prueba del registro de métricas y su formato de exposición
+"""
+
+import sys
+import os
+
+# Agregar el directorio actual al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from metrics import MetricsRegistry
+
+
+def test_exposition_format():
+    """Contadores e histogramas se exponen en formato de texto de Prometheus"""
+    registry = MetricsRegistry()
+    requests = registry.counter('demo_requests_total', 'Peticiones', ('provider',))
+    latency = registry.histogram('demo_seconds', 'Latencia', ('provider',), buckets=(0.1, 1.0))
+
+    requests.inc('aws')
+    requests.inc('aws', amount=2)
+    latency.observe(0.05, 'aws')
+    latency.observe(0.1, 'aws')
+    latency.observe(3.0, 'aws')
+
+    text = registry.exposition()
+    assert '# TYPE demo_requests_total counter' in text
+    assert 'demo_requests_total{provider="aws"} 3' in text
+    assert '# TYPE demo_seconds histogram' in text
+    # Los cubos son acumulativos y el límite es inclusivo
+    assert 'demo_seconds_bucket{provider="aws",le="0.1"} 2' in text
+    assert 'demo_seconds_bucket{provider="aws",le="1"} 2' in text
+    assert 'demo_seconds_bucket{provider="aws",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{provider="aws"} 3' in text
+    assert 'demo_seconds_sum{provider="aws"} 3.15' in text
+
+
+def test_label_escaping():
+    """Los valores de etiqueta con comillas o barras se escapan"""
+    registry = MetricsRegistry()
+    counter = registry.counter('demo_total', 'Demo', ('url',))
+    counter.inc('https://example.com/"a"\\b')
+    assert 'demo_total{url="https://example.com/\\"a\\"\\\\b"} 1' in registry.exposition()
+
+
+def main():
+    """Función principal de pruebas"""
+    print("🧪 Probando métricas...")
+    print("=" * 50)
+    for name, test in (('Formato de exposición', test_exposition_format),
+                       ('Escapado de etiquetas', test_label_escaping)):
+        try:
+            test()
+            print(f"   ✅ {name}")
+        except AssertionError as e:
+            print(f"   ❌ {name}: {e}")
+
+
+if __name__ == "__main__":
+    main()
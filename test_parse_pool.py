@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Script de prueba del ejecutor de parsers y la medición del bloqueo del bucle
+"""
+
+import asyncio
+import sys
+import os
+import time
+
+# Agregar el directorio actual al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import classifier
+from classifier import GCP_CLASSIFIER
+from parse_pool import LoopLagMonitor, ParsePool
+from providers import PROVIDERS
+
+PAGE = (b'<html>' + b'<div class="row">Compute Engine</div>' * 20000
+        + b'<p>We are investigating a service disruption</p></html>')
+
+
+def slow_parser(body: bytes) -> dict:
+    """Parser que ocupa 0,2 s sin ceder el control (como un parseo pesado)"""
+    time.sleep(0.2)
+    return {'bytes': len(body)}
+
+
+def test_mode_selection():
+    """Las páginas pequeñas y los parsers con estado no salen de este proceso"""
+    pool = ParsePool('process', workers=1, min_bytes=1000)
+    assert pool.mode_for(10) == 'inline'
+    assert pool.mode_for(5000) == 'process'
+    assert pool.mode_for(5000, shared_state=True) == 'thread'
+    assert ParsePool('inline').mode_for(10 ** 7) == 'inline'
+    assert ParsePool('desconocido').mode == 'thread'
+
+
+async def measure_lag(mode: str):
+    pool = ParsePool(mode, min_bytes=0)
+    monitor = LoopLagMonitor(interval=0.01, warn_threshold=0)
+    monitor.start()
+    await asyncio.sleep(0.05)
+    try:
+        result = await pool.run(slow_parser, PAGE)
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+        pool.close()
+    return result, monitor.summary()
+
+
+def test_executor_keeps_loop_responsive():
+    """Un parseo en el hilo no bloquea el bucle; en el bucle sí, y el medidor lo detecta"""
+    result, inline = asyncio.run(measure_lag('inline'))
+    assert result == {'bytes': len(PAGE)}
+    assert inline['max_ms'] >= 150, f"El medidor no detectó el bloqueo: {inline}"
+
+    result, threaded = asyncio.run(measure_lag('thread'))
+    assert result == {'bytes': len(PAGE)}
+    assert threaded['max_ms'] < 100, f"El bucle quedó bloqueado: {threaded}"
+
+
+async def run_in_processes():
+    pool = ParsePool('process', workers=1, min_bytes=0)
+    parser = PROVIDERS['gcp'].sources[1].parser
+    try:
+        in_process = await pool.run(parser, PAGE)
+        # Una lambda no se puede enviar a otro proceso: se parsea en el hilo
+        fallback = await pool.run(lambda body: {'bytes': len(body)}, PAGE)
+    finally:
+        pool.close()
+    return parser(PAGE), in_process, fallback, pool.stats
+
+
+def test_process_pool():
+    """El pool de procesos da el mismo resultado que el parseo local"""
+    local, in_process, fallback, stats = asyncio.run(run_in_processes())
+    assert local['overall_status'] == in_process['overall_status'] == 'Issues Detected'
+    assert fallback == {'bytes': len(PAGE)}
+    assert stats['process'] == 2
+
+
+def test_chunked_classifier():
+    """Clasificar por tramos da el mismo resultado que la página completa"""
+    original = classifier.SCAN_CHUNK_SIZE
+    try:
+        classifier.SCAN_CHUNK_SIZE = 10 ** 9
+        expected = GCP_CLASSIFIER.classify(PAGE), GCP_CLASSIFIER.scan(PAGE.decode('utf-8'))
+        # Tramos que parten los indicadores por la mitad
+        classifier.SCAN_CHUNK_SIZE = 37
+        assert (GCP_CLASSIFIER.classify(PAGE), GCP_CLASSIFIER.scan(PAGE.decode('utf-8'))) == expected
+    finally:
+        classifier.SCAN_CHUNK_SIZE = original
+    assert expected[0][0] is True
+
+
+def main():
+    """Función principal de pruebas"""
+    print("🧪 Probando ejecutor de parsers...")
+    print("=" * 50)
+    for name, test in (('Selección del modo', test_mode_selection),
+                       ('Bucle de eventos sin bloquear', test_executor_keeps_loop_responsive),
+                       ('Pool de procesos', test_process_pool),
+                       ('Clasificación por tramos', test_chunked_classifier)):
+        try:
+            test()
+            print(f"   ✅ {name}")
+        except AssertionError as e:
+            print(f"   ❌ {name}: {e}")
+
+
+if __name__ == "__main__":
+    main()
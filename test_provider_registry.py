@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Script de prueba del registro de proveedores y del límite de consultas simultáneas
+
+Usa un servidor HTTP local al que se llega por dos hosts (127.0.0.1 y localhost).
+"""
+
+import asyncio
+import sys
+import os
+from unittest import mock
+
+# Agregar el directorio actual al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from aiohttp import web
+from cache_backends import MemoryCacheBackend
+from cloud_status import CloudStatusChecker
+from providers import PROVIDERS, ProviderSpec, StatusSource, single_service_status
+from testutils import patch_config, stub_server
+
+SERVER_PORT = 18091
+
+
+def make_registry():
+    """Seis proveedores repartidos entre dos hosts, declarados sin orden de prioridad"""
+    providers = {}
+    for index in range(6):
+        host = '127.0.0.1' if index % 2 else 'localhost'
+        spec = ProviderSpec(
+            f'p{index}', f'P{index}', f'Proveedor {index}',
+            [f'http://{host}:{SERVER_PORT}/status/{index}'],
+            lambda body, name=f'Proveedor {index}': single_service_status(name, 'Servicios', b'issue' in body),
+            ttl=600 if index == 0 else None,
+            priority=60 - index * 10
+        )
+        providers[spec.key] = spec
+    return dict(sorted(providers.items(), key=lambda item: item[1].priority))
+
+
+async def run_bounded_fetches():
+    """Consultar todos los proveedores a la vez con límites de concurrencia bajos"""
+    active = {'total': 0, 'hosts': {}}
+    peaks = {'total': 0, 'hosts': {}}
+
+    async def status_page(request: web.Request) -> web.Response:
+        host = request.host
+        active['total'] += 1
+        active['hosts'][host] = active['hosts'].get(host, 0) + 1
+        peaks['total'] = max(peaks['total'], active['total'])
+        peaks['hosts'][host] = max(peaks['hosts'].get(host, 0), active['hosts'][host])
+        try:
+            await asyncio.sleep(0.1)
+            return web.Response(text='all good', content_type='text/html')
+        finally:
+            active['total'] -= 1
+            active['hosts'][host] -= 1
+
+    with patch_config(MAX_CONCURRENT_FETCHES=3, MAX_FETCHES_PER_HOST=2, CACHE_DURATION=300, MAX_RETRIES=1):
+        async with stub_server(SERVER_PORT, [('GET', '/status/{index}', status_page)]):
+            checker = CloudStatusChecker(cache_backend=MemoryCacheBackend(), providers=make_registry())
+            try:
+                status = await checker.get_all_status()
+                ttls = {provider: checker._cache_ttl(provider) for provider in checker.providers}
+            finally:
+                await checker.close()
+    return status, peaks, ttls
+
+
+def test_bounded_fetches():
+    """Las consultas respetan el límite global y el límite por host"""
+    status, peaks, ttls = asyncio.run(run_bounded_fetches())
+
+    assert all(data['overall_status'] == 'Operational' for data in status.values()), status
+    assert peaks['total'] <= 3, f"Pico de {peaks['total']} peticiones simultáneas"
+    assert peaks['total'] >= 2, "Las consultas debían solaparse"
+    assert all(peak <= 2 for peak in peaks['hosts'].values()), f"Picos por host: {peaks['hosts']}"
+    assert list(status) == ['p5', 'p4', 'p3', 'p2', 'p1', 'p0'], "El orden debe seguir la prioridad"
+    assert ttls['p0'] == 600 and ttls['p1'] == 300
+
+
+async def run_parser_failover(hedged: bool):
+    """Consultar dos fuentes cuya primera tiene un parser que falla"""
+    def broken_parser(body):
+        raise ValueError("formato inesperado")
+
+    base = f'http://127.0.0.1:{SERVER_PORT}'
+    sources = [StatusSource(f'{base}/status/0', broken_parser),
+               StatusSource(f'{base}/status/1', lambda body: single_service_status('Proveedor', 'Servicios', False))]
+
+    async def status_page(request: web.Request) -> web.Response:
+        return web.Response(text='all good', content_type='text/html')
+
+    with patch_config(HEDGED_REQUESTS=hedged, MAX_RETRIES=1):
+        async with stub_server(SERVER_PORT, [('GET', '/status/{index}', status_page)]):
+            checker = CloudStatusChecker(cache_backend=MemoryCacheBackend())
+            try:
+                return await checker._fetch_first('p0', sources)
+            finally:
+                await checker.close()
+
+
+def test_parser_error_fails_over():
+    """Un parser que falla da paso a la siguiente fuente con y sin cobertura"""
+    for hedged in (False, True):
+        result = asyncio.run(run_parser_failover(hedged))
+        assert result and result['overall_status'] == 'Operational', f"Sin respaldo (cobertura={hedged}): {result}"
+
+
+def test_bot_generated_from_registry():
+    """Comandos, teclados y mensajes salen del registro"""
+    from telegram_bot import CloudStatusBot, HELP_MESSAGE, WELCOME_MESSAGE
+
+    bot = CloudStatusBot()
+    callback_data = [button.callback_data for row in bot.main_keyboard.inline_keyboard for button in row]
+    assert callback_data == ['status_all'] + [f'status_{key}' for key in PROVIDERS] + ['show_stats']
+    for spec in PROVIDERS.values():
+        assert f'/{spec.key} - ' in WELCOME_MESSAGE and f'/{spec.key} - ' in HELP_MESSAGE
+        assert f'callback:status_{spec.key}' in {f'callback:{data}' for data in bot._callback_data}
+
+
+def test_render_cache_per_provider():
+    """Dos proveedores con la misma versión no comparten el mensaje renderizado"""
+    from telegram_bot import CloudStatusBot
+
+    bot = CloudStatusBot()
+    aws = {'provider': 'AWS', 'overall_status': 'Operational', 'services': [], 'version': 7}
+    gcp = {'provider': 'GCP', 'overall_status': 'Issues Detected', 'services': [], 'version': 7}
+    aws_message = bot._render_provider_status('aws', aws)
+    gcp_message = bot._render_provider_status('gcp', gcp)
+    assert 'GCP' in gcp_message and 'AWS' not in gcp_message, "Se reutilizó el mensaje de otro proveedor"
+    assert bot._render_provider_status('aws', aws) is aws_message
+
+
+def test_invalid_refresh_interval_ignored():
+    """Una variable ajena terminada en _REFRESH_INTERVAL no impide arrancar"""
+    import config
+
+    with mock.patch.dict(os.environ, {'FOO_REFRESH_INTERVAL': '5m', 'AWS_REFRESH_INTERVAL': '30'}):
+        intervals = config._provider_settings('_REFRESH_INTERVAL', int)
+    assert intervals.get('aws') == 30 and 'foo' not in intervals
+
+
+def main():
+    """Función principal de pruebas"""
+    print("🧪 Probando registro de proveedores...")
+    print("=" * 50)
+    for name, test in (('Bot generado desde el registro', test_bot_generated_from_registry),
+                       ('Mensajes en caché por proveedor', test_render_cache_per_provider),
+                       ('Intervalos de refresco no válidos', test_invalid_refresh_interval_ignored),
+                       ('Consultas limitadas', test_bounded_fetches),
+                       ('Parser que falla', test_parser_error_fails_over)):
+        try:
+            test()
+            print(f"   ✅ {name}")
+        except AssertionError as e:
+            print(f"   ❌ {name}: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,14 +20,8 @@ async def test_provider(provider_name: str, checker: CloudStatusChecker):
     print(f"{'='*50}")
     
     try:
-        if provider_name == 'azure':
-            result = await checker.get_azure_status()
-        elif provider_name == 'gcp':
-            result = await checker.get_gcp_status()
-        elif provider_name == 'aws':
-            result = await checker.get_aws_status()
-        elif provider_name == 'oci':
-            result = await checker.get_oci_status()
+        if provider_name in checker.supported_providers():
+            result = await checker.fetch_status(provider_name)
         else:
             print(f"Proveedor {provider_name} no soportado")
             return
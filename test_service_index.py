@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Script de prueba del índice de servicios y regiones
+"""
+
+import asyncio
+import sys
+import os
+
+# Agregar el directorio actual al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from aws_feed import parse_aws_item_key, parse_aws_rss
+from cache_backends import MemoryCacheBackend
+from cloud_status import CloudStatusChecker
+from service_index import ServiceIndex, normalize_key
+
+FEED = """<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>AWS</title>
+<item><title>Increased API error rates</title>
+<guid>https://status.aws.amazon.com/#ec2-us-east-1_1700000300</guid>
+<description>We are investigating increased error rates.</description></item>
+<item><title>Service is operating normally</title>
+<guid>https://status.aws.amazon.com/#ec2-us-east-1_1700000100</guid>
+<description>Service is operating normally.</description></item>
+<item><title>Elevated latency</title>
+<guid>https://status.aws.amazon.com/#ec2-eu-west-1_1700000200</guid>
+<description>Service is operating normally.</description></item>
+<item><title>DNS propagation delays (N. Virginia)</title>
+<guid>https://status.aws.amazon.com/#route53_1700000000</guid>
+<description>Service is operating normally.</description></item>
+</channel></rss>"""
+
+
+def test_item_keys():
+    """El servicio y la región salen del GUID o, si falta, del título"""
+    assert parse_aws_item_key('x', 'https://status.aws.amazon.com/#ec2-us-east-1_1700000000') == ('ec2', 'us-east-1')
+    assert parse_aws_item_key('x', 'https://status.aws.amazon.com/#lambda-us-gov-west-1_1') == ('lambda', 'us-gov-west-1')
+    assert parse_aws_item_key('Delays (Frankfurt)', 'https://status.aws.amazon.com/#s3_1') == ('s3', 'eu-central-1')
+    assert parse_aws_item_key('Sin región', None) == (None, None)
+    assert normalize_key('US East (Ashburn)') == 'us-east-ashburn'
+
+
+def test_index_lookup():
+    """Búsqueda exacta, por subcadena, por región y sin cambios con la misma versión"""
+    index = ServiceIndex()
+    status = parse_aws_rss(FEED)
+    index.update('aws', status, version=1)
+
+    ec2_east = index.lookup('aws', 'EC2', 'us-east-1')
+    assert list(ec2_east) == ['ec2'] and list(ec2_east['ec2']) == ['us-east-1']
+    assert [entry['status'] for entry in ec2_east['ec2']['us-east-1']] == ['Issue', 'Operational']
+
+    assert set(index.lookup('aws', 'ec2')['ec2']) == {'us-east-1', 'eu-west-1'}
+    assert list(index.lookup('aws', 'route')) == ['route53'], "Debe aceptar subcadenas"
+    assert index.lookup('aws', 'ec2', 'ap-south-1') == {}
+    assert index.services('aws') == ['ec2', 'route53']
+
+    # Una versión ya indexada o un error no cambian el índice
+    index.update('aws', {'services': []}, version=1)
+    index.update('aws', {'error': True, 'message': 'caído'}, version=2)
+    assert index.services('aws') == ['ec2', 'route53']
+
+
+async def run_lookup():
+    async def fake_fetch(provider):
+        return parse_aws_rss(FEED)
+
+    checker = CloudStatusChecker(cache_backend=MemoryCacheBackend())
+    checker.fetch_status = fake_fetch
+    try:
+        found = await checker.lookup_service('aws', 'ec2', 'us-east-1')
+        missing = await checker.lookup_service('aws', 'dynamodb')
+    finally:
+        await checker.close()
+    return found, missing
+
+
+def test_lookup_message():
+    """La consulta del bot solo renderiza el servicio y la región pedidos"""
+    from telegram_bot import CloudStatusBot
+
+    found, missing = asyncio.run(run_lookup())
+    bot = CloudStatusBot()
+
+    message = bot._format_service_lookup(found)
+    assert '🔴 *ec2* (us-east-1): Issue' in message
+    assert 'eu-west-1' not in message and 'route53' not in message
+    assert '1 avisos anteriores' in message
+
+    message = bot._format_service_lookup(missing)
+    assert 'Sin avisos para *dynamodb*' in message and 'ec2, route53' in message
+
+
+def main():
+    """Función principal de pruebas"""
+    print("🧪 Probando índice de servicios y regiones...")
+    print("=" * 50)
+    for name, test in (('Servicio y región de los avisos', test_item_keys),
+                       ('Búsquedas en el índice', test_index_lookup),
+                       ('Consulta desde el bot', test_lookup_message)):
+        try:
+            test()
+            print(f"   ✅ {name}")
+        except AssertionError as e:
+            print(f"   ❌ {name}: {e}")
+
+
+if __name__ == "__main__":
+    main()
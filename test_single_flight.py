@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de la deduplicación de consultas simultáneas a un proveedor
+
+Usa un servidor HTTP local lento para que las consultas se solapen.
+"""
+
+import asyncio
+import sys
+import os
+
+# Agregar el directorio actual al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from aiohttp import web
+from cache_backends import MemoryCacheBackend
+from cloud_status import CloudStatusChecker
+from providers import ProviderSpec, single_service_status
+from testutils import patch_config, stub_server
+
+SERVER_PORT = 18095
+CALLERS = 8
+
+
+def make_registry():
+    """Un proveedor con una sola URL en el servidor local y sin servicio de respaldo"""
+    spec = ProviderSpec(
+        'p0', 'P0', 'Proveedor 0',
+        [f'http://127.0.0.1:{SERVER_PORT}/status'],
+        lambda body: single_service_status('Proveedor 0', 'Servicios', b'issue' in body)
+    )
+    return {spec.key: spec}
+
+
+async def run_concurrent_callers(status: int):
+    """Lanzar CALLERS consultas a la vez con la caché vacía"""
+    requests = 0
+
+    async def status_page(request: web.Request) -> web.Response:
+        nonlocal requests
+        requests += 1
+        await asyncio.sleep(0.2)
+        return web.Response(text='issue', status=status, content_type='text/html')
+
+    with patch_config(MAX_RETRIES=1, BACKGROUND_REFRESH=False):
+        async with stub_server(SERVER_PORT, [('GET', '/status', status_page)]):
+            checker = CloudStatusChecker(cache_backend=MemoryCacheBackend(), providers=make_registry())
+            try:
+                results = await asyncio.gather(*[checker.get_provider_status('p0') for _ in range(CALLERS)])
+            finally:
+                await checker.close()
+    return requests, results, checker.get_coalescing_stats()
+
+
+def test_concurrent_callers_share_fetch():
+    """Las consultas simultáneas esperan a una sola petición y reciben la misma instantánea"""
+    requests, results, stats = asyncio.run(run_concurrent_callers(200))
+
+    assert requests == 1, f"{requests} peticiones al servidor para {CALLERS} consultas"
+    assert all(result['overall_status'] == 'Issues Detected' for result in results), results
+    assert len({result['version'] for result in results}) == 1, "Las consultas recibieron instantáneas distintas"
+    assert stats['p0'] == {'fetches': 1, 'coalesced': CALLERS - 1}
+
+
+def test_error_reaches_every_caller():
+    """Si la petición compartida falla, todas las consultas reciben el error"""
+    requests, results, stats = asyncio.run(run_concurrent_callers(500))
+
+    assert requests == 1, f"{requests} peticiones al servidor para {CALLERS} consultas"
+    assert all(result.get('error') for result in results), results
+    assert stats['p0'] == {'fetches': 1, 'coalesced': CALLERS - 1}
+
+
+def main():
+    """Función principal de pruebas"""
+    print("🧪 Probando deduplicación de consultas...")
+    print("=" * 50)
+    for name, test in (('Consultas simultáneas', test_concurrent_callers_share_fetch),
+                       ('Error compartido', test_error_reaches_every_caller)):
+        try:
+            test()
+            print(f"   ✅ {name}")
+        except AssertionError as e:
+            print(f"   ❌ {name}: {e}")
+
+
+if __name__ == "__main__":
+    main()
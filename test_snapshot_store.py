@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de las instantáneas persistentes para arranques en caliente
+"""
+
+import asyncio
+import sys
+import os
+import tempfile
+import time
+
+# Agregar el directorio actual al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from cache_backends import MemoryCacheBackend
+from cloud_status import CloudStatusChecker
+from snapshot_store import MAGIC, SnapshotStore
+from testutils import patch_config
+
+
+def status(provider: str, overall: str = 'Operational') -> dict:
+    return {
+        'provider': provider,
+        'overall_status': overall,
+        'services': [{'name': f'{provider} Services', 'status': 'Operational', 'region': 'Global'}],
+        'last_updated': '2024-01-01T00:00:00'
+    }
+
+
+def test_round_trip():
+    """Los registros se indexan sin decodificar y se entregan una sola vez"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'snapshots.bin')
+        entry = {'status': status('AWS'), 'timestamp': time.time(), 'version': 1}
+        validators = {'etag': '"abc"', 'last_modified': None, 'body_bytes': 10, 'parse_seconds': 0.1,
+                      'result': status('AWS')}
+        SnapshotStore(path).write({'aws': entry}, {'https://example.com/rss': validators})
+
+        with open(path, 'rb') as f:
+            assert f.read(len(MAGIC)) == MAGIC
+
+        store = SnapshotStore(path)
+        assert store.pop_snapshot('aws') == entry
+        assert store.pop_snapshot('aws') is None, "Cada registro se restaura una vez"
+        assert store.pop_validators('https://example.com/rss') == validators
+        assert store.pop_snapshot('gcp') is None
+        # Windows no deja reemplazar un archivo proyectado en memoria
+        store.write({'aws': entry}, {})
+        assert store._map is None, "La proyección debe liberarse antes de reemplazar el archivo"
+        store.close()
+        reopened = SnapshotStore(path)
+        assert reopened.pop_snapshot('aws') == entry
+        reopened.close()
+
+
+def test_damaged_files():
+    """Un archivo ausente, ajeno o truncado no impide arrancar"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'snapshots.bin')
+        assert SnapshotStore(path).pop_snapshot('aws') is None
+
+        with open(path, 'wb') as f:
+            f.write(b'not a snapshot file')
+        assert SnapshotStore(path).pop_snapshot('aws') is None
+
+        entries = {provider: {'status': status(provider), 'timestamp': time.time(), 'version': 1}
+                   for provider in ('aws', 'gcp')}
+        SnapshotStore(path).write(entries, {})
+        with open(path, 'rb') as f:
+            data = f.read()
+        with open(path, 'wb') as f:
+            f.write(data[:-5])
+        store = SnapshotStore(path)
+        assert store.pop_snapshot('aws') is not None and store.pop_snapshot('gcp') is None
+        store.close()
+
+
+async def run_restart(path: str, fail_after_restart: bool = False):
+    """Arrancar un comprobador, apagarlo y arrancar otro con el mismo archivo"""
+    calls = []
+
+    async def first_fetch(provider):
+        calls.append(('first', provider))
+        return status(provider.upper(), 'Issues Detected')
+
+    async def second_fetch(provider):
+        calls.append(('second', provider))
+        await asyncio.sleep(0.05)
+        if fail_after_restart:
+            return {'error': True, 'message': 'caído'}
+        return status(provider.upper())
+
+    checker = CloudStatusChecker(cache_backend=MemoryCacheBackend(), snapshot_store=SnapshotStore(path))
+    checker.fetch_status = first_fetch
+    await checker.get_all_status()
+    checker.validators['https://example.com/rss'] = {'etag': '"v1"', 'last_modified': None, 'body_bytes': 1,
+                                                    'parse_seconds': 0.0, 'result': status('AWS')}
+    await checker.close()
+
+    restarted = CloudStatusChecker(cache_backend=MemoryCacheBackend(), snapshot_store=SnapshotStore(path))
+    restarted.fetch_status = second_fetch
+    try:
+        start = time.perf_counter()
+        warm = await restarted.get_provider_status('aws')
+        elapsed = time.perf_counter() - start
+        # Esperar al refresco en segundo plano lanzado al servir el dato obsoleto
+        await asyncio.gather(*restarted._inflight.values(), return_exceptions=True)
+        refreshed = await restarted.get_provider_status('aws')
+        validators = restarted._restore_validators('https://example.com/rss')
+    finally:
+        await restarted.close()
+    return warm, elapsed, refreshed, validators, calls
+
+
+def test_warm_restart():
+    """Tras reiniciar se sirve la instantánea del disco y se refresca en segundo plano"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'snapshots.bin')
+        warm, elapsed, refreshed, validators, calls = asyncio.run(run_restart(path))
+
+        assert warm['overall_status'] == 'Issues Detected' and warm['stale'], "Se sirve como obsoleta"
+        assert elapsed < 0.05, "La primera respuesta no espera a la consulta"
+        assert ('second', 'aws') in calls
+        assert refreshed['overall_status'] == 'Operational' and not refreshed['stale']
+        assert validators['etag'] == '"v1"', "Los validadores HTTP también se restauran"
+
+
+def test_restored_snapshot_survives_failures():
+    """Si la primera consulta tras reiniciar falla se sigue sirviendo la del disco"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'snapshots.bin')
+        _, _, refreshed, _, _ = asyncio.run(run_restart(path, fail_after_restart=True))
+        assert refreshed['overall_status'] == 'Issues Detected' and refreshed['stale']
+
+
+async def run_old_snapshot(path: str):
+    store = SnapshotStore(path)
+    old = {'status': status('AWS', 'Issues Detected'), 'timestamp': time.time() - 3600, 'version': 1}
+    store.write({'aws': old}, {})
+
+    async def fetch(provider):
+        return status(provider.upper())
+
+    checker = CloudStatusChecker(cache_backend=MemoryCacheBackend(), snapshot_store=SnapshotStore(path))
+    checker.fetch_status = fetch
+    try:
+        return await checker.get_provider_status('aws')
+    finally:
+        await checker.close()
+
+
+def test_old_snapshots_discarded():
+    """Las instantáneas más antiguas que SNAPSHOT_MAX_AGE no se sirven"""
+    with patch_config(SNAPSHOT_MAX_AGE=60), tempfile.TemporaryDirectory() as directory:
+        result = asyncio.run(run_old_snapshot(os.path.join(directory, 'snapshots.bin')))
+        assert result['overall_status'] == 'Operational' and not result['stale']
+
+
+def main():
+    """Función principal de pruebas"""
+    print("🧪 Probando instantáneas persistentes...")
+    print("=" * 50)
+    for name, test in (('Escritura y lectura perezosa', test_round_trip),
+                       ('Archivos dañados', test_damaged_files),
+                       ('Arranque en caliente', test_warm_restart),
+                       ('Fallo tras reiniciar', test_restored_snapshot_survives_failures),
+                       ('Instantáneas antiguas', test_old_snapshots_discarded)):
+        try:
+            test()
+            print(f"   ✅ {name}")
+        except AssertionError as e:
+            print(f"   ❌ {name}: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Script de prueba del volcado diferido de estadísticas
+"""
+
+import asyncio
+import sys
+import os
+import tempfile
+import threading
+import time
+
+# Agregar el directorio actual al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from statistics import BotStatistics
+from stats_storage import JsonStatsStorage, SQLiteStatsStorage
+
+
+class SlowStorage(JsonStatsStorage):
+    """Almacenamiento JSON lento que registra escrituras simultáneas y puede fallar"""
+
+    def __init__(self, stats_file: str):
+        super().__init__(stats_file)
+        self.active = 0
+        self.overlapped = False
+        self.fail = False
+        self.closed = False
+        self.written = []
+        self._guard = threading.Lock()
+
+    def prepare(self, stats, events):
+        return super().prepare(stats, events), len(events)
+
+    def write(self, payload):
+        with self._guard:
+            self.active += 1
+            self.overlapped |= self.active > 1
+        try:
+            time.sleep(0.05)
+            assert not self.closed, "Escritura tras cerrar el almacenamiento"
+            if self.fail:
+                raise OSError("disco lleno")
+            super().write(payload[0])
+            self.written.append(payload[1])
+        finally:
+            with self._guard:
+                self.active -= 1
+
+    def close(self):
+        self.closed = True
+
+
+async def run_concurrent_flushes(stats_file: str):
+    storage = SlowStorage(stats_file)
+    stats = BotStatistics(storage=storage, write_behind=True, flush_interval=0.01, flush_threshold=1)
+    stats.start()
+    for index in range(20):
+        stats.record_command(f'cmd{index % 3}')
+        await asyncio.sleep(0.005)
+    await stats.close()
+    return storage, stats
+
+
+def test_flushes_serialized():
+    """El volcado por umbral y el periódico no escriben a la vez ni tras cerrar"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'stats.json')
+        storage, stats = asyncio.run(run_concurrent_flushes(path))
+        assert not storage.overlapped, "Dos volcados escribieron a la vez"
+        assert sum(storage.written) == 20, f"Eventos guardados: {storage.written}"
+        assert BotStatistics(path).stats['total_commands'] == 20
+
+
+async def run_failed_flush(stats_file: str):
+    storage = SlowStorage(stats_file)
+    stats = BotStatistics(storage=storage, write_behind=True, flush_threshold=100)
+    stats.record_command('status')
+    stats.record_command('aws')
+    storage.fail = True
+    await stats.flush()
+    pending = list(stats._pending_events), stats._dirty
+    storage.fail = False
+    stats.record_command('gcp')
+    await stats.close()
+    return pending, storage.written
+
+
+def test_failed_flush_requeues_events():
+    """Si el guardado falla, los eventos vuelven a la cola y se guardan en el siguiente"""
+    with tempfile.TemporaryDirectory() as directory:
+        (events, dirty), written = asyncio.run(run_failed_flush(os.path.join(directory, 'stats.json')))
+        assert [event['command'] for event in events] == ['status', 'aws'] and dirty == 2
+        assert written == [3], f"Volcados: {written}"
+
+
+def test_sqlite_imports_json():
+    """Al pasar a SQLite se importan los totales del archivo JSON una sola vez"""
+    with tempfile.TemporaryDirectory() as directory:
+        json_file = os.path.join(directory, 'stats.json')
+        db_file = os.path.join(directory, 'stats.db')
+        stats = BotStatistics(json_file)
+        stats.record_command('status', 7)
+        stats.record_command('aws', 7)
+        stats.record_provider_check('aws', False)
+        stats.record_throttled('rejected', 'status', 7)
+
+        storage = SQLiteStatsStorage(db_file, legacy_json=json_file)
+        imported = BotStatistics(storage=storage)
+        imported.record_command('status', 8)
+        storage.close()
+        # El archivo JSON ya no se vuelve a importar
+        reloaded = BotStatistics(storage=SQLiteStatsStorage(db_file, legacy_json=json_file))
+        reloaded.storage.close()
+
+    assert reloaded.stats['commands_by_type'] == {'status': 2, 'aws': 1}
+    assert reloaded.stats['uptime_start'] == stats.stats['uptime_start']
+    assert reloaded.stats['provider_checks']['aws'] == {'total': 1, 'success': 0, 'errors': 1}
+    assert reloaded.stats['throttled']['rejected'] == 1
+    assert sum(day['total_commands'] for day in reloaded.stats['daily_stats'].values()) == 3
+
+
+def main():
+    """Función principal de pruebas"""
+    print("🧪 Probando volcado de estadísticas...")
+    print("=" * 50)
+    for name, test in (('Volcados de uno en uno', test_flushes_serialized),
+                       ('Reintento tras un fallo', test_failed_flush_requeues_events),
+                       ('Importación a SQLite', test_sqlite_imports_json)):
+        try:
+            test()
+            print(f"   ✅ {name}")
+        except AssertionError as e:
+            print(f"   ❌ {name}: {e}")
+
+
+if __name__ == "__main__":
+    main()
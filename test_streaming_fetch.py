@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de las descargas incrementales con corte anticipado
+
+Usa un servidor HTTP local que sirve páginas de varios megabytes.
+"""
+
+import asyncio
+import sys
+import os
+
+# Agregar el directorio actual al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from aiohttp import web
+from cache_backends import MemoryCacheBackend
+from classifier import AZURE_CLASSIFIER, GCP_CLASSIFIER, OCI_CLASSIFIER, KeywordStreamMatcher
+from cloud_status import CloudStatusChecker
+from providers import PROVIDERS, ProviderSpec
+from testutils import patch_config, stub_server
+
+SERVER_PORT = 18094
+
+FILLER = b'<div class="row">Compute Engine</div>' * 60000
+
+PAGES = {
+    # El indicador operativo al principio decide la clasificación
+    'healthy': b'<html><h1>All services are operating normally</h1>' + FILLER + b'</html>',
+    # Un indicador de problema no basta: el resto de la página podría desmentirlo
+    'issue': b'<html><p>We are INVESTIGATING a partial outage</p>' + FILLER + b'</html>',
+    'late': b'<html>' + FILLER + b'<p>Investigating</p><p>No issues reported</p></html>'
+}
+
+
+def test_matcher_matches_classifier():
+    """El resultado por fragmentos coincide con el de la página completa"""
+    for page in PAGES.values():
+        sample = page[:300] + page[-300:]
+        for classifier in (AZURE_CLASSIFIER, GCP_CLASSIFIER, OCI_CLASSIFIER):
+            expected, _ = classifier.classify(sample)
+            # Fragmentos de 7 bytes: los indicadores quedan partidos entre varios
+            for size in (7, 64, len(sample)):
+                matcher = KeywordStreamMatcher(classifier)
+                for offset in range(0, len(sample), size):
+                    matcher.feed(sample[offset:offset + size])
+                assert matcher.result()[0] == expected, f"{size} bytes: distinto de classify"
+
+
+def test_matcher_decides_early():
+    """La clasificación es definitiva en cuanto ya no puede cambiar"""
+    matcher = KeywordStreamMatcher(AZURE_CLASSIFIER)
+    assert matcher.feed(PAGES['healthy'][:4096])
+    assert matcher.matches['operational'] == {'all services are operating normally': 10}
+
+    matcher = KeywordStreamMatcher(AZURE_CLASSIFIER)
+    assert not matcher.feed(PAGES['issue'][:4096]), "Sin indicadores operativos aún no se decide"
+
+    # OCI no tiene indicadores operativos: el primer problema decide
+    matcher = KeywordStreamMatcher(OCI_CLASSIFIER)
+    assert matcher.feed(PAGES['issue'][:4096]) and matcher.result()[0]
+
+
+def make_registry():
+    azure = PROVIDERS['azure']
+    spec = ProviderSpec(
+        'azure', 'Azure', 'Microsoft Azure',
+        [f'http://127.0.0.1:{SERVER_PORT}/{name}' for name in PAGES],
+        azure.parser,
+        stream_parser=azure.stream_parser
+    )
+    return {spec.key: spec}
+
+
+async def run_fetches(overrides: dict):
+    """Descargar cada página por separado con la configuración indicada"""
+    async def page(request: web.Request) -> web.Response:
+        return web.Response(body=PAGES[request.match_info['name']], content_type='text/html')
+
+    results = {}
+    with patch_config(**overrides):
+        async with stub_server(SERVER_PORT, [('GET', '/{name}', page)]):
+            checker = CloudStatusChecker(cache_backend=MemoryCacheBackend(), providers=make_registry())
+            try:
+                for source in checker.providers['azure'].sources:
+                    name = source.url.rsplit('/', 1)[1]
+                    results[name] = await checker._fetch_source('azure', source)
+                stats = checker.get_stream_stats()
+            finally:
+                await checker.close()
+    return results, stats
+
+
+def test_early_termination():
+    """La descarga se corta al decidir y se registran los bytes leídos"""
+    results, stats = asyncio.run(run_fetches({'MAX_RETRIES': 1, 'HEDGED_REQUESTS': False}))
+    assert results['healthy']['overall_status'] == 'Operational'
+    assert results['issue']['overall_status'] == 'Issues Detected'
+    assert results['late']['overall_status'] == 'Operational'
+
+    azure = stats['azure']
+    assert azure['fetches'] == 3 and azure['decided'] == 2 and azure['complete'] == 1
+    full = sum(len(page) for page in PAGES.values())
+    assert azure['bytes_read'] < full - len(PAGES['healthy']) // 2, f"Se leyó de más: {azure}"
+    assert azure['bytes_skipped'] > len(PAGES['healthy']) // 2
+    assert azure['mean_decision_seconds'] > 0
+
+
+def test_byte_cap():
+    """Al llegar al límite de bytes se clasifica con lo leído"""
+    results, stats = asyncio.run(run_fetches({'MAX_RETRIES': 1, 'STREAM_MAX_BYTES_PROVIDERS': {'azure': 65536}}))
+    # El indicador operativo de 'late' queda fuera del límite
+    assert results['late']['overall_status'] == 'Operational', "Sin indicadores leídos no hay problemas"
+    assert stats['azure']['truncated'] == 2 and stats['azure']['bytes_read'] < 4 * 65536 + 3 * 16384
+
+
+def test_streaming_disabled_per_provider():
+    """Con <PROVEEDOR>_STREAMING_FETCH=false la página se descarga y parsea completa"""
+    results, stats = asyncio.run(run_fetches({'MAX_RETRIES': 1, 'STREAMING_FETCH_PROVIDERS': {'azure': False}}))
+    assert results['healthy']['overall_status'] == 'Operational'
+    assert results['issue']['overall_status'] == 'Issues Detected'
+    assert stats == {}
+
+
+def main():
+    """Función principal de pruebas"""
+    print("🧪 Probando descargas incrementales...")
+    print("=" * 50)
+    for name, test in (('Clasificación por fragmentos', test_matcher_matches_classifier),
+                       ('Decisión anticipada', test_matcher_decides_early),
+                       ('Corte de la descarga', test_early_termination),
+                       ('Límite de bytes', test_byte_cap),
+                       ('Desactivado por proveedor', test_streaming_disabled_per_provider)):
+        try:
+            test()
+            print(f"   ✅ {name}")
+        except AssertionError as e:
+            print(f"   ❌ {name}: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de las suscripciones y del envío de notificaciones
+"""
+
+import asyncio
+import json
+import sys
+import os
+import tempfile
+import time
+from typing import Dict
+from unittest import mock
+
+# Agregar el directorio actual al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from telegram.error import Forbidden, RetryAfter, TimedOut
+
+import subscriptions
+from subscriptions import ChangeNotifier, SubscriptionStore, diff_snapshots, format_change_message
+
+
+class FakeBot:
+    """Bot que registra los envíos y lanza los errores indicados por chat"""
+
+    def __init__(self, errors=None, delay: float = 0.0):
+        self.errors = {chat_id: list(items) for chat_id, items in (errors or {}).items()}
+        self.delay = delay
+        self.sent = []
+
+    async def send_message(self, chat_id, text, parse_mode=None):
+        await asyncio.sleep(self.delay)
+        pending = self.errors.get(chat_id)
+        if pending:
+            raise pending.pop(0)
+        self.sent.append((chat_id, text, time.monotonic()))
+
+
+async def deliver(notifier: ChangeNotifier, bot: FakeBot, timeout: float = 5.0):
+    """Arrancar el envío y esperar a que no quede nada pendiente"""
+    notifier.start(bot)
+    deadline = time.monotonic() + timeout
+    while notifier._jobs and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    await notifier.stop()
+
+
+def test_store_persistence():
+    """Las suscripciones se guardan y sobreviven a un reinicio"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'subscriptions.json')
+        store = SubscriptionStore(path)
+        assert store.subscribe(1, 'aws') and store.subscribe(1, 'gcp') and store.subscribe(2, 'aws')
+        assert not store.subscribe(1, 'aws'), "Ya estaba suscrito"
+        assert store.unsubscribe(2, 'gcp') == []
+
+        reloaded = SubscriptionStore(path)
+        assert reloaded.subscribers('aws') == [1, 2]
+        assert reloaded.providers_for(1) == ['aws', 'gcp']
+        assert reloaded.unsubscribe(1) == ['aws', 'gcp']
+        assert SubscriptionStore(path).providers_for(1) == []
+
+
+def test_diff_snapshots():
+    """Se detectan los cambios de estado general y por servicio"""
+    previous = {'overall_status': 'Operational', 'services': [
+        {'name': 'EC2', 'status': 'Operational'}, {'name': 'S3', 'status': 'Operational'}]}
+    current = {'overall_status': 'Issues Detected', 'services': [
+        {'name': 'EC2', 'status': 'Degraded'}, {'name': 'S3', 'status': 'Operational'}]}
+    changes = diff_snapshots(previous, current)
+    assert changes == [
+        {'name': None, 'before': 'Operational', 'after': 'Issues Detected'},
+        {'name': 'EC2', 'before': 'Operational', 'after': 'Degraded'}
+    ]
+    assert diff_snapshots(None, current) == []
+    assert diff_snapshots(previous, {'error': True, 'message': 'timeout'}) == []
+
+    message = format_change_message('AWS', changes)
+    assert 'Cambio de estado en AWS' in message
+    assert '🔴 *Estado general:* Operational → Issues Detected' in message
+    assert '🔴 *EC2:* Operational → Degraded' in message
+
+
+def aws_notice(service: str, title: str, status: str) -> Dict:
+    return {'name': title, 'service': service, 'status': status, 'region': 'us-east-1'}
+
+
+def test_diff_added_and_removed():
+    """Un servicio que aparece o desaparece cuenta como cambio frente a Operational"""
+    s3_down = aws_notice('s3', 'Increased error rates', 'Issue')
+    ec2_down = aws_notice('ec2', 'Instance launch failures', 'Issue')
+    previous = {'overall_status': 'Issues Detected', 'services': [s3_down]}
+    current = {'overall_status': 'Issues Detected', 'services': [s3_down, ec2_down]}
+    assert diff_snapshots(previous, current) == [
+        {'name': 'ec2 (us-east-1)', 'before': 'Operational', 'after': 'Issue'}
+    ], "El servicio nuevo afectado no se notificó"
+    assert diff_snapshots(current, previous) == [
+        {'name': 'ec2 (us-east-1)', 'before': 'Issue', 'after': 'Operational'}
+    ], "El servicio que dejó de aparecer no se notificó"
+
+
+def test_diff_resolved_notice():
+    """Un aviso de AWS se sigue por servicio y región aunque cambie su título"""
+    previous = {'overall_status': 'Issues Detected', 'services': [
+        aws_notice('ec2', 'Instance launch failures', 'Issue'),
+        aws_notice('s3', 'Increased error rates', 'Issue')]}
+    current = {'overall_status': 'Issues Detected', 'services': [
+        aws_notice('ec2', '[RESOLVED] Instance launch failures', 'Operational'),
+        aws_notice('s3', 'Increased error rates', 'Issue')]}
+    assert diff_snapshots(previous, current) == [
+        {'name': 'ec2 (us-east-1)', 'before': 'Issue', 'after': 'Operational'}
+    ]
+
+
+def test_diff_components():
+    """Con la lista completa de componentes se comparan todos, no solo los afectados"""
+    previous = {'overall_status': 'Minor Issues',
+                'services': [{'name': 'Compute', 'status': 'Degraded', 'region': 'Global'}],
+                'components': [{'name': 'Compute', 'status': 'Degraded', 'region': 'Global'},
+                               {'name': 'Storage', 'status': 'Operational', 'region': 'Global'}]}
+    current = {'overall_status': 'Minor Issues',
+               'services': [{'name': 'Storage', 'status': 'Degraded', 'region': 'Global'}],
+               'components': [{'name': 'Compute', 'status': 'Operational', 'region': 'Global'},
+                              {'name': 'Storage', 'status': 'Degraded', 'region': 'Global'}]}
+    assert diff_snapshots(previous, current) == [
+        {'name': 'Compute', 'before': 'Degraded', 'after': 'Operational'},
+        {'name': 'Storage', 'before': 'Operational', 'after': 'Degraded'}
+    ]
+
+
+def make_notifier(directory: str, chats=(1, 2, 3), **kwargs) -> ChangeNotifier:
+    store = SubscriptionStore(os.path.join(directory, 'subscriptions.json'))
+    for chat_id in chats:
+        store.subscribe(chat_id, 'aws')
+    return ChangeNotifier(store, os.path.join(directory, 'outbox.json'), **kwargs)
+
+
+async def run_pacing(directory: str):
+    notifier = make_notifier(directory, global_rate=20, per_chat_interval=0.3, batch_size=2)
+    bot = FakeBot()
+    notifier.notify('aws', 'primero')
+    notifier.notify('aws', 'segundo')
+    await deliver(notifier, bot)
+    return bot.sent
+
+
+def test_pacing():
+    """Se respeta el ritmo global y el intervalo entre mensajes a un mismo chat"""
+    with tempfile.TemporaryDirectory() as directory:
+        sent = asyncio.run(run_pacing(directory))
+    assert sorted((chat_id, text) for chat_id, text, _ in sent) == sorted(
+        (chat_id, text) for chat_id in (1, 2, 3) for text in ('primero', 'segundo'))
+    times = [sent_at for _, _, sent_at in sent]
+    assert all(later - earlier >= 0.045 for earlier, later in zip(times, times[1:])), "Ritmo global superado"
+    for chat_id in (1, 2, 3):
+        first, second = [sent_at for chat, _, sent_at in sent if chat == chat_id]
+        assert second - first >= 0.29, f"Chat {chat_id} notificado dos veces seguidas"
+
+
+async def run_errors(directory: str):
+    notifier = make_notifier(directory, global_rate=100, per_chat_interval=0)
+    bot = FakeBot({2: [RetryAfter(0.2), TimedOut()], 3: [Forbidden('bot was blocked by the user')]})
+    notifier.notify('aws', 'primero')
+    notifier.notify('aws', 'segundo')
+    started = time.monotonic()
+    await deliver(notifier, bot)
+    return bot.sent, notifier, time.monotonic() - started
+
+
+def test_telegram_errors():
+    """RetryAfter pausa y reintenta, un error de red se reintenta y Forbidden da de baja el chat"""
+    with mock.patch.object(subscriptions, 'SEND_ERROR_PAUSE', 0.05), tempfile.TemporaryDirectory() as directory:
+        sent, notifier, elapsed = asyncio.run(run_errors(directory))
+    assert sorted((chat_id, text) for chat_id, text, _ in sent) == [
+        (1, 'primero'), (1, 'segundo'), (2, 'primero'), (2, 'segundo')]
+    assert elapsed >= 0.2, "RetryAfter debe pausar el envío"
+    assert notifier.store.subscribers('aws') == [1, 2]
+    assert notifier.stats == {'sent': 4, 'failed': 0, 'retried': 1, 'unsubscribed': 1}
+
+
+async def run_unexpected_error(directory: str):
+    notifier = make_notifier(directory, chats=(1, 2), global_rate=100, per_chat_interval=0)
+    bot = FakeBot({1: [RuntimeError('This HTTPXRequest is not initialized!')]})
+    notifier.notify('aws', 'aviso')
+    await deliver(notifier, bot)
+    return bot.sent
+
+
+def test_unexpected_error_keeps_running():
+    """Un error que no es de Telegram no detiene el envío"""
+    with mock.patch.object(subscriptions, 'SEND_ERROR_PAUSE', 0.05), tempfile.TemporaryDirectory() as directory:
+        sent = asyncio.run(run_unexpected_error(directory))
+    assert sorted(chat_id for chat_id, _, _ in sent) == [1, 2]
+
+
+async def run_resume(directory: str):
+    # Envío interrumpido a mitad de lote: lo ya enviado no se repite
+    notifier = make_notifier(directory, chats=(1, 2, 3, 4), global_rate=100, per_chat_interval=0)
+    first_bot = FakeBot(delay=0.1)
+    notifier.notify('aws', 'aviso')
+    notifier.start(first_bot)
+    await asyncio.sleep(0.15)
+    await notifier.stop()
+    with open(notifier.outbox_path, 'r', encoding='utf-8') as f:
+        outbox = json.load(f)
+
+    resumed = ChangeNotifier(notifier.store, notifier.outbox_path, global_rate=100, per_chat_interval=0)
+    second_bot = FakeBot()
+    await deliver(resumed, second_bot)
+    with open(notifier.outbox_path, 'r', encoding='utf-8') as f:
+        remaining = json.load(f)
+    return first_bot.sent, outbox, second_bot.sent, remaining
+
+
+def test_resume_from_outbox():
+    """Un reinicio continúa el envío con los chats que faltaban"""
+    with tempfile.TemporaryDirectory() as directory:
+        first, outbox, second, remaining = asyncio.run(run_resume(directory))
+    first_chats = [chat_id for chat_id, _, _ in first]
+    assert first_chats == [1], f"Primer envío: {first_chats}"
+    assert [job['chat_ids'] for job in outbox] == [[2, 3, 4]]
+    assert [chat_id for chat_id, _, _ in second] == [2, 3, 4]
+    assert remaining == []
+
+
+def main():
+    """Función principal de pruebas"""
+    print("🧪 Probando suscripciones y notificaciones...")
+    print("=" * 50)
+    for name, test in (('Suscripciones persistentes', test_store_persistence),
+                       ('Comparación de instantáneas', test_diff_snapshots),
+                       ('Servicios nuevos y retirados', test_diff_added_and_removed),
+                       ('Aviso de AWS resuelto', test_diff_resolved_notice),
+                       ('Lista completa de componentes', test_diff_components),
+                       ('Ritmo de envío', test_pacing),
+                       ('Errores de Telegram', test_telegram_errors),
+                       ('Errores inesperados', test_unexpected_error_keeps_running),
+                       ('Reanudación desde el archivo', test_resume_from_outbox)):
+        try:
+            test()
+            print(f"   ✅ {name}")
+        except AssertionError as e:
+            print(f"   ❌ {name}: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de los límites de pulsaciones por usuario y chat y de la fusión de botones
+"""
+
+import asyncio
+import sys
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+# Agregar el directorio actual al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from statistics import BotStatistics
+from stats_storage import JsonStatsStorage, SQLiteStatsStorage
+from testutils import patch_config
+from metrics import HANDLER_SECONDS
+from throttle import CallbackDebouncer, UpdateThrottle
+
+
+def test_token_buckets():
+    """Cada usuario y cada chat tienen su ráfaga y recuperan fichas con el tiempo"""
+    throttle = UpdateThrottle(user_rate=20, user_burst=2, chat_rate=0.01, chat_burst=3)
+    assert throttle.allow(1, 100) and throttle.allow(1, 100)
+    assert not throttle.allow(1, 100), "Ráfaga del usuario agotada"
+    # Otro usuario en el mismo chat: solo queda una ficha del chat
+    assert throttle.allow(2, 100)
+    assert not throttle.allow(3, 100), "Ráfaga del chat agotada"
+    assert throttle.allow(3, 200), "Los chats no comparten límite"
+    assert throttle.stats == {'allowed': 4, 'rejected_user': 1, 'rejected_chat': 1}
+
+    time.sleep(0.1)
+    assert throttle.allow(1, 300), "El usuario recupera fichas"
+
+    unlimited = UpdateThrottle(user_rate=0, chat_rate=0)
+    assert all(unlimited.allow(1, 1) for _ in range(100))
+
+
+def test_idle_buckets_purged():
+    """Los cubos de usuarios y chats inactivos se descartan"""
+    throttle = UpdateThrottle(user_rate=100, user_burst=1, chat_rate=100, chat_burst=1, purge_interval=0)
+    for user_id in range(50):
+        throttle.allow(user_id, user_id)
+    time.sleep(0.05)
+    throttle.allow(999, 999)
+    assert len(throttle._buckets['user']) == 1 and len(throttle._buckets['chat']) == 1
+
+
+async def run_debounced(window: float):
+    runs, done, merged = [], [], []
+    debouncer = CallbackDebouncer(window, on_merge=merged.append)
+
+    def press(data: str):
+        async def run():
+            runs.append(data)
+            await asyncio.sleep(0.05)
+            done.append(data)
+        return debouncer.submit(('chat', 1), data, run)
+
+    # Doble toque y cambio de botón mientras se atiende el primero
+    handled = await asyncio.gather(press('status_all'), press('status_all'),
+                                   press('status_aws'), press('status_gcp'))
+    # La pulsación guardada se atiende después, sin retener a la primera
+    deferred_pending = done == ['status_all']
+    # Repetir el último botón dentro de la ventana no vuelve a editar el mensaje
+    repeated = await press('status_gcp')
+    await debouncer.close()
+    await asyncio.sleep(window)
+    after_window = await press('status_gcp')
+    await debouncer.close()
+    return handled, deferred_pending, repeated, after_window, runs, merged, debouncer.stats
+
+
+def test_debouncer():
+    """Las pulsaciones sobre un mismo mensaje se fusionan en una sola edición"""
+    handled, deferred_pending, repeated, after_window, runs, merged, stats = asyncio.run(run_debounced(0.2))
+    assert handled == [True, False, False, False]
+    assert deferred_pending, "La primera pulsación esperó a la aplazada"
+    assert runs == ['status_all', 'status_gcp', 'status_gcp'], f"Ediciones: {runs}"
+    assert not repeated and after_window
+    assert merged == ['status_all', 'status_aws', 'status_gcp']
+    assert stats == {'handled': 3, 'merged': 3}
+
+
+async def run_failed_press():
+    runs, merged = [], []
+    debouncer = CallbackDebouncer(1.0, on_merge=merged.append)
+
+    async def failing():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("fallo al editar")
+
+    async def run():
+        runs.append('status_gcp')
+
+    first = asyncio.create_task(debouncer.submit(('chat', 1), 'status_all', failing))
+    await asyncio.sleep(0)
+    queued = await debouncer.submit(('chat', 1), 'status_gcp', run)
+    try:
+        await first
+        error = None
+    except RuntimeError as exc:
+        error = exc
+    await debouncer.close()
+    return queued, error, runs, merged, debouncer.stats
+
+
+def test_failed_press_merges_queued():
+    """Si falla la pulsación en curso, la guardada no se pierde sin contarse"""
+    queued, error, runs, merged, stats = asyncio.run(run_failed_press())
+    assert queued is False
+    assert error is not None, "El error de la pulsación en curso debe propagarse"
+    assert runs == []
+    assert merged == ['status_gcp']
+    assert stats == {'handled': 1, 'merged': 1}
+
+
+class FakeQuery:
+    """Callback de Telegram que registra las respuestas y ediciones"""
+
+    def __init__(self, data: str, message_id: int):
+        self.data = data
+        self.message = SimpleNamespace(chat_id=42, message_id=message_id)
+        self.from_user = SimpleNamespace(id=7)
+        self.answers = []
+
+    async def answer(self, text=None, **kwargs):
+        self.answers.append(text)
+
+
+def button_update(update_id: int, data: str, message_id: int = 1):
+    return SimpleNamespace(
+        update_id=update_id,
+        effective_chat=SimpleNamespace(id=42),
+        effective_user=SimpleNamespace(id=7),
+        callback_query=FakeQuery(data, message_id),
+        message=None
+    )
+
+
+async def run_bot_buttons(stats_file: str):
+    from telegram_bot import CloudStatusBot, THROTTLED_MESSAGE
+
+    bot = CloudStatusBot()
+    bot.stats = BotStatistics(stats_file, storage=JsonStatsStorage(stats_file))
+    edits = []
+
+    async def send_status(update, context, provider, is_callback=False):
+        edits.append(provider)
+        await asyncio.sleep(0.05)
+
+    bot._send_status_message = send_status
+    handler = bot._timed(bot.button_callback)
+    updates = [button_update(1, 'status_all'), button_update(2, 'status_all'), button_update(3, 'status_gcp')]
+    await asyncio.gather(*(handler(update, None) for update in updates))
+    await bot.debouncer.close()
+    # La ráfaga del usuario (3) está agotada
+    rejected = button_update(4, 'status_aws', message_id=2)
+    await handler(rejected, None)
+    await bot.status_checker.close()
+    handler_counts = {label: HANDLER_SECONDS.count(label)
+                      for label in ('callback:status_all', 'callback:status_gcp')}
+    return edits, bot.stats, rejected.callback_query.answers, THROTTLED_MESSAGE, handler_counts
+
+
+def test_bot_buttons():
+    """El bot fusiona el doble toque, rechaza el exceso y lo cuenta en las estadísticas"""
+    with patch_config(THROTTLE_USER_RATE=0.01, THROTTLE_USER_BURST=3, CALLBACK_DEBOUNCE_WINDOW=1.0), \
+            tempfile.TemporaryDirectory() as directory:
+        before = {label: HANDLER_SECONDS.count(label)
+                  for label in ('callback:status_all', 'callback:status_gcp')}
+        edits, stats, answers, throttled_message, handler_counts = asyncio.run(
+            run_bot_buttons(os.path.join(directory, 'stats.json'))
+        )
+
+    assert edits == ['all', 'gcp'], f"Ediciones: {edits}"
+    # La edición aplazada se mide con su propio botón, aparte de la actualización que la guardó
+    assert handler_counts['callback:status_gcp'] - before['callback:status_gcp'] == 2
+    assert handler_counts['callback:status_all'] - before['callback:status_all'] == 2
+    assert answers == [throttled_message]
+    assert stats.stats['throttled'] == {'rejected': 1, 'merged': 1}
+    assert stats.stats['commands_by_type'] == {'button_all': 1, 'button_gcp': 1}, "Solo cuentan las atendidas"
+    assert '1 rechazadas, 1 fusionadas' in stats.get_stats_summary()
+
+
+def test_sqlite_totals():
+    """Los totales de pulsaciones limitadas se conservan en SQLite"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'stats.db')
+        stats = BotStatistics(storage=SQLiteStatsStorage(path))
+        stats.record_throttled('rejected', 'status', 7)
+        stats.record_throttled('merged', 'callback:status_all')
+        stats.record_throttled('merged', 'callback:status_all')
+        stats.storage.close()
+
+        reloaded = BotStatistics(storage=SQLiteStatsStorage(path))
+        assert reloaded.stats['throttled'] == {'rejected': 1, 'merged': 2}
+        reloaded.storage.close()
+
+
+def main():
+    """Función principal de pruebas"""
+    print("🧪 Probando límites de pulsaciones...")
+    print("=" * 50)
+    for name, test in (('Cubos por usuario y chat', test_token_buckets),
+                       ('Cubos inactivos', test_idle_buckets_purged),
+                       ('Fusión de pulsaciones', test_debouncer),
+                       ('Pulsación en curso fallida', test_failed_press_merges_queued),
+                       ('Botones del bot', test_bot_buttons),
+                       ('Totales en SQLite', test_sqlite_totals)):
+        try:
+            test()
+            print(f"   ✅ {name}")
+        except AssertionError as e:
+            print(f"   ❌ {name}: {e}")
+
+
+if __name__ == "__main__":
+    main()
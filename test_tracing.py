@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Script de prueba de las trazas por actualización
+"""
+
+import asyncio
+import json
+import logging
+import sys
+import os
+
+# Agregar el directorio actual al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import tracing
+from tracing import span, start_trace, to_otlp
+
+
+class RecordingExporter:
+    """Exportador que guarda las trazas en memoria"""
+
+    def __init__(self):
+        self.traces = []
+
+    def export(self, trace):
+        self.traces.append(trace)
+
+
+class LogCapture(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+async def handle_update():
+    """Actualización simulada con un paso lento"""
+    with start_trace('update /status', handler='/status', update_id=1):
+        with span('loading_message'):
+            await asyncio.sleep(0.01)
+        with span('status.get', provider='aws'):
+            with span('http.attempt', attempt=1) as attempt_span:
+                await asyncio.sleep(0.2)
+                attempt_span.set('status', 200)
+        with span('edit_message'):
+            pass
+
+
+def run_with_settings(slow_threshold):
+    exporter = RecordingExporter()
+    capture = LogCapture()
+    original = (tracing.settings.enabled, tracing.settings.slow_threshold, tracing.settings.exporter)
+    tracing.configure(True, slow_threshold, exporter)
+    tracing.logger.addHandler(capture)
+    try:
+        asyncio.run(handle_update())
+    finally:
+        tracing.logger.removeHandler(capture)
+        tracing.configure(*original)
+    return exporter.traces, capture.messages
+
+
+def test_slow_update_breakdown():
+    """Una actualización lenta se registra con el desglose de sus pasos"""
+    traces, messages = run_with_settings(slow_threshold=0.1)
+    assert len(traces) == 1 and len(messages) == 1, f"Trazas: {len(traces)}, logs: {messages}"
+
+    report = json.loads(messages[0].split(': ', 1)[1])
+    steps = {step['span']: step for step in report['spans']}
+    assert list(steps) == ['loading_message', 'status.get', 'http.attempt', 'edit_message']
+    assert steps['http.attempt']['depth'] == 2
+    assert steps['http.attempt']['attributes'] == {'attempt': 1, 'status': 200}
+    assert steps['http.attempt']['duration_ms'] >= 200
+    assert report['attributes']['handler'] == '/status'
+
+
+def test_fast_update_not_logged():
+    """Por debajo del umbral solo se exporta la traza"""
+    traces, messages = run_with_settings(slow_threshold=5)
+    assert len(traces) == 1 and messages == []
+
+
+def test_otlp_format():
+    """La traza exportada conserva la jerarquía de spans"""
+    traces, _ = run_with_settings(slow_threshold=5)
+    spans = to_otlp(traces[0])['resourceSpans'][0]['scopeSpans'][0]['spans']
+    by_name = {item['name']: item for item in spans}
+
+    root = by_name['update /status']
+    assert 'parentSpanId' not in root
+    assert by_name['status.get']['parentSpanId'] == root['spanId']
+    assert by_name['http.attempt']['parentSpanId'] == by_name['status.get']['spanId']
+    assert {item['traceId'] for item in spans} == {root['traceId']}
+    assert int(root['endTimeUnixNano']) > int(root['startTimeUnixNano'])
+
+
+def test_span_outside_trace():
+    """Fuera de una traza los spans no hacen nada"""
+    with span('parse') as item:
+        item.set('bytes', 10)
+    assert item is tracing.NULL_SPAN
+
+
+def main():
+    """Función principal de pruebas"""
+    print("🧪 Probando trazas...")
+    print("=" * 50)
+    for name, test in (('Desglose de actualización lenta', test_slow_update_breakdown),
+                       ('Actualización rápida', test_fast_update_not_logged),
+                       ('Formato OTLP', test_otlp_format),
+                       ('Span fuera de traza', test_span_outside_trace)):
+        try:
+            test()
+            print(f"   ✅ {name}")
+        except AssertionError as e:
+            print(f"   ❌ {name}: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Script de prueba del modo webhook contra un servidor de Telegram falso local
+"""
+
+import asyncio
+import sys
+import os
+import tempfile
+
+# Agregar el directorio actual al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import aiohttp
+from aiohttp import web
+from config import Config
+from testutils import patch_config, stub_server
+
+FAKE_API_PORT = 18081
+WEBHOOK_PORT = 18443
+METRICS_PORT = 19100
+SECRET = 'secreto-de-prueba'
+
+START_UPDATE = {
+    'update_id': 1,
+    'message': {
+        'message_id': 1,
+        'date': 0,
+        'chat': {'id': 42, 'type': 'private'},
+        'from': {'id': 7, 'is_bot': False, 'first_name': 'Prueba'},
+        'text': '/start',
+        'entities': [{'type': 'bot_command', 'offset': 0, 'length': 6}]
+    }
+}
+
+
+class FakeTelegramApi:
+    """Handler que imita los métodos de la Bot API usados por el bot"""
+
+    def __init__(self):
+        self.calls = []
+        self.sent_messages = []
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info['method']
+        params = dict(await request.post()) if request.content_type != 'application/json' else await request.json()
+        self.calls.append((method, params))
+
+        if method == 'getMe':
+            result = {'id': 1, 'is_bot': True, 'first_name': 'Fake', 'username': 'fake_bot'}
+        elif method == 'sendMessage':
+            self.sent_messages.append(params)
+            result = {
+                'message_id': len(self.sent_messages) + 100,
+                'date': 0,
+                'chat': {'id': int(params['chat_id']), 'type': 'private'},
+                'text': params.get('text', '')
+            }
+        else:
+            result = True
+        return web.json_response({'ok': True, 'result': result})
+
+
+def config_overrides(directory: str) -> dict:
+    """Configuración que apunta el bot al servidor falso y activa el modo webhook"""
+    return {
+        'TELEGRAM_BOT_TOKEN': '123:fake',
+        'TELEGRAM_BASE_URL': f'http://127.0.0.1:{FAKE_API_PORT}/bot',
+        'BOT_MODE': 'webhook',
+        'WEBHOOK_URL': f'https://example.invalid/{Config.WEBHOOK_PATH}',
+        'WEBHOOK_LISTEN': '127.0.0.1',
+        'WEBHOOK_PORT': WEBHOOK_PORT,
+        'WEBHOOK_SECRET_TOKEN': SECRET,
+        'BACKGROUND_REFRESH': False,
+        'HTTP_WARMUP': False,
+        'METRICS_ENABLED': True,
+        'METRICS_LISTEN': '127.0.0.1',
+        'METRICS_PORT': METRICS_PORT,
+        'ENABLE_STATISTICS': False,
+        # Los archivos del bot van al directorio temporal, no al del repositorio
+        'SUBSCRIPTIONS_FILE': os.path.join(directory, 'subscriptions.json'),
+        'NOTIFY_OUTBOX_FILE': os.path.join(directory, 'notify_outbox.json'),
+        'SNAPSHOT_FILE': os.path.join(directory, 'snapshots.bin')
+    }
+
+
+async def run_webhook_checks():
+    """Arrancar el bot en modo webhook y enviarle actualizaciones"""
+    fake_api = FakeTelegramApi()
+    async with stub_server(FAKE_API_PORT, [('POST', '/bot{token}/{method}', fake_api.handle)]):
+        results = await send_updates(fake_api)
+
+    set_webhook = [params for method, params in fake_api.calls if method == 'setWebhook']
+    results['set_webhook'] = set_webhook[0] if set_webhook else None
+    results['sent_messages'] = fake_api.sent_messages
+    return results
+
+
+async def send_updates(fake_api: FakeTelegramApi) -> dict:
+    """Arrancar el bot contra la API falsa y enviarle actualizaciones por el webhook"""
+    from telegram_bot import CloudStatusBot
+
+    bot = CloudStatusBot()
+    bot.build_application()
+    stop_event = asyncio.Event()
+    bot_task = asyncio.create_task(bot.run_webhook(stop_event))
+
+    webhook_url = f'http://127.0.0.1:{WEBHOOK_PORT}/{Config.WEBHOOK_PATH}'
+    results = {}
+    try:
+        async with aiohttp.ClientSession() as session:
+            # Esperar a que el servidor del webhook esté escuchando
+            for _ in range(50):
+                if any(method == 'setWebhook' for method, _ in fake_api.calls):
+                    break
+                await asyncio.sleep(0.1)
+
+            async with session.post(webhook_url, json=START_UPDATE,
+                                    headers={'X-Telegram-Bot-Api-Secret-Token': 'incorrecto'}) as response:
+                results['wrong_secret'] = response.status
+
+            async with session.post(webhook_url, json={'update_id': 2, 'poll': {}},
+                                    headers={'X-Telegram-Bot-Api-Secret-Token': SECRET}) as response:
+                results['ignored_update'] = response.status
+
+            async with session.post(webhook_url, json=START_UPDATE,
+                                    headers={'X-Telegram-Bot-Api-Secret-Token': SECRET}) as response:
+                results['valid_update'] = response.status
+
+            for _ in range(50):
+                if fake_api.sent_messages:
+                    break
+                await asyncio.sleep(0.1)
+            
+            async with session.get(f'http://127.0.0.1:{METRICS_PORT}/metrics') as response:
+                results['metrics'] = await response.text()
+    finally:
+        stop_event.set()
+        await bot_task
+    return results
+
+
+def test_webhook():
+    """Probar validación del token secreto, filtrado y entrega de actualizaciones"""
+    with tempfile.TemporaryDirectory() as directory, patch_config(**config_overrides(directory)):
+        results = asyncio.run(run_webhook_checks())
+
+    assert results['set_webhook'] is not None, "No se registró el webhook"
+    assert results['set_webhook']['secret_token'] == SECRET
+    assert 'message' in results['set_webhook']['allowed_updates']
+    assert results['wrong_secret'] == 403
+    assert results['ignored_update'] == 200
+    assert results['valid_update'] == 200
+    assert len(results['sent_messages']) == 1, "El bot no respondió a /start"
+    assert 'Bot de Estado de Servicios Cloud' in results['sent_messages'][0]['text']
+    assert 'cloudstatus_handler_seconds_count{handler="start"} 1' in results['metrics']
+    assert 'cloudstatus_telegram_api_seconds_count{method="sendMessage"} 1' in results['metrics']
+
+
+def main():
+    """Función principal de pruebas"""
+    print("🧪 Probando modo webhook con servidor de Telegram falso...")
+    print("=" * 50)
+    try:
+        test_webhook()
+        print("✅ Webhook validado correctamente")
+    except AssertionError as e:
+        print(f"❌ Error en la prueba del webhook: {e}")
+
+
+if __name__ == "__main__":
+    main()
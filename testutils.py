@@ -0,0 +1,34 @@
+"""
+Utilidades compartidas por los scripts de prueba
+"""
+
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Iterable, Tuple
+from unittest import mock
+
+from aiohttp import web
+
+from config import Config
+
+
+def patch_config(**overrides):
+    """Cambiar atributos de Config y restaurarlos al salir
+
+    Se usa como `with patch_config(MAX_RETRIES=1): ...` o como decorador.
+    """
+    return mock.patch.multiple(Config, **overrides)
+
+
+@asynccontextmanager
+async def stub_server(port: int, routes: Iterable[Tuple[str, str, Callable[[web.Request], Awaitable]]]):
+    """Servidor HTTP local en 127.0.0.1:`port` con rutas (método, ruta, handler)"""
+    app = web.Application()
+    for method, path, handler in routes:
+        app.router.add_route(method, path, handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, '127.0.0.1', port).start()
+        yield runner
+    finally:
+        await runner.cleanup()
@@ -0,0 +1,208 @@
+"""
+Límites de comandos y botones por usuario y por chat
+
+`UpdateThrottle` aplica un cubo de fichas (token bucket) por usuario y otro
+por chat: cada acción gasta una ficha de ambos y las fichas se recuperan a
+un ritmo fijo, con una ráfaga máxima. `CallbackDebouncer` fusiona las
+pulsaciones repetidas sobre un mismo mensaje para que se edite una sola vez.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Cubo de fichas: `rate` fichas por segundo hasta un máximo de `burst`"""
+
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate: float, burst: int, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self, now: float) -> bool:
+        """Si queda al menos una ficha"""
+        self._refill(now)
+        return self.tokens >= 1
+
+    def take(self):
+        """Gastar una ficha (tras comprobar `available`)"""
+        self.tokens -= 1
+
+    def full(self, now: float) -> bool:
+        """Si el cubo ya se habría llenado: no aporta nada y se puede descartar"""
+        return self.tokens + (now - self.updated) * self.rate >= self.burst
+
+
+class UpdateThrottle:
+    """Límite de acciones por usuario y por chat
+
+    Una acción se admite si quedan fichas en el cubo del usuario y en el del
+    chat, y entonces gasta una de cada uno. Un ritmo de 0 desactiva ese
+    límite. Los cubos llenos se descartan cada `purge_interval` segundos.
+    """
+
+    def __init__(self, user_rate: float = 0.5, user_burst: int = 5,
+                 chat_rate: float = 1.0, chat_burst: int = 10, purge_interval: float = 60.0):
+        self.limits = {'user': (user_rate, user_burst), 'chat': (chat_rate, chat_burst)}
+        self._buckets: Dict[str, Dict[Hashable, TokenBucket]] = {'user': {}, 'chat': {}}
+        self.purge_interval = purge_interval
+        self._next_purge = time.monotonic() + purge_interval
+        # Acciones admitidas y rechazadas (por el límite que se superó)
+        self.stats = {'allowed': 0, 'rejected_user': 0, 'rejected_chat': 0}
+
+    def _bucket(self, kind: str, key: Hashable, now: float) -> Optional[TokenBucket]:
+        rate, burst = self.limits[kind]
+        if key is None or rate <= 0:
+            return None
+        bucket = self._buckets[kind].get(key)
+        if bucket is None:
+            bucket = self._buckets[kind][key] = TokenBucket(rate, burst, now)
+        return bucket
+
+    def allow(self, user_id: Optional[int], chat_id: Optional[int]) -> bool:
+        """Admitir o rechazar una acción del usuario en el chat"""
+        now = time.monotonic()
+        if now >= self._next_purge:
+            self._purge(now)
+        buckets = {kind: self._bucket(kind, key, now) for kind, key in (('user', user_id), ('chat', chat_id))}
+        for kind, bucket in buckets.items():
+            if bucket is not None and not bucket.available(now):
+                self.stats[f'rejected_{kind}'] += 1
+                return False
+        for bucket in buckets.values():
+            if bucket is not None:
+                bucket.take()
+        self.stats['allowed'] += 1
+        return True
+
+    def _purge(self, now: float):
+        """Descartar los cubos llenos (usuarios y chats inactivos)"""
+        for buckets in self._buckets.values():
+            for key in [key for key, bucket in buckets.items() if bucket.full(now)]:
+                del buckets[key]
+        self._next_purge = now + self.purge_interval
+
+
+class _MessageSlot:
+    """Estado de las pulsaciones sobre un mensaje"""
+
+    __slots__ = ('data', 'running', 'pending', 'finished')
+
+    def __init__(self, data: str):
+        self.data = data
+        self.running = True
+        self.pending = None
+        self.finished = 0.0
+
+
+class CallbackDebouncer:
+    """Fusión de las pulsaciones repetidas sobre un mismo mensaje
+
+    Mientras se atiende una pulsación, las siguientes sobre el mismo mensaje
+    no se atienden en paralelo: se guarda solo la última y, al terminar, se
+    atiende en una tarea aparte si es un botón distinto del que se acaba de
+    mostrar. Repetir el mismo botón dentro de `window` segundos tras terminar
+    tampoco vuelve a editar el mensaje. Cada pulsación descartada se notifica
+    a `on_merge` con su dato de botón.
+    """
+
+    def __init__(self, window: float = 1.0, on_merge: Optional[Callable[[str], None]] = None):
+        self.window = window
+        self.on_merge = on_merge
+        self._slots: Dict[Hashable, _MessageSlot] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats = {'handled': 0, 'merged': 0}
+
+    def _merge(self, data: str):
+        self.stats['merged'] += 1
+        if self.on_merge is not None:
+            self.on_merge(data)
+
+    async def submit(self, key: Optional[Hashable], data: str, run: Callable[[], Awaitable]) -> bool:
+        """Atender una pulsación o fusionarla con otra; devuelve si se atendió ahora
+
+        `key` identifica el mensaje (None = sin fusión) y `run` lo edita.
+        Una pulsación guardada para después devuelve False, pero se atiende
+        al terminar la que está en curso, fuera de la tarea de esta. Si la
+        pulsación en curso falla, la guardada cuenta como fusionada.
+        """
+        if key is None:
+            self.stats['handled'] += 1
+            await run()
+            return True
+
+        now = time.monotonic()
+        slot = self._slots.get(key)
+        if slot is not None and slot.running:
+            if slot.pending is not None:
+                # La pulsación guardada queda sustituida por la nueva
+                self._merge(slot.pending[0])
+                slot.pending = None
+            if data == slot.data:
+                self._merge(data)
+            else:
+                slot.pending = (data, run)
+            return False
+        if slot is not None and data == slot.data and now - slot.finished < self.window:
+            self._merge(data)
+            return False
+
+        self._purge(now)
+        slot = self._slots[key] = _MessageSlot(data)
+        self.stats['handled'] += 1
+        try:
+            await run()
+        except BaseException:
+            self._finish(slot)
+            raise
+        if slot.pending is None:
+            self._finish(slot)
+        else:
+            # Quien pulsó primero no espera a las pulsaciones guardadas
+            task = asyncio.create_task(self._drain(slot))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _drain(self, slot: _MessageSlot):
+        """Atender las pulsaciones guardadas de un mensaje hasta que no quede ninguna"""
+        try:
+            while slot.pending is not None:
+                slot.data, run = slot.pending
+                slot.pending = None
+                self.stats['handled'] += 1
+                await run()
+        except Exception:
+            logger.exception("Error atendiendo una pulsación aplazada")
+        finally:
+            self._finish(slot)
+
+    def _finish(self, slot: _MessageSlot):
+        """Dar por terminado un mensaje; la pulsación aún guardada cuenta como fusionada"""
+        if slot.pending is not None:
+            self._merge(slot.pending[0])
+            slot.pending = None
+        slot.running = False
+        slot.finished = time.monotonic()
+
+    async def close(self):
+        """Esperar a que terminen las pulsaciones aplazadas en curso"""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _purge(self, now: float):
+        """Olvidar los mensajes cuya ventana ya terminó"""
+        for key in [key for key, slot in self._slots.items()
+                    if not slot.running and now - slot.finished >= self.window]:
+            del self._slots[key]
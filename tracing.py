@@ -0,0 +1,283 @@
+"""
+Trazas ligeras por actualización de Telegram
+
+Cada actualización abre una traza raíz y los pasos relevantes (mensaje de
+carga, consultas a proveedores, cada intento HTTP, análisis, renderizado y
+edición final) se registran como spans hijos mediante `span()`. El span
+actual viaja en una ContextVar, de modo que las tareas creadas durante la
+actualización heredan la traza. Fuera de una traza `span()` no hace nada.
+
+Al terminar, si la actualización superó el umbral se registra en el log un
+desglose estructurado, y la traza se puede exportar en formato OTLP/JSON a
+un archivo o a un colector OpenTelemetry por HTTP.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Nombre del servicio en las trazas exportadas
+SERVICE_NAME = 'cloudstatusbot'
+
+_current_span: ContextVar[Optional['Span']] = ContextVar('current_span', default=None)
+
+
+class Trace:
+    """Conjunto de spans de una actualización"""
+
+    def __init__(self):
+        self.trace_id = f"{random.getrandbits(128):032x}"
+        self.spans: List['Span'] = []
+        self.finished = False
+
+
+class Span:
+    """Paso medido dentro de una traza"""
+
+    __slots__ = ('trace', 'name', 'span_id', 'parent_id', 'attributes', 'start', 'start_ns',
+                 'duration', 'error', '_token')
+
+    def __init__(self, trace: Trace, name: str, parent_id: Optional[str], attributes: Dict):
+        self.trace = trace
+        self.name = name
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start = 0.0
+        self.start_ns = 0
+        self.duration = 0.0
+        self.error = None
+        self._token = None
+
+    def set(self, key: str, value):
+        """Añadir un atributo al span"""
+        self.attributes[key] = value
+
+    def __enter__(self):
+        self.start_ns = time.time_ns()
+        self.start = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        _current_span.reset(self._token)
+        if exc_type is not None and not issubclass(exc_type, asyncio.CancelledError):
+            self.error = f"{exc_type.__name__}: {exc}"
+        # Los spans que terminan después que su traza (refrescos lanzados en
+        # segundo plano) se descartan
+        if not self.trace.finished:
+            self.trace.spans.append(self)
+            if self.parent_id is None:
+                _finish_trace(self)
+        return False
+
+
+class _NullSpan:
+    """Span vacío usado fuera de una traza"""
+
+    def set(self, key: str, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class TracingSettings:
+    """Configuración global de las trazas"""
+
+    def __init__(self):
+        self.enabled = False
+        self.slow_threshold = 5.0
+        self.exporter = None
+
+
+settings = TracingSettings()
+
+
+def configure(enabled: bool, slow_threshold: float, exporter=None):
+    """Activar las trazas con un umbral de lentitud y un exportador opcional"""
+    settings.enabled = enabled
+    settings.slow_threshold = slow_threshold
+    settings.exporter = exporter
+
+
+def start_trace(name: str, **attributes):
+    """Abrir la traza raíz de una actualización"""
+    if not settings.enabled:
+        return NULL_SPAN
+    return Span(Trace(), name, None, attributes)
+
+
+def span(name: str, **attributes):
+    """Abrir un span hijo del span actual (no hace nada fuera de una traza)"""
+    parent = _current_span.get()
+    if parent is None:
+        return NULL_SPAN
+    return Span(parent.trace, name, parent.span_id, attributes)
+
+
+def _finish_trace(root: Span):
+    """Cerrar la traza: desglose en el log si fue lenta y exportación"""
+    trace = root.trace
+    trace.finished = True
+    if root.duration >= settings.slow_threshold:
+        logger.warning(f"Actualización lenta ({root.duration:.2f}s): "
+                       f"{json.dumps(breakdown(root), ensure_ascii=False)}")
+    if settings.exporter is not None:
+        settings.exporter.export(trace)
+
+
+def breakdown(root: Span) -> Dict:
+    """Desglose de una traza: cada span con su inicio relativo y su duración"""
+    depths = {root.span_id: 0}
+    steps = []
+    for item in sorted(root.trace.spans, key=lambda s: s.start):
+        depth = depths[item.span_id] = depths.get(item.parent_id, 0) + 1 if item.parent_id else 0
+        if item is root:
+            continue
+        step = {
+            'span': item.name,
+            'depth': depth,
+            'offset_ms': round((item.start - root.start) * 1000, 1),
+            'duration_ms': round(item.duration * 1000, 1)
+        }
+        if item.attributes:
+            step['attributes'] = item.attributes
+        if item.error:
+            step['error'] = item.error
+        steps.append(step)
+    return {
+        'trace_id': root.trace.trace_id,
+        'name': root.name,
+        'duration_ms': round(root.duration * 1000, 1),
+        'attributes': root.attributes,
+        'spans': steps
+    }
+
+
+def _otlp_value(value) -> Dict:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def to_otlp(trace: Trace) -> Dict:
+    """Convertir una traza al formato OTLP/JSON de OpenTelemetry"""
+    spans = []
+    for item in trace.spans:
+        otlp_span = {
+            'traceId': trace.trace_id,
+            'spanId': item.span_id,
+            'name': item.name,
+            'kind': 1,
+            'startTimeUnixNano': str(item.start_ns),
+            'endTimeUnixNano': str(item.start_ns + int(item.duration * 1e9)),
+            'attributes': [{'key': key, 'value': _otlp_value(value)} for key, value in item.attributes.items()],
+            'status': {'code': 2, 'message': item.error} if item.error else {'code': 1}
+        }
+        if item.parent_id:
+            otlp_span['parentSpanId'] = item.parent_id
+        spans.append(otlp_span)
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': SERVICE_NAME}}]},
+            'scopeSpans': [{'scope': {'name': SERVICE_NAME}, 'spans': spans}]
+        }]
+    }
+
+
+class TraceExporter:
+    """Exportador de trazas en segundo plano"""
+
+    def __init__(self):
+        self._tasks = set()
+
+    def export(self, trace: Trace):
+        """Programar la exportación de una traza sin bloquear la actualización"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._export(to_otlp(trace)))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _export(self, payload: Dict):
+        try:
+            await self._send(payload)
+        except Exception as e:
+            logger.warning(f"No se pudo exportar una traza: {e}")
+
+    async def _send(self, payload: Dict):
+        raise NotImplementedError
+
+    async def close(self):
+        """Esperar a las exportaciones pendientes"""
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
+class FileTraceExporter(TraceExporter):
+    """Añade cada traza como una línea OTLP/JSON a un archivo"""
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+
+    def _append(self, line: str):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+    async def _send(self, payload: Dict):
+        line = json.dumps(payload, ensure_ascii=False)
+        await asyncio.get_running_loop().run_in_executor(None, self._append, line)
+
+
+class OtlpHttpTraceExporter(TraceExporter):
+    """Envía cada traza a un colector OpenTelemetry (OTLP/HTTP con JSON)"""
+
+    def __init__(self, endpoint: str, timeout: float = 5):
+        super().__init__()
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self._session = None
+
+    async def _send(self, payload: Dict):
+        import aiohttp
+
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        async with self._session.post(self.endpoint, json=payload) as response:
+            if response.status >= 300:
+                raise RuntimeError(f"HTTP {response.status} del colector")
+
+    async def close(self):
+        await super().close()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+def create_exporter(kind: str, path: str = None, endpoint: str = None) -> Optional[TraceExporter]:
+    """Crear el exportador configurado: 'file', 'otlp' o ninguno"""
+    if kind == 'file':
+        return FileTraceExporter(path)
+    if kind == 'otlp':
+        return OtlpHttpTraceExporter(endpoint)
+    return None
@@ -0,0 +1,96 @@
+"""
+Servidor de webhook para recibir actualizaciones de Telegram
+"""
+
+import asyncio
+import hmac
+import logging
+from typing import Optional
+
+from aiohttp import web
+from telegram import Update
+from telegram.ext import Application
+
+logger = logging.getLogger(__name__)
+
+# Cabecera con la que Telegram envía el token secreto del webhook
+SECRET_TOKEN_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+
+class WebhookServer:
+    """Servidor HTTP propio que entrega las actualizaciones a la aplicación
+
+    Valida el token secreto, limita el tamaño del cuerpo y el número de
+    peticiones recibiéndose a la vez (por encima del límite responde 503 para
+    que Telegram reintente) y descarta los tipos de actualización no admitidos.
+    `max_intake` solo cubre la recepción (leer el cuerpo, validarlo y
+    encolarlo): cuántas actualizaciones atienden los handlers a la vez lo
+    decide la aplicación (`concurrent_updates`).
+    """
+
+    def __init__(self, application: Application, path: str, listen: str = '0.0.0.0', port: int = 8443,
+                 secret_token: Optional[str] = None, allowed_updates: Optional[list] = None,
+                 max_intake: int = 100, max_body_size: int = 1024 * 1024):
+        self.application = application
+        self.path = '/' + path.lstrip('/')
+        self.listen = listen
+        self.port = port
+        self.secret_token = secret_token
+        self.allowed_updates = set(allowed_updates or [])
+        self.max_intake = max_intake
+        self.max_body_size = max_body_size
+        self._intake = asyncio.Semaphore(max_intake)
+        self._runner = None
+        self.stats = {'accepted': 0, 'rejected_secret': 0, 'rejected_busy': 0, 'ignored': 0, 'invalid': 0}
+
+    async def start(self):
+        """Arrancar el servidor HTTP"""
+        app = web.Application(client_max_size=self.max_body_size)
+        app.router.add_post(self.path, self._handle_update)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.listen, self.port)
+        await site.start()
+        logger.info(f"Webhook escuchando en {self.listen}:{self.port}{self.path}")
+
+    async def stop(self):
+        """Detener el servidor HTTP"""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle_update(self, request: web.Request) -> web.Response:
+        """Validar una actualización y encolarla para los handlers"""
+        if self.secret_token is not None:
+            received = request.headers.get(SECRET_TOKEN_HEADER, '')
+            if not hmac.compare_digest(received.encode(), self.secret_token.encode()):
+                self.stats['rejected_secret'] += 1
+                logger.warning(f"Webhook rechazado: token secreto inválido desde {request.remote}")
+                return web.Response(status=403)
+
+        if self._intake.locked():
+            self.stats['rejected_busy'] += 1
+            return web.Response(status=503)
+
+        async with self._intake:
+            try:
+                data = await request.json()
+            except ValueError:
+                self.stats['invalid'] += 1
+                return web.Response(status=400)
+
+            # Ignorar tipos de actualización que los handlers no usan
+            if self.allowed_updates and not self.allowed_updates.intersection(data):
+                self.stats['ignored'] += 1
+                return web.Response()
+
+            try:
+                update = Update.de_json(data, self.application.bot)
+            except Exception as e:
+                self.stats['invalid'] += 1
+                logger.warning(f"Actualización de webhook inválida: {e}")
+                return web.Response(status=400)
+
+            await self.application.update_queue.put(update)
+            self.stats['accepted'] += 1
+            return web.Response()